@@ -3,7 +3,11 @@ Feather Book API Application
 """
 from flask import Flask
 from flask_cors import CORS
-from app.routes import health_bp, notes_bp, syntheses_bp
+from app.routes import auth_bp, health_bp, notes_bp, syntheses_bp
+from app.config.cache_config import CacheConfig
+from app.config.repository_config import RepositoryConfig
+from app.mongodb_connector import mongodb_connector
+from mongodb_config import mongodb_config
 
 def create_app():
     """Application factory pattern"""
@@ -19,6 +23,22 @@ def create_app():
     app.register_blueprint(health_bp)
     app.register_blueprint(notes_bp)
     app.register_blueprint(syntheses_bp)
+    app.register_blueprint(auth_bp)
+    
+    # The in-memory backend needs no MongoDB connection, change stream or indexes
+    if RepositoryConfig.REPOSITORY_BACKEND == 'mongodb':
+        # Open the MongoDB connection pool off the request path (per process, lazily)
+        mongodb_connector.warm_up()
+        
+        # Invalidate this worker's local read caches from MongoDB change streams
+        if CacheConfig.MODEL_CACHE_INVALIDATION == 'change_stream':
+            from app.repository.change_stream import start_cache_invalidation
+            start_cache_invalidation()
+        
+        # Reconcile declared MongoDB indexes off the request path
+        if mongodb_config.ensure_indexes_on_startup:
+            from app.repository.index_manager import ensure_indexes_in_background
+            ensure_indexes_in_background()
     
     # Initialize logging middleware
     #LoggingMiddleware(app)
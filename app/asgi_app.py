@@ -0,0 +1,32 @@
+"""
+Feather Book API - application ASGI (Quart + Motor)
+"""
+from quart import Quart
+from app.mongodb_async_connector import async_mongodb_connector
+from app.routes.async_routes import async_auth_bp, async_health_bp, async_notes_bp, async_syntheses_bp
+
+
+def create_async_app():
+    """Application factory pattern (ASGI)"""
+    app = Quart(__name__)
+    
+    # Register blueprints
+    app.register_blueprint(async_health_bp)
+    app.register_blueprint(async_notes_bp)
+    app.register_blueprint(async_syntheses_bp)
+    app.register_blueprint(async_auth_bp)
+    
+    @app.after_serving
+    async def close_mongodb():
+        async_mongodb_connector.close_connection()
+    
+    @app.route("/")
+    async def hello_world():
+        return """
+        <h1>Feather Book API (ASGI)</h1>
+        <p><a href="/api/v1/health">🏥 Health Check</a></p>
+        <p><a href="/api/v1/notes">📝 Notes API</a></p>
+        <p><a href="/api/v1/syntheses">📊 Syntheses API</a></p>
+        """
+    
+    return app
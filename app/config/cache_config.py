@@ -0,0 +1,24 @@
+# app/config/cache_config.py
+import os
+
+class CacheConfig:
+    """Configuration des caches applicatifs"""
+    
+    # Statistiques des synthèses (/api/v1/syntheses/stats)
+    STATS_CACHE_TTL_SECONDS = float(os.getenv('STATS_CACHE_TTL_SECONDS', '30'))
+    STATS_CACHE_MAX_ENTRIES = int(os.getenv('STATS_CACHE_MAX_ENTRIES', '32'))
+    
+    # Cache de lecture des get_by_id (notes et synthèses)
+    MODEL_CACHE_BACKEND = os.getenv('MODEL_CACHE_BACKEND', 'local')  # local, redis, none
+    MODEL_CACHE_TTL_SECONDS = float(os.getenv('MODEL_CACHE_TTL_SECONDS', '60'))
+    MODEL_CACHE_MAX_ENTRIES = int(os.getenv('MODEL_CACHE_MAX_ENTRIES', '1024'))
+    MODEL_CACHE_REDIS_URL = os.getenv('MODEL_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # TTL maximal du backend local sans invalidation entre workers (écritures des autres workers)
+    MODEL_CACHE_LOCAL_MAX_TTL_SECONDS = float(os.getenv('MODEL_CACHE_LOCAL_MAX_TTL_SECONDS', '2'))
+    
+    # Invalidation entre workers des caches locaux : none ou change_stream (replica set requis)
+    MODEL_CACHE_INVALIDATION = os.getenv('MODEL_CACHE_INVALIDATION', 'none')
+    CHANGE_STREAM_COLLECTIONS = os.getenv('CHANGE_STREAM_COLLECTIONS', 'notes,syntheses,users').split(',')
+    # Durée de vie des entrées locales tant que le flux est interrompu
+    CHANGE_STREAM_FALLBACK_TTL_SECONDS = float(os.getenv('CHANGE_STREAM_FALLBACK_TTL_SECONDS', '5'))
+    CHANGE_STREAM_RETRY_SECONDS = float(os.getenv('CHANGE_STREAM_RETRY_SECONDS', '5'))
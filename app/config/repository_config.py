@@ -0,0 +1,9 @@
+# app/config/repository_config.py
+import os
+
+class RepositoryConfig:
+    """Configuration du stockage des repositories"""
+
+    # mongodb : repositories MongoDB ; memory : dictionnaires indexés en mémoire, propres
+    # au processus et perdus à l'arrêt (benchmarks de la couche applicative, démonstrations)
+    REPOSITORY_BACKEND = os.getenv('REPOSITORY_BACKEND', 'mongodb')
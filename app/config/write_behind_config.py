@@ -0,0 +1,13 @@
+# app/config/write_behind_config.py
+import os
+
+class WriteBehindConfig:
+    """Configuration des écritures différées (mises à jour à faible valeur, ex. last_login)"""
+
+    # Désactivé : chaque mise à jour est écrite immédiatement (update_one acquitté)
+    WRITE_BEHIND_ENABLED = os.getenv('WRITE_BEHIND_ENABLED', 'true').lower() == 'true'
+    # Un bulk_write est envoyé toutes les N millisecondes ou dès N documents en attente
+    WRITE_BEHIND_FLUSH_INTERVAL_MS = int(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL_MS', '1000'))
+    WRITE_BEHIND_MAX_ITEMS = int(os.getenv('WRITE_BEHIND_MAX_ITEMS', '500'))
+    # Write concern des bulk_write : 0 (non acquitté), 1, majority...
+    WRITE_BEHIND_WRITE_CONCERN = os.getenv('WRITE_BEHIND_WRITE_CONCERN', '1')
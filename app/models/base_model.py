@@ -1,38 +1,80 @@
 from datetime import datetime
+from operator import attrgetter
 import uuid
 
+
+def _new_id():
+    return str(uuid.uuid4())
+
+
 class BaseModel:
-    """Base domain model (no persistence)."""
-    
+    """Base domain model (no persistence).
+
+    Each model declares its own fields in `FIELDS` (name -> default, a callable
+    default is called for every new instance) and stores them in matching
+    `__slots__`. The full schema is resolved once per class, so building and
+    serializing a model never inspects its attributes.
+    """
+
+    FIELDS = {
+        'id': _new_id,
+        'created_at': datetime.utcnow,
+        'updated_at': datetime.utcnow,
+    }
+    # Fields persisted but never returned by to_dict
+    PRIVATE_FIELDS = ()
+
+    __slots__ = tuple(FIELDS)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._compile_schema()
+
+    @classmethod
+    def _compile_schema(cls):
+        """Resolve the inherited field schema and build the serialization getter."""
+        schema = {}
+        for klass in reversed(cls.__mro__):
+            schema.update(klass.__dict__.get('FIELDS', {}))
+        cls._schema = tuple((name, default, callable(default)) for name, default in schema.items())
+        cls._public_fields = tuple(name for name in schema if name not in cls.PRIVATE_FIELDS)
+        cls._get_public_values = attrgetter(*cls._public_fields)
+
     def __init__(self, **kwargs):
-        self.id = kwargs.get('id', str(uuid.uuid4()))
-        self.created_at = kwargs.get('created_at', datetime.utcnow())
-        self.updated_at = kwargs.get('updated_at', datetime.utcnow())
-        
-        # Set other declared attributes on subclass
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-    
-    def to_dict(self):
-        """Serialize model to dict (for transport/persistence)."""
+        for name, default, is_factory in self._schema:
+            if name in kwargs:
+                value = kwargs[name]
+            else:
+                value = default() if is_factory else default
+            setattr(self, name, value)
+
+    def to_dict(self, fields=None):
+        """Serialize model to dict (for transport/persistence).
+
+        Optional fields left to None are omitted. When `fields` is given,
+        only those keys (plus `id`) are returned.
+        """
         data = {
-            'id': self.id,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
+            name: value
+            for name, value in zip(self._public_fields, self._get_public_values(self))
+            if value is not None or name in BaseModel.FIELDS
         }
-        for attr in dir(self):
-            if attr in ('id', 'created_at', 'updated_at'):
-                continue
-            if attr.startswith('_'):
-                continue
-            value = getattr(self, attr, None)
-            if callable(value):
-                continue
-            if value is not None:
-                data[attr] = value
-        return data
-    
+        return self.select_fields(data, fields)
+
+    @staticmethod
+    def select_fields(data, fields=None):
+        """Keep only the requested fields of a serialized model."""
+        if fields is None:
+            return data
+        selected = {'id': data.get('id')}
+        for field in fields:
+            if field in data:
+                selected[field] = data[field]
+        return selected
+
     @classmethod
     def from_dict(cls, data):
-        return cls(**data)
\ No newline at end of file
+        return cls(**data)
+
+
+BaseModel._compile_schema()
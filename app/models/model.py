@@ -11,28 +11,31 @@ class AttachmentType(Enum):
 class Attachment(BaseModel):
     """Model for attachments (no persistence)."""
     
+    # name et size sont optionnels : omis du document quand ils ne sont pas fournis
+    FIELDS = {'url': '', 'type': None, 'name': None, 'size': None}
+    __slots__ = tuple(FIELDS)
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.url = kwargs.get('url', '')
-        self.type = kwargs.get('type')
         
         # Convert string to enum if needed
         if isinstance(self.type, str):
             self.type = AttachmentType(self.type)
     
-    def to_dict(self):
+    def to_dict(self, fields=None):
         data = super().to_dict()
         data['type'] = self.type.value if self.type else None
-        return data
+        return self.select_fields(data, fields)
 
 
 class Note(BaseModel):
     """Model for notes (no persistence)."""
     
+    FIELDS = {'title': '', 'content': '', 'attachments': list}
+    __slots__ = tuple(FIELDS)
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.content = kwargs.get('content', '')
-        self.attachments = kwargs.get('attachments', [])
         
         # Convert attachment dictionaries to Attachment objects
         if self.attachments and isinstance(self.attachments[0], dict):
@@ -43,36 +46,55 @@ class Note(BaseModel):
             attachment = Attachment(**attachment)
         self.attachments.append(attachment)
     
-    def to_dict(self):
+    def to_dict(self, fields=None):
         data = super().to_dict()
         data['attachments'] = [attachment.to_dict() for attachment in self.attachments]
-        return data
+        return self.select_fields(data, fields)
 
 
 class Synthesis(BaseModel):
     """Model for synthesis (no persistence)."""
     
+    FIELDS = {'url': '', 'is_generated': False, 'note_id': None, 'title': '', 'attachments': list}
+    __slots__ = tuple(FIELDS)
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.url = kwargs.get('url', '')
-        self.is_generated = kwargs.get('is_generated', False)
+        
+        # Convert attachment dictionaries to Attachment objects
+        if self.attachments and isinstance(self.attachments[0], dict):
+            self.attachments = [Attachment(**att) for att in self.attachments]
+    
+    def add_attachment(self, url, attachment_type, name=None, size=None):
+        self.attachments.append(Attachment(url=url, type=attachment_type, name=name, size=size))
     
-    def to_dict(self):
-        return super().to_dict()
+    def remove_attachment(self, url):
+        self.attachments = [attachment for attachment in self.attachments if attachment.url != url]
+    
+    def get_attachments_by_type(self, attachment_type):
+        return [attachment for attachment in self.attachments if attachment.type == attachment_type]
+    
+    def to_dict(self, fields=None):
+        data = super().to_dict()
+        data['attachments'] = [attachment.to_dict() for attachment in self.attachments]
+        return self.select_fields(data, fields)
 
 
 
 class User(BaseModel):
     """Modèle utilisateur"""
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.username = kwargs.get('username', '')
-        self.email = kwargs.get('email', '')
-        self.password_hash = kwargs.get('password_hash', '')
-        self.role = kwargs.get('role', 'user')  # user, admin
-        self.is_active = kwargs.get('is_active', True)
-        self.last_login = kwargs.get('last_login')
+    FIELDS = {
+        'username': '',
+        'email': '',
+        'password_hash': '',
+        'role': 'user',  # user, admin
+        'is_active': True,
+        'last_login': None,
+    }
+    # Ne pas exposer le hash du mot de passe
+    PRIVATE_FIELDS = ('password_hash',)
+    __slots__ = tuple(FIELDS)
     
     def set_password(self, password):
         """Définir le mot de passe"""
@@ -82,12 +104,6 @@ class User(BaseModel):
         """Vérifier le mot de passe"""
         return jwt_manager.check_password(password, self.password_hash)
     
-    def to_dict(self):
-        data = super().to_dict()
-        # Ne pas exposer le hash du mot de passe
-        data.pop('password_hash', None)
-        return data
-    
     def to_dict_with_token(self):
         """Retourner les données utilisateur avec token"""
         data = self.to_dict()
@@ -0,0 +1,42 @@
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from mongodb_config import mongodb_config
+
+
+class AsyncMongoDBConnector:
+    """Asynchronous MongoDB connector (Motor) used by the ASGI application
+
+    The client is created on first use, inside the running event loop.
+    """
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
+
+    def _initialize_mongodb(self):
+        """Create the Motor client from the shared MongoDB configuration"""
+        self.client = AsyncIOMotorClient(mongodb_config.get_connection_string())
+        self.db = self.client[mongodb_config.database_name]
+
+    def get_collection(self, collection_name: str) -> AsyncIOMotorCollection:
+        """Get an asynchronous MongoDB collection reference"""
+        if self.client is None:
+            self._initialize_mongodb()
+        return self.db[collection_name]
+
+    async def ping(self):
+        """Check that MongoDB is reachable"""
+        if self.client is None:
+            self._initialize_mongodb()
+        await self.client.admin.command('ping')
+        print(f"Async MongoDB connected successfully to database: {mongodb_config.database_name}")
+
+    def close_connection(self):
+        """Close MongoDB connection"""
+        if self.client:
+            self.client.close()
+            self.client = None
+            self.db = None
+
+# Global asynchronous MongoDB connector instance
+async_mongodb_connector = AsyncMongoDBConnector()
@@ -1,52 +1,246 @@
-from pymongo import MongoClient
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from pymongo import MongoClient, monitoring
 from pymongo.collection import Collection
 from pymongo.database import Database
-from datetime import datetime
-import os
-from typing import Optional
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from mongodb_config import mongodb_config
 
+READ_PREFERENCE_CLASSES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+
+
+def build_read_options(profile: str) -> Dict[str, Any]:
+    """Collection options (read preference, read concern) of a configured read profile"""
+    settings = mongodb_config.read_profiles.get(profile)
+    if settings is None:
+        raise ValueError(f"Unknown read profile: {profile}")
+    preference_cls = READ_PREFERENCE_CLASSES[settings['preference']]
+    if preference_cls is Primary:
+        # maxStalenessSeconds is not allowed with the primary read preference
+        read_preference = Primary()
+    else:
+        read_preference = preference_cls(max_staleness=settings['max_staleness_seconds'])
+    return {'read_preference': read_preference, 'read_concern': ReadConcern(settings['concern'])}
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool telemetry: checkout wait time, connections in use and churn
+
+    PyMongo emits the checkout started / checked out events on the calling thread,
+    so the wait time is measured with a thread-local start timestamp.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wait_times = deque(maxlen=window)
+        self.counters = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'checkins': 0,
+            'checkout_failures': 0,
+            'pools_cleared': 0,
+        }
+
+    def _increment(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._increment('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._increment('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._increment('connections_closed')
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        self._increment('checkout_failures')
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        with self._lock:
+            self.counters['checkouts'] += 1
+            if started is not None:
+                self._wait_times.append(time.perf_counter() - started)
+
+    def connection_checked_in(self, event):
+        self._increment('checkins')
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the pool counters and of the recent checkout wait times (ms)"""
+        with self._lock:
+            counters = dict(self.counters)
+            waits = sorted(self._wait_times)
+
+        def percentile(ratio):
+            return round(waits[min(len(waits) - 1, int(ratio * len(waits)))] * 1000, 3) if waits else 0.0
+
+        open_connections = counters['connections_created'] - counters['connections_closed']
+        in_use = max(0, counters['checkouts'] - counters['checkins'])
+        return {
+            **counters,
+            'open': open_connections,
+            'in_use': in_use,
+            'available': max(0, open_connections - in_use),
+            'checkout_wait_ms': {
+                'samples': len(waits),
+                'mean': round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': round(waits[-1] * 1000, 3) if waits else 0.0,
+            },
+        }
+
+
 class MongoDBConnector:
-    """MongoDB connector for database operations"""
+    """MongoDB connector for database operations
+
+    The client is created lazily, on first use in each process: nothing touches the
+    network at import time, and a worker forked from a process that already had a
+    client gets its own client (PyMongo clients are not fork-safe).
+    """
     
     def __init__(self):
-        self.client: Optional[MongoClient] = None
-        self.db: Optional[Database] = None
-        self._initialize_mongodb()
+        self._client: Optional[MongoClient] = None
+        self._db: Optional[Database] = None
+        self._collections: Dict[Tuple[str, Optional[str]], Collection] = {}
+        self._lock = threading.Lock()
+        self.pool_monitor = PoolMonitor()
+        self.connected_at: Optional[datetime] = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        """Drop the parent's client in a forked child (it is never used or closed there)"""
+        self._client = None
+        self._db = None
+        self._collections = {}
+        self._lock = threading.Lock()
+        self.pool_monitor = PoolMonitor()
+        self.connected_at = None
     
     def _initialize_mongodb(self):
-        """Initialize MongoDB connection"""
+        """Initialize MongoDB connection (no network round trip: PyMongo connects on demand)"""
         try:
             # Get MongoDB connection string from configuration
             mongodb_uri = mongodb_config.get_connection_string()
             database_name = mongodb_config.database_name
             
-            # Create MongoDB client with configuration
-            self.client = MongoClient(mongodb_uri)
-            self.db = self.client[database_name]
-            
-            # Test connection
-            self.client.admin.command('ping')
-            print(f"MongoDB connected successfully to database: {database_name}")
+            # Create MongoDB client with configuration and pool telemetry
+            self._client = MongoClient(mongodb_uri, event_listeners=[self.pool_monitor])
+            self._db = self._client[database_name]
+            self.connected_at = datetime.utcnow()
             
         except Exception as e:
             print(f"Error initializing MongoDB: {e}")
             raise
     
-    def get_collection(self, collection_name: str) -> Collection:
-        """Get a MongoDB collection reference"""
-        return self.db[collection_name]
+    def _ensure_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._initialize_mongodb()
+    
+    @property
+    def client(self) -> MongoClient:
+        """MongoDB client of the current process, created on first use"""
+        self._ensure_client()
+        return self._client
+    
+    @property
+    def db(self) -> Database:
+        """Database of the current process, created on first use"""
+        self._ensure_client()
+        return self._db
+    
+    def get_collection(self, collection_name: str, read_profile: Optional[str] = None) -> Collection:
+        """Get a MongoDB collection reference
+
+        With `read_profile`, the collection reads with that profile's read preference,
+        read concern and max staleness (see `MongoDBConfig.read_profiles`).
+        """
+        key = (collection_name, read_profile)
+        collection = self._collections.get(key)
+        if collection is None:
+            collection = self.db[collection_name]
+            if read_profile is not None:
+                collection = collection.with_options(**build_read_options(read_profile))
+            self._collections[key] = collection
+        return collection
     
     def get_database(self) -> Database:
         """Get the database reference"""
         return self.db
     
+    def warm_up(self) -> threading.Thread:
+        """Open the connection pool in the background, without blocking startup
+
+        The ping selects a server; PyMongo's maintenance task then fills the pool up
+        to `minPoolSize` connections before the first requests need them.
+        """
+        def _run():
+            try:
+                self.client.admin.command('ping')
+                print(f"MongoDB connected successfully to database: {mongodb_config.database_name}")
+            except Exception as e:
+                print(f"Error warming up MongoDB connection pool: {e}")
+
+        thread = threading.Thread(target=_run, name='mongodb-warm-up', daemon=True)
+        thread.start()
+        return thread
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool telemetry of the current process"""
+        return {
+            'pid': os.getpid(),
+            'connected': self._client is not None,
+            'connected_at': self.connected_at.isoformat() if self.connected_at else None,
+            'min_pool_size': mongodb_config.min_pool_size,
+            'max_pool_size': mongodb_config.max_pool_size,
+            **self.pool_monitor.stats(),
+        }
+    
     def close_connection(self):
         """Close MongoDB connection"""
-        if self.client:
-            self.client.close()
+        if self._client:
+            self._client.close()
+            self._client = None
+            self._db = None
+            self._collections = {}
 
-# Global MongoDB connector instance
+# Global MongoDB connector instance (no connection until first use)
 mongodb_connector = MongoDBConnector()
 
 def initialize_mongodb():
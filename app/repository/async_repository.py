@@ -0,0 +1,262 @@
+"""
+Variantes asynchrones (Motor) des repositories, utilisées par l'application ASGI
+Elles partagent les codecs, projections et curseurs de pagination des repositories
+synchrones ; seules les entrées/sorties MongoDB sont attendues (await).
+"""
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from pymongo import ReturnDocument
+from app.mongodb_async_connector import async_mongodb_connector
+from app.models.model import Note, Synthesis, User
+from app.repository.codec import NOTE_CODEC, SYNTHESIS_CODEC, USER_CODEC, DocumentCodec, apply_set, stamp, touch
+from app.repository.model_cache import build_async_cache_invalidator
+from app.repository.counter_repository import NOTE_SYNTHESES, SYNTHESIS_ATTACHMENTS, CounterRepository, counter_id
+from app.repository.note_repository import NoteRepository
+from app.repository.synthesis_repository import (
+    SynthesisRepository, created_attachment_counts, created_note_deltas, moved_note_deltas, note_counts_pipeline
+)
+from app.repository.user_repository import UserRepository
+from app.utils.pagination import KEYSET_SORT, encode_cursor, keyset_query
+from app.utils.projection import build_projection
+from app.utils.streaming import DEFAULT_BATCH_SIZE
+
+
+class AsyncCounterRepository:
+    """Écritures asynchrones des compteurs, avec les opérations de CounterRepository"""
+
+    COLLECTION_NAME = CounterRepository.COLLECTION_NAME
+
+    def __init__(self):
+        self.collection = async_mongodb_connector.get_collection(self.COLLECTION_NAME)
+
+    async def increment_many(self, scope: str, deltas: Dict[Optional[str], int],
+                             seed: Optional[Callable[[List[str]], Awaitable[Dict[str, int]]]] = None):
+        """Incrémenter les compteurs existants ; les absents sont créés par `seed` (voir CounterRepository)"""
+        operations = CounterRepository.increment_operations(scope, deltas)
+        if not operations:
+            return
+        result = await self.collection.bulk_write(list(operations.values()), ordered=False)
+        if seed is None or result.matched_count == len(operations):
+            return
+        if result.matched_count == 0:
+            missing = list(operations)
+        else:
+            cursor = self.collection.find(
+                {'id': {'$in': [counter_id(scope, owner_id) for owner_id in operations]}},
+                {'_id': 0, 'owner_id': 1}
+            )
+            existing = {doc['owner_id'] async for doc in cursor}
+            missing = [owner_id for owner_id in operations if owner_id not in existing]
+        if missing:
+            values = await seed(missing)
+            await self.collection.bulk_write(
+                CounterRepository.seed_operations(scope, {owner_id: values.get(owner_id, 0) for owner_id in missing}),
+                ordered=False
+            )
+
+    async def set_many(self, scope: str, values: List[Tuple[str, int]]):
+        """Fixer plusieurs compteurs d'une portée en un bulk_write"""
+        if values:
+            await self.collection.bulk_write(CounterRepository.set_operations(scope, values), ordered=False)
+
+    async def delete(self, scope: str, owner_id: str):
+        """Supprimer le compteur d'un propriétaire disparu"""
+        await self.collection.delete_one({'id': counter_id(scope, owner_id)})
+
+
+class _AsyncDocumentRepository:
+    """Opérations communes aux repositories asynchrones de notes et de synthèses"""
+
+    COLLECTION_NAME: str
+    CODEC: DocumentCodec
+
+    def __init__(self):
+        self.collection = async_mongodb_connector.get_collection(self.COLLECTION_NAME)
+        # Cache de lecture partagé des routes Flask (backend redis uniquement)
+        self._invalidate_cache = build_async_cache_invalidator(self.COLLECTION_NAME)
+
+    async def invalidate_cache(self, model_id: str):
+        """Retirer le document du cache de lecture partagé après une écriture"""
+        if self._invalidate_cache is not None:
+            await self._invalidate_cache(model_id)
+
+    async def create(self, model):
+        await self.collection.insert_one(self.CODEC.encode(model))
+        await self.invalidate_cache(model.id)
+        return model
+
+    async def update_fields(self, model_id: str, changes: Dict[str, Any]):
+        """Mettre à jour seulement les champs modifiés, en un aller-retour (None si absent)"""
+        doc = await self.collection.find_one_and_update(
+            {'id': model_id},
+            touch({'$set': changes}),
+            return_document=ReturnDocument.AFTER
+        )
+        await self.invalidate_cache(model_id)
+        return self.CODEC.decode(doc)
+
+    async def get_by_id(self, model_id: str, fields: Optional[List[str]] = None):
+        doc = await self.collection.find_one({'id': model_id}, build_projection(fields, required=('updated_at',)))
+        return self.CODEC.decode(doc)
+
+    async def list_all(self, fields: Optional[List[str]] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> List:
+        cursor = self.collection.find({}, build_projection(fields)).batch_size(batch_size)
+        return [self.CODEC.decode(doc) async for doc in cursor]
+
+    async def list_page(self, limit: int, cursor: Optional[str] = None,
+                        fields: Optional[List[str]] = None) -> Tuple[List, Optional[str]]:
+        """Récupérer une page après le curseur donné (même curseur que la version synchrone)"""
+        # Un document de plus que demandé indique s'il reste une page suivante
+        docs = await (
+            self.collection.find(keyset_query(cursor), build_projection(fields, required=('created_at',)))
+            .sort(KEYSET_SORT)
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]['created_at'], docs[-1]['id']) if has_more else None
+        return list(self.CODEC.decode_many(docs)), next_cursor
+
+    async def delete(self, model_id: str) -> bool:
+        result = await self.collection.delete_one({'id': model_id})
+        await self.invalidate_cache(model_id)
+        return result.deleted_count > 0
+
+    async def count(self) -> int:
+        return await self.collection.count_documents({})
+
+
+class AsyncNoteRepository(_AsyncDocumentRepository):
+    COLLECTION_NAME = NoteRepository.COLLECTION_NAME
+    CODEC = NOTE_CODEC
+
+    async def get_many(self, note_ids: List[str], fields: Optional[List[str]] = None) -> List[Note]:
+        """Récupérer plusieurs notes en une requête `$in`, dans l'ordre des identifiants"""
+        cursor = self.collection.find({'id': {'$in': note_ids}}, build_projection(fields))
+        notes = {note.id: note for note in [NOTE_CODEC.decode(doc) async for doc in cursor]}
+        return [notes[note_id] for note_id in note_ids if note_id in notes]
+
+
+class AsyncSynthesisRepository(_AsyncDocumentRepository):
+    """Synthèses, avec les mêmes compteurs matérialisés que SynthesisRepository"""
+
+    COLLECTION_NAME = SynthesisRepository.COLLECTION_NAME
+    CODEC = SYNTHESIS_CODEC
+
+    def __init__(self):
+        super().__init__()
+        self.counters = AsyncCounterRepository()
+
+    async def create(self, synthesis: Synthesis) -> Synthesis:
+        await self.collection.insert_one(SYNTHESIS_CODEC.encode(synthesis))
+        await self.invalidate_cache(synthesis.id)
+        await self.counters.set_many(SYNTHESIS_ATTACHMENTS, created_attachment_counts([synthesis]))
+        await self.counters.increment_many(NOTE_SYNTHESES, created_note_deltas([synthesis]), seed=self._count_by_notes)
+        return synthesis
+
+    async def _count_by_notes(self, note_ids: List[str]) -> Dict[str, int]:
+        """Nombre de synthèses de chaque note, compté depuis les documents"""
+        return {doc['_id']: doc['count'] async for doc in self.collection.aggregate(note_counts_pipeline(note_ids))}
+
+    async def update_fields(self, synthesis_id: str, changes: Dict[str, Any]) -> Optional[Synthesis]:
+        """Mettre à jour les champs modifiés ; un changement de note déplace le compteur"""
+        if 'note_id' not in changes:
+            return await super().update_fields(synthesis_id, changes)
+
+        # Changement de note : document AVANT et document à jour reconstruit (voir SynthesisRepository)
+        update = touch({'$set': changes}, at=stamp())
+        before = await self.collection.find_one_and_update({'id': synthesis_id}, update)
+        await self.invalidate_cache(synthesis_id)
+        if before is None:
+            return None
+        await self.counters.increment_many(
+            NOTE_SYNTHESES, moved_note_deltas(before.get('note_id'), changes['note_id']), seed=self._count_by_notes
+        )
+        return SYNTHESIS_CODEC.decode(apply_set(before, update))
+
+    async def delete(self, synthesis_id: str) -> bool:
+        deleted = await self.collection.find_one_and_delete({'id': synthesis_id}, projection={'_id': 0, 'note_id': 1})
+        await self.invalidate_cache(synthesis_id)
+        if deleted is None:
+            return False
+        await self.counters.increment_many(NOTE_SYNTHESES, {deleted.get('note_id'): -1}, seed=self._count_by_notes)
+        await self.counters.delete(SYNTHESIS_ATTACHMENTS, synthesis_id)
+        return True
+
+    async def list_by_note(self, note_id: str, fields: Optional[List[str]] = None) -> List[Synthesis]:
+        """Récupérer toutes les synthèses d'une note"""
+        cursor = self.collection.find({'note_id': note_id}, build_projection(fields))
+        return [SYNTHESIS_CODEC.decode(doc) async for doc in cursor]
+
+
+class AsyncUserRepository:
+    COLLECTION_NAME = UserRepository.COLLECTION_NAME
+
+    def __init__(self):
+        self.collection = async_mongodb_connector.get_collection(self.COLLECTION_NAME)
+
+    async def create(self, user: User) -> User:
+        """Créer un nouvel utilisateur"""
+        await self.collection.insert_one(USER_CODEC.encode(user))
+        return user
+
+    async def get_by_id(self, user_id: str) -> Optional[User]:
+        """Récupérer un utilisateur par ID"""
+        return USER_CODEC.decode(await self.collection.find_one({'id': user_id}))
+
+    async def get_by_username(self, username: str) -> Optional[User]:
+        """Récupérer un utilisateur par nom d'utilisateur"""
+        return USER_CODEC.decode(await self.collection.find_one({'username': username}))
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Récupérer un utilisateur par email"""
+        return USER_CODEC.decode(await self.collection.find_one({'email': email}))
+
+    async def update_last_login(self, user_id: str):
+        """Mettre à jour la dernière connexion"""
+        await self.collection.update_one(
+            {'id': user_id},
+            {'$set': {'last_login': datetime.utcnow()}}
+        )
+
+
+class AsyncRepositoryFactory:
+    """Factory des repositories asynchrones, créés au premier usage dans la boucle d'événements"""
+    
+    def __init__(self):
+        self._note_repository = None
+        self._synthesis_repository = None
+        self._user_repository = None
+    
+    @property
+    def note_repository(self) -> AsyncNoteRepository:
+        """Récupérer l'instance de l'AsyncNoteRepository"""
+        if self._note_repository is None:
+            self._note_repository = AsyncNoteRepository()
+        return self._note_repository
+    
+    @property
+    def synthesis_repository(self) -> AsyncSynthesisRepository:
+        """Récupérer l'instance de l'AsyncSynthesisRepository"""
+        if self._synthesis_repository is None:
+            self._synthesis_repository = AsyncSynthesisRepository()
+        return self._synthesis_repository
+    
+    @property
+    def user_repository(self) -> AsyncUserRepository:
+        """Récupérer l'instance de l'AsyncUserRepository"""
+        if self._user_repository is None:
+            self._user_repository = AsyncUserRepository()
+        return self._user_repository
+    
+    def reset(self):
+        """Réinitialiser les instances (utile pour les tests)"""
+        self._note_repository = None
+        self._synthesis_repository = None
+        self._user_repository = None
+
+
+# Instance globale de la factory asynchrone
+async_repository_factory = AsyncRepositoryFactory()
@@ -0,0 +1,190 @@
+"""
+Invalidation des caches de lecture locaux entre workers, à partir des change streams MongoDB
+Chaque processus suit les écritures des collections surveillées (quel que soit le worker
+ou l'hôte qui les a faites) et retire les entrées concernées de ses caches. Le jeton de
+reprise reste en mémoire du processus, comme les caches qu'il protège : après une coupure,
+le flux reprend là où il s'était arrêté ; un processus qui (re)démarre ouvre un flux neuf
+et vide ses caches. Tant que le flux est interrompu, les entrées locales expirent après un
+TTL court. Nécessite un replica set (un nœud unique suffit).
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config.cache_config import CacheConfig
+from app.logger_config import get_logger
+from app.mongodb_connector import mongodb_connector
+from app.repository.model_cache import get_model_cache, registered_caches
+
+logger = get_logger('change_stream')
+
+# Historique du flux perdu (oplog dépassé) : le jeton ne permet plus de reprendre
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_FATAL_ERROR = 280
+
+
+class CacheInvalidationListener:
+    """Suivi d'un change stream et invalidation des caches locaux du processus"""
+
+    def __init__(self, collections: List[str], fallback_ttl: float, retry_delay: float):
+        self.collections = [name.strip() for name in collections if name.strip()]
+        self.fallback_ttl = fallback_ttl
+        self.retry_delay = retry_delay
+        self._resume_token = None
+        self._pid = None
+        self._stop = threading.Event()
+        self.status = 'stopped'
+        self.events = 0
+        self.reconnects = 0
+        self.last_event_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    # -- caches ---------------------------------------------------------------
+
+    def _set_fallback(self, degraded: bool):
+        """TTL court sur les caches locaux tant que le flux n'est pas suivi"""
+        for cache in registered_caches():
+            cache.set_max_age(self.fallback_ttl if degraded else None)
+
+    def _clear_caches(self):
+        for cache in registered_caches():
+            cache.clear()
+
+    def _apply(self, change: Dict[str, Any]):
+        """Retirer du cache local le document modifié"""
+        cache = get_model_cache(change['ns']['coll'])
+        if cache is None:
+            return
+        model_id = (change.get('fullDocument') or {}).get('id')
+        if model_id is not None:
+            cache.invalidate(model_id)
+        else:
+            # Suppression (ou document supprimé avant updateLookup) : seul l'_id est connu,
+            # le cache retrouve l'`id` des documents qu'il a stockés
+            cache.invalidate_object_id(change['documentKey']['_id'])
+
+    # -- flux -----------------------------------------------------------------
+
+    def _open_stream(self):
+        pipeline = [
+            {'$match': {
+                'ns.coll': {'$in': self.collections},
+                'operationType': {'$in': ['insert', 'update', 'replace', 'delete']},
+            }},
+            # Seuls l'`id` et l'_id du document sont utiles : le reste n'est pas transféré
+            {'$project': {'ns': 1, 'operationType': 1, 'documentKey._id': 1, 'fullDocument.id': 1}},
+        ]
+        token = self._resume_token
+        if token is None:
+            # Flux neuf : les écritures antérieures ne seront pas vues, les entrées lues
+            # avant son ouverture ne sont plus protégées
+            self._clear_caches()
+            return mongodb_connector.db.watch(pipeline, full_document='updateLookup')
+        try:
+            return mongodb_connector.db.watch(
+                pipeline, full_document='updateLookup', resume_after=token
+            )
+        except OperationFailure as e:
+            if e.code not in (CHANGE_STREAM_HISTORY_LOST, CHANGE_STREAM_FATAL_ERROR):
+                raise
+            # Écritures manquées inconnues : on repart d'un cache vide
+            logger.warning(f"Jeton de reprise inutilisable, caches locaux vidés: {str(e)}")
+            self._resume_token = None
+            self._clear_caches()
+            return mongodb_connector.db.watch(pipeline, full_document='updateLookup')
+
+    def _watch(self):
+        with self._open_stream() as stream:
+            self.status = 'watching'
+            self.last_error = None
+            self._set_fallback(False)
+            logger.info(f"Change stream suivi pour: {', '.join(self.collections)}")
+            while stream.alive and not self._stop.is_set():
+                change = stream.try_next()
+                if change is not None:
+                    self._apply(change)
+                    self.events += 1
+                    self.last_event_at = datetime.utcnow()
+                # Le jeton avance aussi sans événement (postBatchResumeToken)
+                self._resume_token = stream.resume_token
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            except PyMongoError as e:
+                self.last_error = str(e)
+                logger.warning(f"Change stream interrompu, reprise dans {self.retry_delay}s: {str(e)}")
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Erreur du change stream: {str(e)}", exc_info=True)
+            if self._stop.is_set():
+                break
+            self.status = 'degraded'
+            self._set_fallback(True)
+            self.reconnects += 1
+            self._stop.wait(self.retry_delay)
+        self.status = 'stopped'
+
+    def start(self):
+        """Démarrer le suivi dans le processus courant (et dans chaque worker issu d'un fork)"""
+        if self._pid == os.getpid():
+            return
+        if self._pid is None and hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart_after_fork)
+        self._pid = os.getpid()
+        self._stop.clear()
+        self.status = 'starting'
+        # En attendant le premier flux, les caches locaux gardent un TTL court
+        self._set_fallback(True)
+        threading.Thread(target=self._run, name='change-stream-invalidation', daemon=True).start()
+
+    def _restart_after_fork(self):
+        # Le thread du parent n'existe pas dans l'enfant : repartir de zéro, caches compris
+        self._clear_caches()
+        self._stop = threading.Event()
+        self._resume_token = None
+        self.events = 0
+        self.reconnects = 0
+        self._pid = -1
+        self.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """État du suivi, pour /api/v1/health"""
+        return {
+            'status': self.status,
+            'collections': self.collections,
+            'events': self.events,
+            'reconnects': self.reconnects,
+            # Jeton en mémoire seulement : False après un démarrage, jusqu'au premier lot du flux
+            'resumable': self._resume_token is not None,
+            'last_event_at': self.last_event_at.isoformat() if self.last_event_at else None,
+            'last_error': self.last_error,
+        }
+
+
+# Listener du processus, construit par start_cache_invalidation()
+cache_invalidation_listener: Optional[CacheInvalidationListener] = None
+
+
+def start_cache_invalidation() -> CacheInvalidationListener:
+    """Démarrer l'invalidation des caches locaux par change stream selon CacheConfig"""
+    global cache_invalidation_listener
+    if cache_invalidation_listener is None:
+        cache_invalidation_listener = CacheInvalidationListener(
+            CacheConfig.CHANGE_STREAM_COLLECTIONS,
+            fallback_ttl=CacheConfig.CHANGE_STREAM_FALLBACK_TTL_SECONDS,
+            retry_delay=CacheConfig.CHANGE_STREAM_RETRY_SECONDS,
+        )
+    cache_invalidation_listener.start()
+    return cache_invalidation_listener
+
+
+def invalidation_stats() -> Optional[Dict[str, Any]]:
+    """État du listener du processus (None si l'invalidation par change stream est désactivée)"""
+    return cache_invalidation_listener.stats() if cache_invalidation_listener else None
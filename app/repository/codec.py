@@ -0,0 +1,100 @@
+"""
+Codecs de documents MongoDB partagés par les repositories
+Chaque codec est construit une seule fois à l'import et convertit un modèle
+en document (encode) ou un document en modèle (decode) en une seule passe.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from app.models.model import Attachment, Note, Synthesis, User
+
+_fromisoformat = datetime.fromisoformat
+
+
+def parse_date(value: str) -> datetime:
+    """Convertir une date stockée en chaîne ISO (documents non migrés)"""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return _fromisoformat(value)
+
+
+class DocumentCodec:
+    """Conversion entre un modèle et son document MongoDB"""
+
+    def __init__(self, model_cls, date_fields: Tuple[str, ...] = ('created_at', 'updated_at'),
+                 private_fields: Optional[Tuple[str, ...]] = None):
+        """
+        Args:
+            model_cls: Classe du modèle (doit fournir from_dict)
+            date_fields: Champs de date pouvant encore être stockés en chaîne ISO
+            private_fields: Attributs persistés mais absents de to_dict
+                (par défaut les PRIVATE_FIELDS du modèle, ex: password_hash)
+        """
+        self.model_cls = model_cls
+        self.date_fields = tuple(date_fields)
+        self.private_fields = tuple(model_cls.PRIVATE_FIELDS if private_fields is None else private_fields)
+        self._from_dict = model_cls.from_dict
+
+    def encode(self, model) -> Dict[str, Any]:
+        """Convertir un modèle en document à insérer ou à passer à $set"""
+        data = model.to_dict()
+        for field in self.private_fields:
+            data[field] = getattr(model, field)
+        return data
+
+    def normalize(self, doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Retirer l'ObjectId et convertir les dates ISO restantes, sans construire de modèle"""
+        if doc is None:
+            return None
+        # L'ObjectId n'est pas un attribut du modèle
+        doc.pop('_id', None)
+        for field in self.date_fields:
+            value = doc.get(field)
+            if value.__class__ is str:
+                doc[field] = parse_date(value)
+        return doc
+
+    def decode(self, doc: Optional[Dict[str, Any]]):
+        """Convertir un document MongoDB en modèle (None si le document est absent)"""
+        if doc is None:
+            return None
+        return self._from_dict(self.normalize(doc))
+
+    def decode_many(self, docs: Iterable[Dict[str, Any]]) -> Iterator:
+        """Convertir un curseur MongoDB en modèles, au fil de l'itération"""
+        decode = self.decode
+        for doc in docs:
+            yield decode(doc)
+
+
+def touch(update: Dict[str, Any], at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Compléter une mise à jour par la date de modification, fixée par le serveur MongoDB
+
+    `$currentDate` : quel que soit le serveur d'application, `updated_at` suit une seule
+    horloge, dont dépendent les ETags et la version des collections.
+    Avec `at` (voir stamp), la date est fixée par l'application : réservé aux mises à
+    jour qui lisent le document AVANT et reconstruisent localement le document à jour.
+    """
+    if at is not None:
+        return {**update, '$set': {**update.get('$set', {}), 'updated_at': at}}
+    return {**update, '$currentDate': {'updated_at': True}}
+
+
+def stamp() -> datetime:
+    """Date de modification fixée par l'application, à la précision des dates BSON (ms)"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def apply_set(before: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Document à jour reconstruit depuis le document AVANT et le `$set` appliqué"""
+    return {**before, **update['$set']}
+
+
+NOTE_CODEC = DocumentCodec(Note)
+SYNTHESIS_CODEC = DocumentCodec(Synthesis)
+ATTACHMENT_CODEC = DocumentCodec(Attachment)
+USER_CODEC = DocumentCodec(
+    User,
+    date_fields=('created_at', 'updated_at', 'last_login'),
+)
@@ -0,0 +1,166 @@
+"""
+Compteurs matérialisés (collection `counters`), tenus à jour par `$inc`
+Un compteur est identifié par une portée (ce qui est compté) et un propriétaire :
+le nombre de synthèses d'une note, le nombre d'attachments d'une synthèse.
+Un compteur existant est exact ; un compteur absent est recalculé depuis les documents.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from pymongo import ASCENDING, DeleteOne, IndexModel, UpdateOne
+from app.mongodb_connector import mongodb_connector
+
+# Portées des compteurs
+NOTE_SYNTHESES = 'note_syntheses'
+SYNTHESIS_ATTACHMENTS = 'synthesis_attachments'
+
+# Opérations par bulk_write lors d'une réconciliation
+RECONCILE_BATCH_SIZE = 1000
+
+# Recalcul des compteurs absents : propriétaires -> {propriétaire: valeur}
+Seed = Callable[[List[str]], Dict[str, int]]
+
+
+def counter_id(scope: str, owner_id: str) -> str:
+    """Identifiant du document compteur d'un propriétaire"""
+    return f"{scope}:{owner_id}"
+
+
+class CounterRepository:
+    COLLECTION_NAME = 'counters'
+
+    # Index déclarés, réconciliés par app.repository.index_manager
+    INDEXES = [
+        IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+        IndexModel([('scope', ASCENDING), ('owner_id', ASCENDING)], name='scope_owner_id'),
+    ]
+
+    @property
+    def collection(self):
+        """Collection du processus courant (le client MongoDB est créé au premier usage)"""
+        return mongodb_connector.get_collection(self.COLLECTION_NAME)
+
+    @staticmethod
+    def _increment_operation(scope: str, owner_id: str, delta: int) -> UpdateOne:
+        # Sans upsert : un compteur absent n'est pas créé à la valeur du delta
+        return UpdateOne({'id': counter_id(scope, owner_id)}, {'$inc': {'value': delta}})
+
+    @staticmethod
+    def _seed_operation(scope: str, owner_id: str, value: int) -> UpdateOne:
+        # $setOnInsert : un compteur créé entre-temps par une autre écriture est conservé
+        return UpdateOne(
+            {'id': counter_id(scope, owner_id)},
+            {'$setOnInsert': {'value': value, 'scope': scope, 'owner_id': owner_id}},
+            upsert=True
+        )
+
+    @staticmethod
+    def _set_operation(scope: str, owner_id: str, value: int) -> UpdateOne:
+        return UpdateOne(
+            {'id': counter_id(scope, owner_id)},
+            {'$set': {'value': value, 'scope': scope, 'owner_id': owner_id}},
+            upsert=True
+        )
+
+    @classmethod
+    def increment_operations(cls, scope: str, deltas: Dict[Optional[str], int]) -> Dict[str, UpdateOne]:
+        """Opérations `$inc` par propriétaire (propriétaires absents et deltas nuls ignorés)"""
+        return {
+            owner_id: cls._increment_operation(scope, owner_id, delta)
+            for owner_id, delta in deltas.items()
+            if owner_id is not None and delta
+        }
+
+    @classmethod
+    def set_operations(cls, scope: str, values: Iterable[Tuple[str, int]]) -> List[UpdateOne]:
+        """Opérations fixant la valeur de plusieurs compteurs d'une portée"""
+        return [cls._set_operation(scope, owner_id, value) for owner_id, value in values]
+
+    @classmethod
+    def seed_operations(cls, scope: str, values: Dict[str, int]) -> List[UpdateOne]:
+        """Opérations créant les compteurs absents à leur valeur recalculée"""
+        return [cls._seed_operation(scope, owner_id, value) for owner_id, value in values.items()]
+
+    def _execute(self, operations: list):
+        for start in range(0, len(operations), RECONCILE_BATCH_SIZE):
+            self.collection.bulk_write(operations[start:start + RECONCILE_BATCH_SIZE], ordered=False)
+
+    def increment(self, scope: str, owner_id: Optional[str], delta: int = 1, seed: Optional[Seed] = None):
+        """Ajouter `delta` (éventuellement négatif) au compteur d'un propriétaire (voir increment_many)"""
+        self.increment_many(scope, {owner_id: delta}, seed)
+
+    def increment_many(self, scope: str, deltas: Dict[Optional[str], int], seed: Optional[Seed] = None):
+        """Appliquer plusieurs incréments {propriétaire: delta} d'une portée en un bulk_write
+
+        Seuls les compteurs existants sont incrémentés : un compteur absent (propriétaire
+        antérieur aux compteurs, ou supprimé par une réconciliation) est créé avec la valeur
+        recalculée par `seed(propriétaires)`, après l'écriture comptée. Sans `seed`, il reste
+        absent jusqu'à la prochaine réconciliation.
+        """
+        operations = self.increment_operations(scope, deltas)
+        if not operations:
+            return
+        result = self.collection.bulk_write(list(operations.values()), ordered=False)
+        if seed is None or result.matched_count == len(operations):
+            return
+        if result.matched_count == 0:
+            missing = list(operations)
+        else:
+            existing = self.get_many(scope, list(operations))
+            missing = [owner_id for owner_id in operations if owner_id not in existing]
+        if missing:
+            values = seed(missing)
+            self._execute(self.seed_operations(scope, {owner_id: values.get(owner_id, 0) for owner_id in missing}))
+
+    def set(self, scope: str, owner_id: str, value: int):
+        """Fixer la valeur d'un compteur (réécriture complète du document compté)"""
+        self._execute([self._set_operation(scope, owner_id, value)])
+
+    def set_many(self, scope: str, values: Iterable[Tuple[str, int]]) -> int:
+        """Fixer plusieurs compteurs d'une portée {(propriétaire, valeur)} par bulk_write
+
+        Retourne le nombre de compteurs écrits.
+        """
+        operations = self.set_operations(scope, values)
+        self._execute(operations)
+        return len(operations)
+
+    def get(self, scope: str, owner_id: str) -> Optional[int]:
+        """Valeur du compteur, ou None s'il n'a jamais été initialisé"""
+        doc = self.collection.find_one({'id': counter_id(scope, owner_id)}, {'_id': 0, 'value': 1})
+        return doc['value'] if doc else None
+
+    def get_many(self, scope: str, owner_ids: List[str]) -> Dict[str, int]:
+        """Valeurs de plusieurs compteurs d'une portée, en une requête `$in`"""
+        cursor = self.collection.find(
+            {'id': {'$in': [counter_id(scope, owner_id) for owner_id in owner_ids]}},
+            {'_id': 0, 'owner_id': 1, 'value': 1}
+        )
+        return {doc['owner_id']: doc['value'] for doc in cursor}
+
+    def delete(self, scope: str, owner_id: str):
+        """Supprimer le compteur d'un propriétaire disparu"""
+        self.collection.delete_one({'id': counter_id(scope, owner_id)})
+
+    def reconcile_scope(self, scope: str, expected: Iterable[Tuple[str, int]],
+                        dry_run: bool = False) -> Dict[str, int]:
+        """Remplacer les compteurs d'une portée par les valeurs recalculées
+
+        Les compteurs absents ou faux sont réécrits, ceux dont le propriétaire n'a plus
+        rien à compter sont supprimés. Retourne le nombre de compteurs vérifiés,
+        corrigés et supprimés.
+        """
+        current = {
+            doc['owner_id']: doc['value']
+            for doc in self.collection.find({'scope': scope}, {'_id': 0, 'owner_id': 1, 'value': 1})
+        }
+        operations = []
+        checked = 0
+        for owner_id, value in expected:
+            checked += 1
+            if current.pop(owner_id, None) != value:
+                operations.append(self._set_operation(scope, owner_id, value))
+        fixed = len(operations)
+        operations.extend(DeleteOne({'id': counter_id(scope, owner_id)}) for owner_id in current)
+        if not dry_run:
+            self._execute(operations)
+        return {'checked': checked, 'fixed': fixed, 'removed': len(current)}
@@ -0,0 +1,135 @@
+"""
+Réconciliation des index MongoDB déclarés par les repositories
+"""
+
+import threading
+from typing import Dict, List
+from pymongo import TEXT
+from pymongo.errors import PyMongoError
+from app.mongodb_connector import mongodb_connector
+from app.logger_config import get_logger
+from app.repository.attachment_repository import AttachmentRepository
+from app.repository.counter_repository import CounterRepository
+from app.repository.note_repository import NoteRepository
+from app.repository.synthesis_repository import SynthesisRepository
+from app.repository.user_repository import UserRepository
+
+logger = get_logger('index_manager')
+
+# Repositories dont les index sont gérés
+MANAGED_REPOSITORIES = [
+    NoteRepository,
+    SynthesisRepository,
+    AttachmentRepository,
+    UserRepository,
+    CounterRepository,
+]
+
+
+def _index_key(key) -> List:
+    """Normaliser la clé d'un index pour comparaison"""
+    return [(field, direction) for field, direction in (key.items() if hasattr(key, 'items') else key)]
+
+
+def _same_definition(current: Dict, document: Dict) -> bool:
+    """Vérifier qu'un index existant correspond à sa déclaration"""
+    declared_key = _index_key(document['key'])
+    if bool(current.get('unique')) != bool(document.get('unique')):
+        return False
+    # MongoDB stocke les index texte sous la clé (_fts, _ftsx) : comparer les champs pondérés
+    text_fields = sorted(field for field, direction in declared_key if direction == TEXT)
+    if text_fields:
+        return sorted(current.get('weights', {})) == text_fields
+    return _index_key(current['key']) == declared_key
+
+
+def diff_indexes(repository_cls) -> Dict[str, List[str]]:
+    """Comparer les index déclarés d'un repository avec ceux présents en base
+
+    Retourne les noms d'index manquants, en trop, ceux dont la définition diffère, et
+    ceux présents sous un autre nom (`existant -> déclaré`) : MongoDB refuse de créer un
+    index de même clé sous un second nom, ils sont à renommer manuellement.
+    """
+    collection = mongodb_connector.get_collection(repository_cls.COLLECTION_NAME)
+    existing = collection.index_information()
+    declared = {index.document['name']: index.document for index in repository_cls.INDEXES}
+    extra = [name for name in existing if name != '_id_' and name not in declared]
+
+    missing, changed, renamed = [], [], []
+    for name, document in declared.items():
+        if name in existing:
+            if not _same_definition(existing[name], document):
+                changed.append(name)
+            continue
+        same = next((other for other in extra if _same_definition(existing[other], document)), None)
+        if same is None:
+            missing.append(name)
+        else:
+            extra.remove(same)
+            renamed.append(f"{same} -> {name}")
+
+    return {'missing': missing, 'extra': extra, 'changed': changed, 'renamed': renamed}
+
+
+def ensure_indexes(dry_run: bool = False, drop_extra: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """Créer les index manquants de toutes les collections (opération idempotente)
+
+    Chaque index est créé (ou supprimé) séparément : un échec n'empêche pas les autres,
+    et son nom est rapporté dans `failed`.
+
+    Args:
+        dry_run (bool): Seulement rapporter les écarts, sans rien modifier
+        drop_extra (bool): Supprimer les index présents en base mais non déclarés
+    """
+    report = {}
+    for repository_cls in MANAGED_REPOSITORIES:
+        collection_name = repository_cls.COLLECTION_NAME
+        collection = mongodb_connector.get_collection(collection_name)
+        diff = diff_indexes(repository_cls)
+        report[collection_name] = diff
+
+        for name in diff['changed']:
+            logger.warning(f"Index {collection_name}.{name} différent de sa déclaration, à recréer manuellement")
+        for names in diff['renamed']:
+            logger.warning(f"Index {collection_name}.{names} présent sous un autre nom, à renommer manuellement")
+        for name in diff['extra']:
+            logger.info(f"Index non déclaré trouvé: {collection_name}.{name}")
+
+        if dry_run:
+            continue
+
+        failed = diff['failed'] = []
+        for index in repository_cls.INDEXES:
+            name = index.document['name']
+            if name not in diff['missing']:
+                continue
+            try:
+                collection.create_indexes([index])
+                logger.info(f"Index créé: {collection_name}.{name}")
+            except PyMongoError as e:
+                failed.append(name)
+                logger.error(f"Échec de la création de l'index {collection_name}.{name}: {str(e)}")
+
+        if drop_extra:
+            for name in diff['extra']:
+                try:
+                    collection.drop_index(name)
+                    logger.info(f"Index supprimé: {collection_name}.{name}")
+                except PyMongoError as e:
+                    failed.append(name)
+                    logger.error(f"Échec de la suppression de l'index {collection_name}.{name}: {str(e)}")
+
+    return report
+
+
+def ensure_indexes_in_background() -> threading.Thread:
+    """Lancer la réconciliation des index sans bloquer le démarrage de l'application"""
+    def _run():
+        try:
+            ensure_indexes()
+        except Exception as e:
+            logger.error(f"Erreur lors de la réconciliation des index: {str(e)}", exc_info=True)
+
+    thread = threading.Thread(target=_run, name='ensure-indexes', daemon=True)
+    thread.start()
+    return thread
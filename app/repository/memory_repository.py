@@ -0,0 +1,487 @@
+"""
+Repositories en mémoire, interchangeables avec les repositories MongoDB
+Sélectionnés par REPOSITORY_BACKEND=memory, ils servent à mesurer la couche applicative
+(Flask, sérialisation, logging) sans base de données, et à lancer l'API sans MongoDB.
+Les documents sont conservés encodés par les codecs, comme en base, avec un index trié
+sur (created_at, id) pour la pagination, des index secondaires sur `note_id` (synthèses)
+et sur `username` / `email` (utilisateurs). `fields` est appliqué comme la projection
+MongoDB des repositories (build_projection, mêmes champs `required`).
+Les données sont propres au processus et perdues à l'arrêt.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from pymongo.errors import DuplicateKeyError
+from app.models.model import Attachment, AttachmentType, Note, Synthesis, User
+from app.repository.codec import ATTACHMENT_CODEC, NOTE_CODEC, SYNTHESIS_CODEC, USER_CODEC, DocumentCodec
+from app.repository.synthesis_repository import STATS_GROUP_KEYS, SynthesisRepository
+from app.utils.bulk import DEFAULT_CHUNK_SIZE, DUPLICATE_KEY_ERROR
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.projection import build_projection
+from app.utils.streaming import DEFAULT_BATCH_SIZE
+
+
+# Alias `$type` reconnus par _matches
+_TYPES = {'string': str, 'date': datetime}
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Évaluer le sous-ensemble de filtres MongoDB utilisé par les repositories
+
+    Égalité, `$in`, `$lt`, `$type` et `$or` : filtres par identifiant(s) et curseurs keyset.
+    """
+    for field, condition in query.items():
+        if field == '$or':
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+            continue
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if '$in' in condition and value not in condition['$in']:
+                return False
+            if '$type' in condition and not isinstance(value, _TYPES[condition['$type']]):
+                return False
+            # Comme MongoDB, `$lt` ne compare que des valeurs du même type
+            if '$lt' in condition and not (
+                isinstance(value, type(condition['$lt'])) and value < condition['$lt']
+            ):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _keyset_order(doc: Dict[str, Any]) -> Tuple[Any, str]:
+    """Clé de tri équivalente à KEYSET_SORT (created_at puis id, décroissants)"""
+    return doc['created_at'], doc['id']
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    """Appliquer une projection d'inclusion de build_projection (champs de premier niveau)"""
+    if projection is None:
+        return doc
+    return {field: value for field, value in doc.items() if field in projection}
+
+
+def _text_score(terms: List[str], weighted_texts: List[Tuple[str, int]]) -> int:
+    """Pertinence approximative d'un document pour une recherche plein texte"""
+    score = 0
+    for text, weight in weighted_texts:
+        text = (text or '').lower()
+        score += weight * sum(text.count(term) for term in terms)
+    return score
+
+
+class _InMemoryDocumentRepository:
+    """Stockage commun des notes et des synthèses : documents par id, sous verrou"""
+
+    CODEC: DocumentCodec
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        # Clés (created_at, id) croissantes : les pages sont lues en ordre inverse
+        self._order: List[Tuple[Any, str]] = []
+        self._lock = threading.RLock()
+
+    def _decode(self, doc: Optional[Dict[str, Any]], projection: Optional[Dict[str, int]] = None):
+        if doc is None:
+            return None
+        # Copie : un modèle modifié ne doit pas modifier le document stocké
+        data = dict(_project(doc, projection))
+        if 'attachments' in data:
+            data['attachments'] = list(data['attachments'])
+        return self.CODEC.decode(data)
+
+    def _insert(self, doc: Dict[str, Any]):
+        if doc['id'] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error: id {doc['id']}")
+        self._docs[doc['id']] = doc
+        insort(self._order, _keyset_order(doc))
+
+    def _store(self, doc: Dict[str, Any]):
+        """Remplacer un document existant (created_at peut changer lors d'une réécriture)"""
+        self._unorder(self._docs[doc['id']])
+        self._docs[doc['id']] = doc
+        insort(self._order, _keyset_order(doc))
+
+    def _remove(self, model_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._docs.pop(model_id, None)
+        if doc is not None:
+            self._unorder(doc)
+        return doc
+
+    def _unorder(self, doc: Dict[str, Any]):
+        del self._order[bisect_left(self._order, _keyset_order(doc))]
+
+    def _sorted(self, query: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Documents dans l'ordre de KEYSET_SORT, filtrés par `query`"""
+        with self._lock:
+            docs = [self._docs[model_id] for _, model_id in reversed(self._order)]
+        return [doc for doc in docs if not query or _matches(doc, query)]
+
+    def _page(self, limit: int, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Jusqu'à `limit` documents après le curseur, par recherche dichotomique dans l'index trié"""
+        with self._lock:
+            end = len(self._order)
+            if cursor:
+                created_at, item_id = decode_cursor(cursor)
+                # Les documents en mémoire sont datés en datetime : comme dans le tri MongoDB,
+                # rien ne suit un curseur daté en chaîne
+                end = bisect_left(self._order, (created_at, item_id)) if isinstance(created_at, datetime) else 0
+            return [self._docs[model_id] for _, model_id in reversed(self._order[max(end - limit, 0):end])]
+
+    def create_many(self, models: List[Any], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Optional[Dict[str, Any]]]:
+        """Créer plusieurs modèles ; même résultat par élément que insert_many_in_chunks"""
+        errors: List[Optional[Dict[str, Any]]] = []
+        for model in models:
+            try:
+                self.create(model)
+                errors.append(None)
+            except DuplicateKeyError as e:
+                errors.append({'code': DUPLICATE_KEY_ERROR, 'message': str(e)})
+        return errors
+
+    def update_fields(self, model_id: str, changes: Dict[str, Any]):
+        with self._lock:
+            doc = self._docs.get(model_id)
+            if doc is None:
+                return None
+            self._on_replace(doc, {**doc, **changes})
+            doc.update(changes, updated_at=datetime.utcnow())
+            return self._decode(doc)
+
+    def _on_replace(self, old: Dict[str, Any], new: Dict[str, Any]):
+        """Mettre à jour les index secondaires avant une modification"""
+
+    def get_by_id(self, model_id: str, fields: Optional[List[str]] = None):
+        with self._lock:
+            return self._decode(self._docs.get(model_id), build_projection(fields, required=('updated_at',)))
+
+    def get_version(self, model_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            doc = self._docs.get(model_id)
+            return {'id': doc['id'], 'updated_at': doc['updated_at']} if doc else None
+
+    def collection_version(self) -> Tuple[int, Any, Optional[str]]:
+        with self._lock:
+            if not self._docs:
+                return 0, None, None
+            latest = max(self._docs.values(), key=lambda doc: (doc['updated_at'], doc['id']))
+            return len(self._docs), latest['updated_at'], latest['id']
+
+    def list_all(self, fields: Optional[List[str]] = None) -> List:
+        return list(self.iter_all(fields=fields))
+
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE, fields: Optional[List[str]] = None) -> Iterator:
+        projection = build_projection(fields)
+        with self._lock:
+            docs = list(self._docs.values())
+        return (self._decode(doc, projection) for doc in docs)
+
+    def list_page(self, limit: int, cursor: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> Tuple[List, Optional[str]]:
+        projection = build_projection(fields, required=('created_at',))
+        docs = self._page(limit + 1, cursor)
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]['created_at'], docs[-1]['id']) if has_more else None
+        return [self._decode(doc, projection) for doc in docs], next_cursor
+
+    def exists(self, model_id: str) -> bool:
+        return model_id in self._docs
+
+    def count(self, exact: bool = False) -> int:
+        return len(self._docs)
+
+
+class InMemoryNoteRepository(_InMemoryDocumentRepository):
+    """Équivalent en mémoire de NoteRepository"""
+
+    CODEC = NOTE_CODEC
+
+    def __init__(self, synthesis_repository: 'InMemorySynthesisRepository'):
+        super().__init__()
+        self.synthesis_repository = synthesis_repository
+
+    def create(self, note: Note) -> Note:
+        with self._lock:
+            self._insert(NOTE_CODEC.encode(note))
+        return note
+
+    def update(self, note: Note) -> Optional[Note]:
+        note.updated_at = datetime.utcnow()
+        with self._lock:
+            if note.id not in self._docs:
+                return None
+            self._store(NOTE_CODEC.encode(note))
+        return note
+
+    def get_many(self, note_ids: List[str], fields: Optional[List[str]] = None) -> List[Note]:
+        projection = build_projection(fields)
+        with self._lock:
+            return [self._decode(self._docs[note_id], projection) for note_id in note_ids if note_id in self._docs]
+
+    def find_with_related(self, include: Set[str], query: Optional[Dict[str, Any]] = None,
+                          fields: Optional[List[str]] = None, sort: Optional[List[Tuple[str, int]]] = None,
+                          limit: int = 0, read_profile: str = 'list') -> List[Tuple[Note, Dict[str, Any]]]:
+        # Seul KEYSET_SORT est utilisé par les appelants
+        if sort:
+            docs = self._sorted(query)
+        else:
+            with self._lock:
+                docs = [doc for doc in self._docs.values() if not query or _matches(doc, query)]
+        if limit:
+            docs = docs[:limit]
+        return self._with_related(docs, include, fields)
+
+    def _with_related(self, docs: List[Dict[str, Any]], include: Set[str],
+                      fields: Optional[List[str]] = None) -> List[Tuple[Note, Dict[str, Any]]]:
+        projection = build_projection(fields, required=('created_at', 'updated_at'))
+        results = []
+        for doc in docs:
+            related: Dict[str, Any] = {}
+            syntheses = self.synthesis_repository.list_by_note(doc['id'])
+            if 'syntheses' in include:
+                related['syntheses'] = sorted(syntheses, key=lambda synthesis: synthesis.created_at, reverse=True)
+            if 'synthesis_count' in include:
+                related['synthesis_count'] = len(syntheses)
+            results.append((self._decode(doc, projection), related))
+        return results
+
+    def get_with_related(self, note_id: str, include: Set[str],
+                         fields: Optional[List[str]] = None) -> Optional[Tuple[Note, Dict[str, Any]]]:
+        results = self.find_with_related(include, {'id': note_id}, fields=fields, limit=1)
+        return results[0] if results else None
+
+    def list_page_with_related(self, limit: int, include: Set[str], cursor: Optional[str] = None,
+                               fields: Optional[List[str]] = None) -> Tuple[List[Tuple[Note, Dict[str, Any]]], Optional[str]]:
+        results = self._with_related(self._page(limit + 1, cursor), include, fields)
+        has_more = len(results) > limit
+        results = results[:limit]
+        next_cursor = encode_cursor(results[-1][0].created_at, results[-1][0].id) if has_more else None
+        return results, next_cursor
+
+    def search(self, query: str, limit: int = 0, offset: int = 0,
+               fields: Optional[List[str]] = None) -> List[Note]:
+        return list(self.iter_search(query, limit=limit, offset=offset, fields=fields))
+
+    def iter_search(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                    limit: int = 0, offset: int = 0, fields: Optional[List[str]] = None) -> Iterator[Note]:
+        terms = query.lower().split()
+        with self._lock:
+            scored = [
+                (score, doc) for doc in self._docs.values()
+                for score in [_text_score(terms, [(doc.get('title'), 5), (doc.get('content'), 1)])]
+                if score
+            ]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        end = offset + limit if limit else None
+        projection = build_projection(fields)
+        return (self._decode(doc, projection) for _, doc in scored[offset:end])
+
+    def delete(self, note_id: str) -> bool:
+        with self._lock:
+            return self._remove(note_id) is not None
+
+
+class InMemorySynthesisRepository(_InMemoryDocumentRepository):
+    """Équivalent en mémoire de SynthesisRepository, avec un index secondaire sur note_id"""
+
+    CODEC = SYNTHESIS_CODEC
+
+    def __init__(self):
+        super().__init__()
+        self._by_note: Dict[str, Set[str]] = defaultdict(set)
+
+    def _index(self, doc: Dict[str, Any]):
+        if doc.get('note_id') is not None:
+            self._by_note[doc['note_id']].add(doc['id'])
+
+    def _unindex(self, doc: Dict[str, Any]):
+        ids = self._by_note.get(doc.get('note_id'))
+        if ids is not None:
+            ids.discard(doc['id'])
+            if not ids:
+                del self._by_note[doc['note_id']]
+
+    def _on_replace(self, old: Dict[str, Any], new: Dict[str, Any]):
+        self._unindex(old)
+        self._index(new)
+
+    def create(self, synthesis: Synthesis) -> Synthesis:
+        doc = SYNTHESIS_CODEC.encode(synthesis)
+        with self._lock:
+            self._insert(doc)
+            self._index(doc)
+        return synthesis
+
+    def update(self, synthesis: Synthesis) -> Optional[Synthesis]:
+        synthesis.updated_at = datetime.utcnow()
+        doc = SYNTHESIS_CODEC.encode(synthesis)
+        with self._lock:
+            old = self._docs.get(synthesis.id)
+            if old is None:
+                return None
+            self._on_replace(old, doc)
+            self._store(doc)
+        return synthesis
+
+    def _note_docs(self, note_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._docs[synthesis_id] for synthesis_id in self._by_note.get(note_id, ())]
+
+    def list_by_note(self, note_id: str, fields: Optional[List[str]] = None) -> List[Synthesis]:
+        projection = build_projection(fields)
+        return [self._decode(doc, projection) for doc in self._note_docs(note_id)]
+
+    def iter_by_note(self, note_id: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                     fields: Optional[List[str]] = None) -> Iterator[Synthesis]:
+        return iter(self.list_by_note(note_id, fields=fields))
+
+    def list_by_notes(self, note_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, List[Synthesis]]:
+        projection = build_projection(fields, required=('note_id',))
+        return {
+            note_id: [
+                self._decode(doc, projection)
+                for doc in sorted(self._note_docs(note_id), key=lambda doc: doc['created_at'], reverse=True)
+            ]
+            for note_id in note_ids
+        }
+
+    def delete(self, synthesis_id: str) -> bool:
+        with self._lock:
+            doc = self._remove(synthesis_id)
+            if doc is None:
+                return False
+            self._unindex(doc)
+            return True
+
+    def count_by_note(self, note_id: str) -> int:
+        return len(self._by_note.get(note_id, ()))
+
+    def count_attachments(self, synthesis_id: str) -> Optional[int]:
+        with self._lock:
+            doc = self._docs.get(synthesis_id)
+            return len(doc.get('attachments', [])) if doc else None
+
+    def reconcile_counters(self, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+        """Les compteurs sont calculés depuis les index : rien à réconcilier"""
+        return {}
+
+    def get_stats(self, group_by: Optional[str] = None) -> Dict[str, Any]:
+        if group_by is not None and group_by not in STATS_GROUP_KEYS:
+            raise ValueError(f"Regroupement invalide: {group_by}")
+        with self._lock:
+            docs = list(self._docs.values())
+
+        def accumulate(group_docs: List[Dict[str, Any]]) -> Dict[str, int]:
+            attachments = [attachment for doc in group_docs for attachment in doc.get('attachments', [])]
+            return SynthesisRepository._format_stats({
+                'total_syntheses': len(group_docs),
+                'generated_syntheses': sum(1 for doc in group_docs if doc.get('is_generated') is True),
+                'total_attachments': len(attachments),
+                'audio_attachments': sum(1 for a in attachments if a.get('type') == AttachmentType.AUDIO.value),
+                'document_attachments': sum(1 for a in attachments if a.get('type') == AttachmentType.DOCUMENT.value),
+            })
+
+        stats = accumulate(docs)
+        if group_by:
+            groups: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+            for doc in docs:
+                key = doc.get('note_id') if group_by == 'note' else doc['created_at'].strftime('%Y-%m-%d')
+                groups[key].append(doc)
+            stats[f'by_{group_by}'] = [
+                {group_by: key, **accumulate(groups[key])}
+                for key in sorted(groups, key=lambda key: (key is not None, key))
+            ]
+        return stats
+
+    def add_attachment_to_synthesis(self, synthesis_id: str, url: str, attachment_type: AttachmentType,
+                                    name: Optional[str] = None, size: Optional[int] = None) -> Optional[Synthesis]:
+        attachment = Attachment(url=url, type=attachment_type, name=name, size=size)
+        return self.add_attachments_to_synthesis(synthesis_id, [attachment])
+
+    def add_attachments_to_synthesis(self, synthesis_id: str, attachments: List[Attachment]) -> Optional[Synthesis]:
+        with self._lock:
+            doc = self._docs.get(synthesis_id)
+            if doc is None:
+                return None
+            doc['attachments'] = doc.get('attachments', []) + [ATTACHMENT_CODEC.encode(a) for a in attachments]
+            doc['updated_at'] = datetime.utcnow()
+            return self._decode(doc)
+
+    def remove_attachment_from_synthesis(self, synthesis_id: str, url: str) -> Optional[Synthesis]:
+        with self._lock:
+            doc = self._docs.get(synthesis_id)
+            if doc is None or not any(a.get('url') == url for a in doc.get('attachments', [])):
+                return None
+            doc['attachments'] = [a for a in doc['attachments'] if a.get('url') != url]
+            doc['updated_at'] = datetime.utcnow()
+            return self._decode(doc)
+
+    def get_attachments_by_type(self, synthesis_id: str, attachment_type: AttachmentType) -> List[Attachment]:
+        synthesis = self.get_by_id(synthesis_id)
+        return synthesis.get_attachments_by_type(attachment_type) if synthesis else []
+
+    def search_by_title(self, title: str, limit: int = 0, offset: int = 0,
+                        fields: Optional[List[str]] = None) -> List[Synthesis]:
+        return list(self.iter_search_by_title(title, limit=limit, offset=offset, fields=fields))
+
+    def iter_search_by_title(self, title: str, batch_size: int = DEFAULT_BATCH_SIZE, limit: int = 0,
+                             offset: int = 0, fields: Optional[List[str]] = None) -> Iterator[Synthesis]:
+        terms = title.lower().split()
+        with self._lock:
+            scored = [
+                (score, doc) for doc in self._docs.values()
+                for score in [_text_score(terms, [(doc.get('title'), 1)])]
+                if score
+            ]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        end = offset + limit if limit else None
+        projection = build_projection(fields)
+        return (self._decode(doc, projection) for _, doc in scored[offset:end])
+
+
+class InMemoryUserRepository:
+    """Équivalent en mémoire de UserRepository, avec des index uniques sur username et email"""
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._by_username: Dict[str, str] = {}
+        self._by_email: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _decode(self, user_id: Optional[str]) -> Optional[User]:
+        doc = self._docs.get(user_id) if user_id is not None else None
+        return USER_CODEC.decode(dict(doc)) if doc else None
+
+    def create(self, user: User) -> User:
+        doc = USER_CODEC.encode(user)
+        with self._lock:
+            if user.id in self._docs or user.username in self._by_username or user.email in self._by_email:
+                raise DuplicateKeyError(f"E11000 duplicate key error: user {user.username}")
+            self._docs[user.id] = doc
+            self._by_username[user.username] = user.id
+            self._by_email[user.email] = user.id
+        return user
+
+    def get_by_id(self, user_id: str) -> Optional[User]:
+        with self._lock:
+            return self._decode(user_id)
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        with self._lock:
+            return self._decode(self._by_username.get(username))
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        with self._lock:
+            return self._decode(self._by_email.get(email))
+
+    def update_last_login(self, user_id: str):
+        with self._lock:
+            doc = self._docs.get(user_id)
+            if doc is not None:
+                doc['last_login'] = datetime.utcnow()
@@ -0,0 +1,377 @@
+"""
+Cache de lecture (read-through) devant les get_by_id des repositories
+Le cache conserve les documents MongoDB, pas les modèles (mutables) : chaque lecture
+décode un modèle neuf via le codec. create/update/delete invalident l'entrée.
+Chaque invalidation incrémente la génération de la clé : un document chargé avant une
+invalidation (donc potentiellement périmé) n'est pas stocké.
+"""
+
+import itertools
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from bson import BSON
+from cachetools import TTLCache
+from app.config.cache_config import CacheConfig
+from app.logger_config import get_logger
+from app.repository.codec import DocumentCodec
+
+logger = get_logger('model_cache')
+
+# Caches construits par les repositories, par espace de noms (pour les statistiques)
+_registry: Dict[str, 'ModelCache'] = {}
+
+REDIS_PREFIX = 'feather_book:model:'
+
+
+def _redis_generation_keys(prefix: str):
+    """Clés des générations partagées : préfixe par clé, et génération de tout le cache
+
+    Hors du préfixe des entrées, que clear et __len__ parcourent.
+    """
+    return prefix.rstrip(':') + '-generation:', prefix.rstrip(':') + '-epoch'
+
+
+class _EvictionCountingTTLCache(TTLCache):
+    """TTLCache qui signale les évictions LRU dues à la taille maximale"""
+
+    def __init__(self, maxsize, ttl, on_evict: Callable[[], None]):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_evict = on_evict
+
+    def popitem(self):
+        item = super().popitem()
+        self._on_evict()
+        return item
+
+
+class LocalDocumentCache:
+    """Backend en mémoire du processus : LRU borné avec expiration (TTL)
+
+    `max_age` (secondes) raccourcit la durée de vie des entrées sans reconstruire le
+    cache, par exemple tant que les invalidations entre workers sont interrompues.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.evictions = 0
+        self.max_age: Optional[float] = None
+        self._cache = _EvictionCountingTTLCache(maxsize, ttl, self._count_eviction)
+        # Génération des clés invalidées récemment (numéro d'invalidation), et de tout le cache
+        self._generations = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._sequence = itertools.count(1)
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _count_eviction(self):
+        self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            doc, stored_at = entry
+            if self.max_age is not None and time.monotonic() - stored_at > self.max_age:
+                del self._cache[key]
+                return None
+            return doc
+
+    def generation(self, key: str) -> Any:
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key: str, doc: Dict[str, Any], generation: Any = None) -> bool:
+        """Stocker un document, sauf si la clé a été invalidée depuis `generation`"""
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                return False
+            self._cache[key] = (doc, time.monotonic())
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._generations[key] = next(self._sequence)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class RedisDocumentCache:
+    """Backend partagé entre workers, documents encodés en BSON (nécessite le paquet redis)"""
+
+    def __init__(self, url: str, ttl: float, prefix: str = REDIS_PREFIX):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Le backend de cache 'redis' nécessite le paquet redis") from e
+        self.evictions = 0
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self._ttl_ms = int(ttl * 1000)
+        self._prefix = prefix
+        # Générations partagées par tous les workers
+        self._generation_prefix, self._epoch_key = _redis_generation_keys(prefix)
+
+    def _generation_keys(self, key: str) -> List[str]:
+        return [self._epoch_key, self._generation_prefix + key]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(self._prefix + key)
+        return BSON(raw).decode() if raw is not None else None
+
+    def generation(self, key: str) -> Any:
+        return tuple(self._client.mget(self._generation_keys(key)))
+
+    def set(self, key: str, doc: Dict[str, Any], generation: Any = None) -> bool:
+        """Stocker un document, sauf si la clé a été invalidée depuis `generation` (WATCH)"""
+        if generation is None:
+            self._client.set(self._prefix + key, BSON.encode(doc), px=self._ttl_ms)
+            return True
+        generation_keys = self._generation_keys(key)
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(*generation_keys)
+                if tuple(pipe.mget(generation_keys)) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(self._prefix + key, BSON.encode(doc), px=self._ttl_ms)
+                pipe.execute()
+                return True
+            except self._redis.WatchError:
+                return False
+
+    def delete(self, key: str):
+        generation_key = self._generation_prefix + key
+        with self._client.pipeline() as pipe:
+            pipe.delete(self._prefix + key)
+            pipe.incr(generation_key)
+            # Une génération ne sert qu'aux chargements en cours : elle expire avec les entrées
+            pipe.pexpire(generation_key, self._ttl_ms)
+            pipe.execute()
+
+    def clear(self):
+        self._client.incr(self._epoch_key)
+        keys = list(self._client.scan_iter(match=self._prefix + '*'))
+        if keys:
+            self._client.delete(*keys)
+
+    def __len__(self):
+        return sum(1 for _ in self._client.scan_iter(match=self._prefix + '*'))
+
+
+class AsyncRedisInvalidator:
+    """Invalidation du backend redis depuis l'application ASGI (client redis.asyncio)
+
+    Mêmes clés que RedisDocumentCache : une écriture asynchrone retire l'entrée partagée
+    et change sa génération, comme une écriture des repositories synchrones.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = REDIS_PREFIX):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("Le backend de cache 'redis' nécessite le paquet redis") from e
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._ttl_ms = int(ttl * 1000)
+        self._prefix = prefix
+        self._generation_prefix, _ = _redis_generation_keys(prefix)
+
+    async def invalidate(self, namespace: str, model_id: str):
+        key = f"{namespace}:{model_id}"
+        generation_key = self._generation_prefix + key
+        async with self._client.pipeline() as pipe:
+            pipe.delete(self._prefix + key)
+            pipe.incr(generation_key)
+            pipe.pexpire(generation_key, self._ttl_ms)
+            await pipe.execute()
+
+
+class NullDocumentCache:
+    """Backend désactivé : toutes les lectures vont à MongoDB"""
+
+    evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    def generation(self, key: str) -> Any:
+        return None
+
+    def set(self, key: str, doc: Dict[str, Any], generation: Any = None) -> bool:
+        return False
+
+    def delete(self, key: str):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class ModelCache:
+    """Cache read-through des modèles d'une collection, avec compteurs"""
+
+    def __init__(self, namespace: str, codec: DocumentCodec, backend):
+        self.namespace = namespace
+        self.codec = codec
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Chargements non stockés : la clé a été invalidée pendant la lecture MongoDB
+        self.stale_loads = 0
+        # _id MongoDB -> id des documents stockés dans le backend local, pour invalider
+        # les suppressions vues par change stream (qui ne donnent que l'_id)
+        self._object_ids: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, model_id: str) -> str:
+        return f"{self.namespace}:{model_id}"
+
+    def get_or_load(self, model_id: str, loader: Callable[[], Optional[Dict[str, Any]]],
+                    cacheable: bool = True):
+        """Retourner le modèle depuis le cache, ou le charger via `loader` en cas d'absence
+
+        Args:
+            model_id: Identifiant du modèle
+            loader: Fonction renvoyant le document MongoDB (ou None)
+            cacheable: False si `loader` renvoie un document partiel (projection)
+        """
+        key = self._key(model_id)
+        doc = self.backend.get(key)
+        if doc is not None:
+            with self._lock:
+                self.hits += 1
+            # Copie de surface : le décodage réécrit les champs de premier niveau
+            return self.codec.decode(dict(doc))
+
+        with self._lock:
+            self.misses += 1
+        # Génération lue avant le chargement : une écriture suivie de son invalidation
+        # pendant la lecture MongoDB la change, et le document lu n'est pas stocké
+        generation = self.backend.generation(key) if cacheable else None
+        doc = loader()
+        if doc is None:
+            return None
+        if cacheable:
+            object_id = doc.pop('_id', None)
+            if self.backend.set(key, dict(doc), generation):
+                self._remember_object_id(object_id, model_id)
+            elif generation is not None:
+                with self._lock:
+                    self.stale_loads += 1
+        return self.codec.decode(doc)
+
+    def _remember_object_id(self, object_id: Any, model_id: str):
+        if object_id is None or not isinstance(self.backend, LocalDocumentCache):
+            return
+        with self._lock:
+            self._object_ids[object_id] = model_id
+            if len(self._object_ids) > 2 * CacheConfig.MODEL_CACHE_MAX_ENTRIES:
+                # Oublier les documents sortis du cache (expirés, évincés ou invalidés)
+                self._object_ids = {
+                    oid: mid for oid, mid in self._object_ids.items() if self.backend.get(self._key(mid)) is not None
+                }
+
+    def invalidate(self, model_id: str):
+        """Retirer un modèle du cache après une écriture"""
+        self.backend.delete(self._key(model_id))
+        with self._lock:
+            self.invalidations += 1
+
+    def invalidate_object_id(self, object_id: Any) -> bool:
+        """Invalider le document d'_id MongoDB donné, s'il a été stocké par ce processus"""
+        with self._lock:
+            model_id = self._object_ids.pop(object_id, None)
+        if model_id is None:
+            return False
+        self.invalidate(model_id)
+        return True
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self._object_ids.clear()
+
+    def set_max_age(self, max_age: Optional[float]):
+        """Limiter l'âge des entrées du backend local (None : TTL configuré seul)"""
+        if isinstance(self.backend, LocalDocumentCache):
+            self.backend.max_age = max_age
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache"""
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.evictions,
+            'invalidations': self.invalidations,
+            'stale_loads': self.stale_loads,
+        }
+
+
+def local_cache_ttl() -> float:
+    """TTL du backend local : sans change stream, une écriture d'un autre worker n'invalide
+    pas ce cache, le TTL est alors plafonné à MODEL_CACHE_LOCAL_MAX_TTL_SECONDS"""
+    if CacheConfig.MODEL_CACHE_INVALIDATION.lower() == 'change_stream':
+        return CacheConfig.MODEL_CACHE_TTL_SECONDS
+    return min(CacheConfig.MODEL_CACHE_TTL_SECONDS, CacheConfig.MODEL_CACHE_LOCAL_MAX_TTL_SECONDS)
+
+
+def build_model_cache(namespace: str, codec: DocumentCodec) -> ModelCache:
+    """Construire le cache d'une collection selon CacheConfig et l'enregistrer"""
+    backend_name = CacheConfig.MODEL_CACHE_BACKEND.lower()
+    if backend_name == 'local':
+        backend = LocalDocumentCache(CacheConfig.MODEL_CACHE_MAX_ENTRIES, local_cache_ttl())
+    elif backend_name == 'redis':
+        backend = RedisDocumentCache(CacheConfig.MODEL_CACHE_REDIS_URL, CacheConfig.MODEL_CACHE_TTL_SECONDS)
+    elif backend_name == 'none':
+        backend = NullDocumentCache()
+    else:
+        raise ValueError(f"Backend de cache inconnu: {CacheConfig.MODEL_CACHE_BACKEND}")
+
+    cache = ModelCache(namespace, codec, backend)
+    _registry[namespace] = cache
+    logger.info(f"Cache de lecture '{namespace}' initialisé ({type(backend).__name__})")
+    return cache
+
+
+def build_async_cache_invalidator(namespace: str) -> Optional[Callable[[str], Awaitable[None]]]:
+    """Invalidation des caches de lecture par les écritures asynchrones
+
+    Seul le backend redis est partagé avec les workers Flask : avec le backend local, les
+    écritures ASGI n'atteignent les caches des autres processus que par le change stream
+    (MODEL_CACHE_INVALIDATION=change_stream), sinon les entrées expirent après leur TTL.
+    Retourne None si aucune invalidation directe n'est possible.
+    """
+    if CacheConfig.MODEL_CACHE_BACKEND.lower() != 'redis':
+        return None
+    invalidator = AsyncRedisInvalidator(CacheConfig.MODEL_CACHE_REDIS_URL, CacheConfig.MODEL_CACHE_TTL_SECONDS)
+
+    async def invalidate(model_id: str):
+        await invalidator.invalidate(namespace, model_id)
+    return invalidate
+
+
+def get_model_cache(namespace: str) -> Optional[ModelCache]:
+    """Cache de lecture construit pour une collection, s'il existe dans ce processus"""
+    return _registry.get(namespace)
+
+
+def registered_caches() -> List[ModelCache]:
+    """Tous les caches de lecture construits dans ce processus"""
+    return list(_registry.values())
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Compteurs de tous les caches de lecture construits"""
+    return {namespace: cache.stats() for namespace, cache in _registry.items()}
@@ -1,93 +1,242 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from pymongo import ASCENDING, TEXT, IndexModel, ReturnDocument
 from app.mongodb_connector import mongodb_connector
 from app.models.model import Note
+from app.repository.codec import NOTE_CODEC, SYNTHESIS_CODEC, touch
+from app.repository.synthesis_repository import SynthesisRepository
+from app.repository.model_cache import build_model_cache
+from app.utils.pagination import KEYSET_SORT, encode_cursor, keyset_query
+from app.utils.streaming import DEFAULT_BATCH_SIZE
+from app.utils.projection import build_projection
+from app.utils.etag import VERSION_PROJECTION, VERSION_SORT
+from app.utils.bulk import DEFAULT_CHUNK_SIZE, insert_many_in_chunks
+
+
+# Relations résolubles par le paramètre `include`
+INCLUDE_OPTIONS = ('syntheses', 'synthesis_count')
+
+
+def _related_stages(include: Set[str]) -> List[Dict[str, Any]]:
+    """Étapes d'agrégation joignant les synthèses de chaque note (`$lookup` sur note_id)"""
+    with_syntheses = 'syntheses' in include
+    stages = [{'$lookup': {
+        'from': SynthesisRepository.COLLECTION_NAME,
+        'localField': 'id',
+        'foreignField': 'note_id',
+        # Servi par l'index (note_id, created_at) ; pour un simple comptage seul _id est lu
+        'pipeline': [
+            {'$sort': {'created_at': -1}},
+            {'$project': {'_id': 0} if with_syntheses else {'_id': 1}},
+        ],
+        'as': '_syntheses',
+    }}]
+    if 'synthesis_count' in include:
+        stages.append({'$addFields': {'_synthesis_count': {'$size': '$_syntheses'}}})
+    if not with_syntheses:
+        stages.append({'$project': {'_syntheses': 0}})
+    return stages
 
 
 class NoteRepository:
     COLLECTION_NAME = 'notes'
     
+    # Index déclarés, réconciliés par app.repository.index_manager
+    INDEXES = [
+        IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+        IndexModel(KEYSET_SORT, name='created_at_id_keyset'),
+        IndexModel(VERSION_SORT, name='updated_at_id_version'),
+        IndexModel(
+            [('title', TEXT), ('content', TEXT)],
+            name='title_content_text',
+            weights={'title': 5, 'content': 1},
+            default_language='french',
+        ),
+    ]
+    
+    @property
+    def collection(self):
+        """Collection du processus courant (le client MongoDB est créé au premier usage)"""
+        return mongodb_connector.get_collection(self.COLLECTION_NAME)
+    
+    def read_collection(self, profile: str):
+        """Collection lue avec un profil de lecture (`list`, `search`, `stats`, voir mongodb_config)"""
+        return mongodb_connector.get_collection(self.COLLECTION_NAME, read_profile=profile)
+    
     def __init__(self):
-        self.collection = mongodb_connector.get_collection(self.COLLECTION_NAME)
+        self.cache = build_model_cache(self.COLLECTION_NAME, NOTE_CODEC)
     
     def create(self, note: Note) -> Note:
         """Créer une nouvelle note"""
-        note_dict = note.to_dict()
-        
-        # Convert datetime objects to ISO format for MongoDB
-        if 'created_at' in note_dict and note_dict['created_at']:
-            note_dict['created_at'] = note_dict['created_at'].isoformat()
-        if 'updated_at' in note_dict and note_dict['updated_at']:
-            note_dict['updated_at'] = note_dict['updated_at'].isoformat()
-        
         # Insert note into MongoDB
-        self.collection.insert_one(note_dict)
+        self.collection.insert_one(NOTE_CODEC.encode(note))
+        self.cache.invalidate(note.id)
         
         return note
 
-    def update(self, note: Note) -> Note:
-        """Mettre à jour une note existante"""
-        note_dict = note.to_dict()
-        
-        # Convert datetime objects to ISO format for MongoDB
-        if 'created_at' in note_dict and note_dict['created_at']:
-            note_dict['created_at'] = note_dict['created_at'].isoformat()
-        if 'updated_at' in note_dict and note_dict['updated_at']:
-            note_dict['updated_at'] = note_dict['updated_at'].isoformat()
-        
-        # Update note in MongoDB
-        self.collection.update_one(
-            {'id': note.id},
-            {'$set': note_dict}
+    def create_many(self, notes: List[Note], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Optional[Dict[str, Any]]]:
+        """Créer plusieurs notes par insert_many non ordonnés de `chunk_size` notes
+
+        Retourne, pour chaque note, None si elle a été insérée, sinon l'erreur MongoDB.
+        """
+        return insert_many_in_chunks(self.collection, [NOTE_CODEC.encode(note) for note in notes], chunk_size)
+
+    def update(self, note: Note) -> Optional[Note]:
+        """Mettre à jour une note existante (None si elle n'existe pas)"""
+        changes = NOTE_CODEC.encode(note)
+        for field in ('id', 'created_at', 'updated_at'):
+            changes.pop(field)
+        return self.update_fields(note.id, changes)
+
+    def update_fields(self, note_id: str, changes: Dict[str, Any]) -> Optional[Note]:
+        """Mettre à jour seulement les champs modifiés d'une note, en un aller-retour
+
+        Retourne la note à jour, ou None si elle n'existe pas.
+        """
+        doc = self.collection.find_one_and_update(
+            {'id': note_id},
+            touch({'$set': changes}),
+            return_document=ReturnDocument.AFTER
         )
-        
-        return note
+        self.cache.invalidate(note_id)
+        return NOTE_CODEC.decode(doc)
 
-    def get_by_id(self, note_id: str) -> Optional[Note]:
-        """Récupérer une note par son ID"""
-        doc = self.collection.find_one({'id': note_id})
-        
-        if not doc:
-            return None
-        
-        # Convert ObjectId to string and handle datetime conversion
-        doc['_id'] = str(doc['_id'])
-        if 'created_at' in doc and isinstance(doc['created_at'], str):
-            from datetime import datetime
-            doc['created_at'] = datetime.fromisoformat(doc['created_at'].replace('Z', '+00:00'))
-        if 'updated_at' in doc and isinstance(doc['updated_at'], str):
-            from datetime import datetime
-            doc['updated_at'] = datetime.fromisoformat(doc['updated_at'].replace('Z', '+00:00'))
-        
-        return Note.from_dict(doc)
+    def get_by_id(self, note_id: str, fields: Optional[List[str]] = None) -> Optional[Note]:
+        """Récupérer une note par son ID (seulement les champs `fields` si fournis)
+
+        Servi par le cache de lecture ; une projection n'est demandée à MongoDB
+        qu'en cas d'absence du cache et son résultat partiel n'y est pas stocké.
+        """
+        return self.cache.get_or_load(
+            note_id,
+            lambda: self.collection.find_one({'id': note_id}, build_projection(fields, required=('updated_at',))),
+            cacheable=fields is None,
+        )
+
+    def get_many(self, note_ids: List[str], fields: Optional[List[str]] = None) -> List[Note]:
+        """Récupérer plusieurs notes en une requête `$in`, dans l'ordre des identifiants
+
+        Les identifiants inconnus sont ignorés.
+        """
+        notes = {note.id: note for note in NOTE_CODEC.decode_many(
+            self.collection.find({'id': {'$in': note_ids}}, build_projection(fields))
+        )}
+        return [notes[note_id] for note_id in note_ids if note_id in notes]
 
-    def list_all(self) -> List[Note]:
+    def get_version(self, note_id: str) -> Optional[Dict[str, Any]]:
+        """Récupérer l'id et la date de modification d'une note, sans hydrater le document"""
+        return NOTE_CODEC.normalize(self.collection.find_one({'id': note_id}, VERSION_PROJECTION))
+
+    def collection_version(self) -> Tuple[int, Any, Optional[str]]:
+        """Résumer l'état de la collection : nombre de notes et dernière modification"""
+        # Même profil que les listes : l'ETag décrit les données que la liste renverra
+        collection = self.read_collection('list')
+        latest = NOTE_CODEC.normalize(collection.find_one({}, VERSION_PROJECTION, sort=VERSION_SORT)) or {}
+        return collection.estimated_document_count(), latest.get('updated_at'), latest.get('id')
+
+    def list_all(self, fields: Optional[List[str]] = None) -> List[Note]:
         """Récupérer toutes les notes"""
-        docs = self.collection.find()
+        return list(self.iter_all(fields=fields))
+
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE, fields: Optional[List[str]] = None) -> Iterator[Note]:
+        """Parcourir toutes les notes sans les charger toutes en mémoire"""
+        cursor = self.read_collection('list').find({}, build_projection(fields)).batch_size(batch_size)
+        return NOTE_CODEC.decode_many(cursor)
+
+    def list_page(self, limit: int, cursor: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> Tuple[List[Note], Optional[str]]:
+        """Récupérer une page de notes après le curseur donné"""
+        # Un document de plus que demandé indique s'il reste une page suivante
+        docs = list(
+            self.read_collection('list').find(keyset_query(cursor), build_projection(fields, required=('created_at',)))
+            .sort(KEYSET_SORT)
+            .limit(limit + 1)
+        )
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]['created_at'], docs[-1]['id']) if has_more else None
         
-        notes: List[Note] = []
-        for doc in docs:
-            # Convert ObjectId to string and handle datetime conversion
-            doc['_id'] = str(doc['_id'])
-            if 'created_at' in doc and isinstance(doc['created_at'], str):
-                from datetime import datetime
-                doc['created_at'] = datetime.fromisoformat(doc['created_at'].replace('Z', '+00:00'))
-            if 'updated_at' in doc and isinstance(doc['updated_at'], str):
-                from datetime import datetime
-                doc['updated_at'] = datetime.fromisoformat(doc['updated_at'].replace('Z', '+00:00'))
-            
-            notes.append(Note.from_dict(doc))
+        return list(NOTE_CODEC.decode_many(docs)), next_cursor
+
+    def find_with_related(self, include: Set[str], query: Optional[Dict[str, Any]] = None,
+                          fields: Optional[List[str]] = None, sort: Optional[List[Tuple[str, int]]] = None,
+                          limit: int = 0, read_profile: str = 'list') -> List[Tuple[Note, Dict[str, Any]]]:
+        """Récupérer des notes et leurs relations (`include`) en une seule agrégation
+
+        Retourne des couples (note, relations) où relations contient `syntheses`
+        et/ou `synthesis_count` selon `include`.
+        """
+        pipeline: List[Dict[str, Any]] = [{'$match': query or {}}]
+        if sort:
+            pipeline.append({'$sort': dict(sort)})
+        if limit:
+            pipeline.append({'$limit': limit})
+        projection = build_projection(fields, required=('created_at', 'updated_at'))
+        if projection:
+            pipeline.append({'$project': projection})
+        pipeline.extend(_related_stages(include))
         
-        return notes
+        results = []
+        for doc in self.read_collection(read_profile).aggregate(pipeline):
+            related: Dict[str, Any] = {}
+            if 'syntheses' in include:
+                related['syntheses'] = list(SYNTHESIS_CODEC.decode_many(doc.pop('_syntheses')))
+            if 'synthesis_count' in include:
+                related['synthesis_count'] = doc.pop('_synthesis_count')
+            results.append((NOTE_CODEC.decode(doc), related))
+        return results
+
+    def get_with_related(self, note_id: str, include: Set[str],
+                         fields: Optional[List[str]] = None) -> Optional[Tuple[Note, Dict[str, Any]]]:
+        """Récupérer une note et ses relations (`include`) en une seule agrégation"""
+        results = self.find_with_related(include, {'id': note_id}, fields=fields, limit=1, read_profile='primary')
+        return results[0] if results else None
+
+    def list_page_with_related(self, limit: int, include: Set[str], cursor: Optional[str] = None,
+                               fields: Optional[List[str]] = None) -> Tuple[List[Tuple[Note, Dict[str, Any]]], Optional[str]]:
+        """Récupérer une page de notes et leurs relations après le curseur donné"""
+        # Un document de plus que demandé indique s'il reste une page suivante
+        results = self.find_with_related(include, keyset_query(cursor), fields=fields, sort=KEYSET_SORT, limit=limit + 1)
+        has_more = len(results) > limit
+        results = results[:limit]
+        next_cursor = encode_cursor(results[-1][0].created_at, results[-1][0].id) if has_more else None
+        return results, next_cursor
+
+    def search(self, query: str, limit: int = 0, offset: int = 0,
+               fields: Optional[List[str]] = None) -> List[Note]:
+        """Rechercher des notes par titre et contenu, triées par pertinence"""
+        return list(self.iter_search(query, limit=limit, offset=offset, fields=fields))
+
+    def iter_search(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                    limit: int = 0, offset: int = 0, fields: Optional[List[str]] = None) -> Iterator[Note]:
+        """Parcourir les notes correspondant à la recherche, par pertinence"""
+        projection = build_projection(fields) or {}
+        projection['score'] = {'$meta': 'textScore'}
+        # Recherche plein texte servie par l'index `title_content_text` (limit=0 : pas de limite)
+        docs = (
+            self.read_collection('search').find({'$text': {'$search': query}}, projection)
+            .sort([('score', {'$meta': 'textScore'})])
+            .skip(offset)
+            .limit(limit)
+            .batch_size(batch_size)
+        )
+        return NOTE_CODEC.decode_many(docs)
 
     def delete(self, note_id: str) -> bool:
         """Supprimer une note par son ID"""
         result = self.collection.delete_one({'id': note_id})
+        self.cache.invalidate(note_id)
         return result.deleted_count > 0
 
     def exists(self, note_id: str) -> bool:
         """Vérifier si une note existe"""
         return self.collection.count_documents({'id': note_id}) > 0
 
-    def count(self) -> int:
-        """Compter le nombre total de notes"""
-        return self.collection.count_documents({})
\ No newline at end of file
+    def count(self, exact: bool = False) -> int:
+        """Compter le nombre total de notes
+
+        Par défaut, lu dans les métadonnées de la collection (`estimated_document_count`,
+        sans parcours) ; `exact=True` compte les documents.
+        """
+        if exact:
+            return self.read_collection('stats').count_documents({})
+        return self.read_collection('stats').estimated_document_count()
\ No newline at end of file
@@ -2,14 +2,24 @@
 Factory pour créer les instances des repositories
 """
 
+from app.config.repository_config import RepositoryConfig
 from app.repository.note_repository import NoteRepository
 from app.repository.synthesis_repository import SynthesisRepository
 from app.repository.user_repository import UserRepository
 
+REPOSITORY_BACKENDS = ('mongodb', 'memory')
+
 class RepositoryFactory:
     """Factory pour créer les instances des repositories"""
     
-    def __init__(self):
+    def __init__(self, backend: str = None):
+        """
+        Args:
+            backend: 'mongodb' ou 'memory' (par défaut RepositoryConfig.REPOSITORY_BACKEND)
+        """
+        self.backend = backend or RepositoryConfig.REPOSITORY_BACKEND
+        if self.backend not in REPOSITORY_BACKENDS:
+            raise ValueError(f"Backend de repository inconnu: {self.backend}")
         self._note_repository = None
         self._synthesis_repository = None
         self._user_repository = None
@@ -18,21 +28,33 @@ class RepositoryFactory:
     def note_repository(self) -> NoteRepository:
         """Récupérer l'instance du NoteRepository"""
         if self._note_repository is None:
-            self._note_repository = NoteRepository()
+            if self.backend == 'memory':
+                from app.repository.memory_repository import InMemoryNoteRepository
+                self._note_repository = InMemoryNoteRepository(self.synthesis_repository)
+            else:
+                self._note_repository = NoteRepository()
         return self._note_repository
     
     @property
     def synthesis_repository(self) -> SynthesisRepository:
         """Récupérer l'instance du SynthesisRepository"""
         if self._synthesis_repository is None:
-            self._synthesis_repository = SynthesisRepository()
+            if self.backend == 'memory':
+                from app.repository.memory_repository import InMemorySynthesisRepository
+                self._synthesis_repository = InMemorySynthesisRepository()
+            else:
+                self._synthesis_repository = SynthesisRepository()
         return self._synthesis_repository
 
     @property
     def user_repository(self) -> UserRepository:
-        """Récupérer l'instance du SynthesisRepository"""
+        """Récupérer l'instance du UserRepository"""
         if self._user_repository is None:
-            self._user_repository = UserRepository()
+            if self.backend == 'memory':
+                from app.repository.memory_repository import InMemoryUserRepository
+                self._user_repository = InMemoryUserRepository()
+            else:
+                self._user_repository = UserRepository()
         return self._user_repository
     
     def reset(self):
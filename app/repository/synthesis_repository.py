@@ -1,159 +1,431 @@
-from typing import List, Optional
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from cachetools import TTLCache
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument
 from app.mongodb_connector import mongodb_connector
 from app.models.model import Synthesis, Attachment, AttachmentType
+from app.utils.pagination import KEYSET_SORT, encode_cursor, keyset_query
+from app.utils.streaming import DEFAULT_BATCH_SIZE
+from app.utils.projection import build_projection
+from app.utils.etag import VERSION_PROJECTION, VERSION_SORT
+from app.utils.bulk import DEFAULT_CHUNK_SIZE, insert_many_in_chunks
+from app.config.cache_config import CacheConfig
+from app.repository.codec import ATTACHMENT_CODEC, SYNTHESIS_CODEC, apply_set, stamp, touch
+from app.repository.model_cache import build_model_cache
+from app.repository.counter_repository import NOTE_SYNTHESES, SYNTHESIS_ATTACHMENTS, CounterRepository
+
+
+def _count_attachments_of_type(attachment_type: AttachmentType) -> Dict[str, Any]:
+    """Expression d'agrégation comptant les attachments d'un type donné"""
+    return {'$size': {'$filter': {
+        'input': {'$ifNull': ['$attachments', []]},
+        'as': 'attachment',
+        'cond': {'$eq': ['$$attachment.type', attachment_type.value]},
+    }}}
+
+
+# Accumulateurs $group partagés par les statistiques globales et groupées
+STATS_ACCUMULATORS = {
+    'total_syntheses': {'$sum': 1},
+    'generated_syntheses': {'$sum': {'$cond': [{'$eq': ['$is_generated', True]}, 1, 0]}},
+    'total_attachments': {'$sum': {'$size': {'$ifNull': ['$attachments', []]}}},
+    'audio_attachments': {'$sum': _count_attachments_of_type(AttachmentType.AUDIO)},
+    'document_attachments': {'$sum': _count_attachments_of_type(AttachmentType.DOCUMENT)},
+}
+
+# Clés de regroupement disponibles pour les statistiques
+STATS_GROUP_KEYS = {
+    'note': '$note_id',
+    # $toDate accepte aussi bien les dates BSON que les chaînes ISO
+    'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': {'$toDate': '$created_at'}}},
+}
+
+
+# Variations des compteurs, partagées par les repositories synchrone et asynchrone
+
+def created_attachment_counts(syntheses: Iterable[Synthesis]) -> List[Tuple[str, int]]:
+    """Compteurs d'attachments de synthèses créées"""
+    # Compteur créé même à zéro : son absence signale une synthèse non comptée
+    return [(synthesis.id, len(synthesis.attachments)) for synthesis in syntheses]
+
+
+def created_note_deltas(syntheses: Iterable[Synthesis]) -> Dict[str, int]:
+    """Synthèses ajoutées à chaque note par la création de `syntheses`"""
+    return dict(Counter(synthesis.note_id for synthesis in syntheses if synthesis.note_id is not None))
+
+
+def moved_note_deltas(old_note_id: Optional[str], new_note_id: Optional[str]) -> Dict[Optional[str], int]:
+    """Report d'une synthèse d'une note sur une autre"""
+    if old_note_id == new_note_id:
+        return {}
+    return {old_note_id: -1, new_note_id: 1}
+
+
+def note_counts_pipeline(note_ids: List[str]) -> List[Dict[str, Any]]:
+    """Agrégation comptant les synthèses de chaque note (compteurs absents)"""
+    return [
+        {'$match': {'note_id': {'$in': note_ids}}},
+        {'$group': {'_id': '$note_id', 'count': {'$sum': 1}}},
+    ]
 
 
 class SynthesisRepository:
     COLLECTION_NAME = 'syntheses'
     
+    # Index déclarés, réconciliés par app.repository.index_manager
+    INDEXES = [
+        IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+        IndexModel(KEYSET_SORT, name='created_at_id_keyset'),
+        IndexModel(VERSION_SORT, name='updated_at_id_version'),
+        IndexModel([('note_id', ASCENDING), ('created_at', DESCENDING)], name='note_id_created_at'),
+        IndexModel([('attachments.url', ASCENDING)], name='attachments_url'),
+        IndexModel([('title', TEXT)], name='title_text', default_language='french'),
+    ]
+    
+    @property
+    def collection(self):
+        """Collection du processus courant (le client MongoDB est créé au premier usage)"""
+        return mongodb_connector.get_collection(self.COLLECTION_NAME)
+    
+    def read_collection(self, profile: str):
+        """Collection lue avec un profil de lecture (`list`, `search`, `stats`, voir mongodb_config)"""
+        return mongodb_connector.get_collection(self.COLLECTION_NAME, read_profile=profile)
+    
     def __init__(self):
-        self.collection = mongodb_connector.get_collection(self.COLLECTION_NAME)
+        self.cache = build_model_cache(self.COLLECTION_NAME, SYNTHESIS_CODEC)
+        # Synthèses par note et attachments par synthèse, tenus à jour à chaque écriture
+        self.counters = CounterRepository()
+        self._stats_cache = TTLCache(
+            maxsize=CacheConfig.STATS_CACHE_MAX_ENTRIES,
+            ttl=CacheConfig.STATS_CACHE_TTL_SECONDS
+        )
+        self._stats_lock = threading.Lock()
 
     def create(self, synthesis: Synthesis) -> Synthesis:
         """Créer une nouvelle synthèse"""
-        data = synthesis.to_dict()
-        
-        # Convert datetime objects to ISO format for MongoDB
-        if 'created_at' in data and data['created_at']:
-            data['created_at'] = data['created_at'].isoformat()
-        if 'updated_at' in data and data['updated_at']:
-            data['updated_at'] = data['updated_at'].isoformat()
-        
         # Insert synthesis into MongoDB (attachments are embedded)
-        self.collection.insert_one(data)
+        self.collection.insert_one(SYNTHESIS_CODEC.encode(synthesis))
+        self.cache.invalidate(synthesis.id)
+        self._count_created([synthesis])
         return synthesis
 
-    def update(self, synthesis: Synthesis) -> Synthesis:
-        """Mettre à jour une synthèse existante"""
-        data = synthesis.to_dict()
-        
-        # Convert datetime objects to ISO format for MongoDB
-        if 'created_at' in data and data['created_at']:
-            data['created_at'] = data['created_at'].isoformat()
-        if 'updated_at' in data and data['updated_at']:
-            data['updated_at'] = data['updated_at'].isoformat()
-        
-        # Update synthesis in MongoDB
-        self.collection.update_one(
-            {'id': synthesis.id},
-            {'$set': data}
-        )
-        return synthesis
+    def _count_created(self, syntheses: List[Synthesis]):
+        """Créer les compteurs d'attachments des synthèses et incrémenter ceux de leurs notes"""
+        self.counters.set_many(SYNTHESIS_ATTACHMENTS, created_attachment_counts(syntheses))
+        self.counters.increment_many(NOTE_SYNTHESES, created_note_deltas(syntheses), seed=self._count_by_notes)
+
+    def _count_by_notes(self, note_ids: List[str]) -> Dict[str, int]:
+        """Nombre de synthèses de chaque note, compté depuis les documents"""
+        return {doc['_id']: doc['count'] for doc in self.collection.aggregate(note_counts_pipeline(note_ids))}
+
+    def create_many(self, syntheses: List[Synthesis], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Optional[Dict[str, Any]]]:
+        """Créer plusieurs synthèses par insert_many non ordonnés de `chunk_size` synthèses
+
+        Retourne, pour chaque synthèse, None si elle a été insérée, sinon l'erreur MongoDB.
+        """
+        documents = [SYNTHESIS_CODEC.encode(synthesis) for synthesis in syntheses]
+        errors = insert_many_in_chunks(self.collection, documents, chunk_size)
+        inserted = [synthesis for synthesis, error in zip(syntheses, errors) if error is None]
+        self._count_created(inserted)
+        return errors
+
+    def update(self, synthesis: Synthesis) -> Optional[Synthesis]:
+        """Mettre à jour une synthèse existante (None si elle n'existe pas)"""
+        changes = SYNTHESIS_CODEC.encode(synthesis)
+        for field in ('id', 'created_at', 'updated_at'):
+            changes.pop(field)
+        updated = self.update_fields(synthesis.id, changes)
+        if updated is not None:
+            self.counters.set(SYNTHESIS_ATTACHMENTS, synthesis.id, len(synthesis.attachments))
+        return updated
+
+    def _move_note_counter(self, old_note_id: Optional[str], new_note_id: Optional[str]):
+        """Reporter une synthèse d'une note sur une autre dans les compteurs"""
+        self.counters.increment_many(NOTE_SYNTHESES, moved_note_deltas(old_note_id, new_note_id), seed=self._count_by_notes)
+
+    def update_fields(self, synthesis_id: str, changes: Dict[str, Any]) -> Optional[Synthesis]:
+        """Mettre à jour seulement les champs modifiés d'une synthèse, en un aller-retour
 
-    def get_by_id(self, synthesis_id: str) -> Optional[Synthesis]:
-        """Récupérer une synthèse par son ID"""
-        doc = self.collection.find_one({'id': synthesis_id})
+        Retourne la synthèse à jour, ou None si elle n'existe pas.
+        """
+        if 'note_id' not in changes:
+            doc = self.collection.find_one_and_update(
+                {'id': synthesis_id},
+                touch({'$set': changes}),
+                return_document=ReturnDocument.AFTER
+            )
+            self.cache.invalidate(synthesis_id)
+            return SYNTHESIS_CODEC.decode(doc)
         
-        if not doc:
+        # Changement de note : MongoDB ne renvoie qu'une image du document. Le document
+        # AVANT donne l'ancien note_id, le document à jour en est reconstruit avec une
+        # date de modification fixée ici plutôt que relue
+        update = touch({'$set': changes}, at=stamp())
+        before = self.collection.find_one_and_update({'id': synthesis_id}, update)
+        self.cache.invalidate(synthesis_id)
+        if before is None:
             return None
-        
-        # Convert ObjectId to string and handle datetime conversion
-        doc['_id'] = str(doc['_id'])
-        if 'created_at' in doc and isinstance(doc['created_at'], str):
-            from datetime import datetime
-            doc['created_at'] = datetime.fromisoformat(doc['created_at'].replace('Z', '+00:00'))
-        if 'updated_at' in doc and isinstance(doc['updated_at'], str):
-            from datetime import datetime
-            doc['updated_at'] = datetime.fromisoformat(doc['updated_at'].replace('Z', '+00:00'))
-        
-        return Synthesis.from_dict(doc)
+        self._move_note_counter(before.get('note_id'), changes['note_id'])
+        return SYNTHESIS_CODEC.decode(apply_set(before, update))
+
+    def get_by_id(self, synthesis_id: str, fields: Optional[List[str]] = None) -> Optional[Synthesis]:
+        """Récupérer une synthèse par son ID (seulement les champs `fields` si fournis)
+
+        Servi par le cache de lecture ; une projection n'est demandée à MongoDB
+        qu'en cas d'absence du cache et son résultat partiel n'y est pas stocké.
+        """
+        return self.cache.get_or_load(
+            synthesis_id,
+            lambda: self.collection.find_one({'id': synthesis_id}, build_projection(fields, required=('updated_at',))),
+            cacheable=fields is None,
+        )
 
-    def list_all(self) -> List[Synthesis]:
+    def get_version(self, synthesis_id: str) -> Optional[Dict[str, Any]]:
+        """Récupérer l'id et la date de modification d'une synthèse, sans hydrater le document"""
+        return SYNTHESIS_CODEC.normalize(self.collection.find_one({'id': synthesis_id}, VERSION_PROJECTION))
+
+    def collection_version(self) -> Tuple[int, Any, Optional[str]]:
+        """Résumer l'état de la collection : nombre de synthèses et dernière modification"""
+        # Même profil que les listes : l'ETag décrit les données que la liste renverra
+        collection = self.read_collection('list')
+        latest = SYNTHESIS_CODEC.normalize(collection.find_one({}, VERSION_PROJECTION, sort=VERSION_SORT)) or {}
+        return collection.estimated_document_count(), latest.get('updated_at'), latest.get('id')
+
+    def list_all(self, fields: Optional[List[str]] = None) -> List[Synthesis]:
         """Récupérer toutes les synthèses"""
-        docs = self.collection.find()
-        
-        syntheses = []
-        for doc in docs:
-            # Convert ObjectId to string and handle datetime conversion
-            doc['_id'] = str(doc['_id'])
-            if 'created_at' in doc and isinstance(doc['created_at'], str):
-                from datetime import datetime
-                doc['created_at'] = datetime.fromisoformat(doc['created_at'].replace('Z', '+00:00'))
-            if 'updated_at' in doc and isinstance(doc['updated_at'], str):
-                from datetime import datetime
-                doc['updated_at'] = datetime.fromisoformat(doc['updated_at'].replace('Z', '+00:00'))
-            
-            syntheses.append(Synthesis.from_dict(doc))
+        return list(self.iter_all(fields=fields))
+
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE, fields: Optional[List[str]] = None) -> Iterator[Synthesis]:
+        """Parcourir toutes les synthèses sans les charger toutes en mémoire"""
+        cursor = self.read_collection('list').find({}, build_projection(fields)).batch_size(batch_size)
+        return SYNTHESIS_CODEC.decode_many(cursor)
+
+    def list_page(self, limit: int, cursor: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> Tuple[List[Synthesis], Optional[str]]:
+        """Récupérer une page de synthèses après le curseur donné"""
+        # Un document de plus que demandé indique s'il reste une page suivante
+        docs = list(
+            self.read_collection('list').find(keyset_query(cursor), build_projection(fields, required=('created_at',)))
+            .sort(KEYSET_SORT)
+            .limit(limit + 1)
+        )
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]['created_at'], docs[-1]['id']) if has_more else None
         
-        return syntheses
+        return list(SYNTHESIS_CODEC.decode_many(docs)), next_cursor
 
-    def list_by_note(self, note_id: str) -> List[Synthesis]:
+    def list_by_note(self, note_id: str, fields: Optional[List[str]] = None) -> List[Synthesis]:
         """Récupérer toutes les synthèses d'une note"""
-        docs = self.collection.find({'note_id': note_id})
-        
-        syntheses = []
-        for doc in docs:
-            # Convert ObjectId to string and handle datetime conversion
-            doc['_id'] = str(doc['_id'])
-            if 'created_at' in doc and isinstance(doc['created_at'], str):
-                from datetime import datetime
-                doc['created_at'] = datetime.fromisoformat(doc['created_at'].replace('Z', '+00:00'))
-            if 'updated_at' in doc and isinstance(doc['updated_at'], str):
-                from datetime import datetime
-                doc['updated_at'] = datetime.fromisoformat(doc['updated_at'].replace('Z', '+00:00'))
-            
-            syntheses.append(Synthesis.from_dict(doc))
-        
-        return syntheses
+        return list(self.iter_by_note(note_id, fields=fields))
+
+    def iter_by_note(self, note_id: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                     fields: Optional[List[str]] = None) -> Iterator[Synthesis]:
+        """Parcourir les synthèses d'une note sans les charger toutes en mémoire"""
+        cursor = self.read_collection('list').find({'note_id': note_id}, build_projection(fields)).batch_size(batch_size)
+        return SYNTHESIS_CODEC.decode_many(cursor)
+
+    def list_by_notes(self, note_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, List[Synthesis]]:
+        """Récupérer les synthèses de plusieurs notes en une requête `$in`, groupées par note
+
+        Chaque note demandée a une entrée, vide si elle n'a pas de synthèse.
+        """
+        grouped: Dict[str, List[Synthesis]] = {note_id: [] for note_id in note_ids}
+        cursor = (
+            self.read_collection('list').find({'note_id': {'$in': note_ids}}, build_projection(fields, required=('note_id',)))
+            .sort([('note_id', ASCENDING), ('created_at', DESCENDING)])
+        )
+        for synthesis in SYNTHESIS_CODEC.decode_many(cursor):
+            grouped[synthesis.note_id].append(synthesis)
+        return grouped
 
     def delete(self, synthesis_id: str) -> bool:
         """Supprimer une synthèse par son ID"""
-        result = self.collection.delete_one({'id': synthesis_id})
-        return result.deleted_count > 0
+        deleted = self.collection.find_one_and_delete({'id': synthesis_id}, projection={'_id': 0, 'note_id': 1})
+        self.cache.invalidate(synthesis_id)
+        if deleted is None:
+            return False
+        self.counters.increment(NOTE_SYNTHESES, deleted.get('note_id'), -1, seed=self._count_by_notes)
+        self.counters.delete(SYNTHESIS_ATTACHMENTS, synthesis_id)
+        return True
 
     def exists(self, synthesis_id: str) -> bool:
         """Vérifier si une synthèse existe"""
         return self.collection.count_documents({'id': synthesis_id}) > 0
 
-    def count(self) -> int:
-        """Compter le nombre total de synthèses"""
-        return self.collection.count_documents({})
+    def count(self, exact: bool = False) -> int:
+        """Compter le nombre total de synthèses
+
+        Par défaut, lu dans les métadonnées de la collection (`estimated_document_count`,
+        sans parcours) ; `exact=True` compte les documents.
+        """
+        if exact:
+            return self.read_collection('stats').count_documents({})
+        return self.read_collection('stats').estimated_document_count()
 
     def count_by_note(self, note_id: str) -> int:
-        """Compter le nombre de synthèses pour une note"""
+        """Compter le nombre de synthèses pour une note (compteur matérialisé)
+
+        Une note sans compteur (antérieure aux compteurs, ou sans synthèse lors de la
+        dernière réconciliation) est comptée depuis les synthèses.
+        """
+        count = self.counters.get(NOTE_SYNTHESES, note_id)
+        if count is not None:
+            return count
         return self.collection.count_documents({'note_id': note_id})
 
-    def add_attachment_to_synthesis(self, synthesis_id: str, url: str, attachment_type: AttachmentType, name: str = "", size: int = 0) -> Optional[Synthesis]:
-        """Ajouter un attachment à une synthèse"""
-        synthesis = self.get_by_id(synthesis_id)
-        if not synthesis:
-            return None
+    def count_attachments(self, synthesis_id: str) -> Optional[int]:
+        """Nombre d'attachments d'une synthèse (compteur matérialisé), None si elle n'existe pas
+
+        Une synthèse sans compteur (créée avant les compteurs) est comptée depuis son document.
+        """
+        count = self.counters.get(SYNTHESIS_ATTACHMENTS, synthesis_id)
+        if count is not None:
+            return count
+        synthesis = self.get_by_id(synthesis_id, fields=['attachments'])
+        return len(synthesis.attachments) if synthesis else None
+
+    def reconcile_counters(self, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+        """Recalculer les compteurs depuis les synthèses (après une dérive)
+
+        À lancer hors des pics d'écriture : une écriture concurrente peut être comptée
+        deux fois ou pas du tout, jusqu'à la réconciliation suivante.
+        """
+        by_note = self.collection.aggregate([
+            {'$match': {'note_id': {'$ne': None}}},
+            {'$group': {'_id': '$note_id', 'count': {'$sum': 1}}},
+        ])
+        attachments = self.collection.find(
+            {}, {'_id': 0, 'id': 1, 'count': {'$size': {'$ifNull': ['$attachments', []]}}}
+        )
+        return {
+            NOTE_SYNTHESES: self.counters.reconcile_scope(
+                NOTE_SYNTHESES, ((doc['_id'], doc['count']) for doc in by_note), dry_run
+            ),
+            SYNTHESIS_ATTACHMENTS: self.counters.reconcile_scope(
+                SYNTHESIS_ATTACHMENTS, ((doc['id'], doc['count']) for doc in attachments), dry_run
+            ),
+        }
+
+    def get_stats(self, group_by: Optional[str] = None) -> Dict[str, Any]:
+        """Calculer les statistiques des synthèses (mises en cache pour une courte durée)
+
+        Args:
+            group_by (str): None, 'note' ou 'day' pour ajouter une ventilation
+        """
+        if group_by is not None and group_by not in STATS_GROUP_KEYS:
+            raise ValueError(f"Regroupement invalide: {group_by}")
         
-        synthesis.add_attachment(url, attachment_type, name, size)
-        return self.update(synthesis)
+        with self._stats_lock:
+            cached = self._stats_cache.get(group_by)
+        if cached is not None:
+            return cached
+        
+        stats = self._aggregate_stats(group_by)
+        with self._stats_lock:
+            self._stats_cache[group_by] = stats
+        return stats
 
-    def remove_attachment_from_synthesis(self, synthesis_id: str, url: str) -> Optional[Synthesis]:
-        """Supprimer un attachment d'une synthèse"""
-        synthesis = self.get_by_id(synthesis_id)
-        if not synthesis:
-            return None
+    def _aggregate_stats(self, group_by: Optional[str]) -> Dict[str, Any]:
+        """Calculer les statistiques en un seul pipeline d'agrégation côté serveur"""
+        facets = {'totals': [{'$group': {'_id': None, **STATS_ACCUMULATORS}}]}
+        if group_by:
+            facets['groups'] = [
+                {'$group': {'_id': STATS_GROUP_KEYS[group_by], **STATS_ACCUMULATORS}},
+                {'$sort': {'_id': 1}},
+            ]
+        
+        result = next(self.read_collection('stats').aggregate([{'$facet': facets}]), {})
         
-        synthesis.remove_attachment(url)
-        return self.update(synthesis)
+        totals = result.get('totals') or [{}]
+        stats = self._format_stats(totals[0])
+        if group_by:
+            stats[f'by_{group_by}'] = [
+                {group_by: group['_id'], **self._format_stats(group)}
+                for group in result.get('groups', [])
+            ]
+        return stats
+
+    @staticmethod
+    def _format_stats(group: Dict[str, Any]) -> Dict[str, int]:
+        """Mettre en forme les compteurs d'un groupe d'agrégation"""
+        stats = {name: group.get(name, 0) for name in STATS_ACCUMULATORS}
+        stats['manual_syntheses'] = stats['total_syntheses'] - stats['generated_syntheses']
+        return stats
+
+    def add_attachment_to_synthesis(self, synthesis_id: str, url: str, attachment_type: AttachmentType,
+                                    name: Optional[str] = None, size: Optional[int] = None) -> Optional[Synthesis]:
+        """Ajouter un attachment à une synthèse"""
+        attachment = Attachment(url=url, type=attachment_type, name=name, size=size)
+        return self.add_attachments_to_synthesis(synthesis_id, [attachment])
+
+    def add_attachments_to_synthesis(self, synthesis_id: str, attachments: List[Attachment]) -> Optional[Synthesis]:
+        """Ajouter plusieurs attachments à une synthèse en une seule opération atomique
+
+        `$push` / `$each` n'écrit que les nouveaux éléments : les ajouts concurrents
+        ne sont pas perdus. Retourne la synthèse à jour, ou None si elle n'existe pas.
+        """
+        doc = self.collection.find_one_and_update(
+            {'id': synthesis_id},
+            touch({
+                '$push': {'attachments': {'$each': [ATTACHMENT_CODEC.encode(attachment) for attachment in attachments]}},
+            }),
+            return_document=ReturnDocument.AFTER
+        )
+        self.cache.invalidate(synthesis_id)
+        if doc is not None:
+            # Compteur absent (synthèse antérieure aux compteurs) : créé depuis le document à jour
+            total = len(doc['attachments'])
+            self.counters.increment(SYNTHESIS_ATTACHMENTS, synthesis_id, len(attachments),
+                                    seed=lambda owner_ids: {synthesis_id: total})
+        return SYNTHESIS_CODEC.decode(doc)
+
+    def remove_attachment_from_synthesis(self, synthesis_id: str, url: str) -> Optional[Synthesis]:
+        """Supprimer un attachment d'une synthèse (`$pull` atomique, en un aller-retour)
+
+        Le compteur d'attachments perd un par URL retirée (une URL en double, retirée en
+        une fois, est corrigée par reconcile_counters).
+        Retourne la synthèse à jour, ou None si la synthèse ou l'attachment n'existe pas.
+        """
+        # Le filtre ne correspond que si l'URL est présente : un attachment retiré par URL
+        doc = self.collection.find_one_and_update(
+            {'id': synthesis_id, 'attachments.url': url},
+            touch({'$pull': {'attachments': {'url': url}}}),
+            return_document=ReturnDocument.AFTER
+        )
+        self.cache.invalidate(synthesis_id)
+        if doc is not None:
+            # Compteur absent : créé depuis le document à jour
+            total = len(doc['attachments'])
+            self.counters.increment(SYNTHESIS_ATTACHMENTS, synthesis_id, -1,
+                                    seed=lambda owner_ids: {synthesis_id: total})
+        return SYNTHESIS_CODEC.decode(doc)
 
     def get_attachments_by_type(self, synthesis_id: str, attachment_type: AttachmentType) -> List[Attachment]:
         """Récupérer les attachments d'une synthèse par type"""
-        synthesis = self.get_by_id(synthesis_id)
+        synthesis = self.get_by_id(synthesis_id, fields=['attachments'])
         if not synthesis:
             return []
         
         return synthesis.get_attachments_by_type(attachment_type)
 
-    def search_by_title(self, title: str) -> List[Synthesis]:
-        """Rechercher des synthèses par titre"""
-        docs = self.collection.find({'title': {'$regex': title, '$options': 'i'}})
-        
-        syntheses = []
-        for doc in docs:
-            # Convert ObjectId to string and handle datetime conversion
-            doc['_id'] = str(doc['_id'])
-            if 'created_at' in doc and isinstance(doc['created_at'], str):
-                from datetime import datetime
-                doc['created_at'] = datetime.fromisoformat(doc['created_at'].replace('Z', '+00:00'))
-            if 'updated_at' in doc and isinstance(doc['updated_at'], str):
-                from datetime import datetime
-                doc['updated_at'] = datetime.fromisoformat(doc['updated_at'].replace('Z', '+00:00'))
-            
-            syntheses.append(Synthesis.from_dict(doc))
-        
-        return syntheses
\ No newline at end of file
+    def search_by_title(self, title: str, limit: int = 0, offset: int = 0,
+                        fields: Optional[List[str]] = None) -> List[Synthesis]:
+        """Rechercher des synthèses par titre, triées par pertinence"""
+        return list(self.iter_search_by_title(title, limit=limit, offset=offset, fields=fields))
+
+    def iter_search_by_title(self, title: str, batch_size: int = DEFAULT_BATCH_SIZE, limit: int = 0,
+                             offset: int = 0, fields: Optional[List[str]] = None) -> Iterator[Synthesis]:
+        """Parcourir les synthèses dont le titre correspond à la recherche, par pertinence"""
+        projection = build_projection(fields) or {}
+        projection['score'] = {'$meta': 'textScore'}
+        # Recherche plein texte servie par l'index `title_text` (limit=0 : pas de limite)
+        docs = (
+            self.read_collection('search').find({'$text': {'$search': title}}, projection)
+            .sort([('score', {'$meta': 'textScore'})])
+            .skip(offset)
+            .limit(limit)
+            .batch_size(batch_size)
+        )
+        return SYNTHESIS_CODEC.decode_many(docs)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Écritures différées (write-behind) pour les mises à jour à faible valeur
+Les mises à jour sont regroupées par document en mémoire puis envoyées en un seul
+bulk_write non ordonné toutes les N millisecondes ou dès N documents en attente.
+Elles sont best-effort : une mise à jour en attente est perdue si le processus est tué
+sans passer par atexit.
+"""
+
+import atexit
+import os
+import threading
+from typing import Any, Callable, Dict, Tuple
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+from pymongo.write_concern import WriteConcern
+from app.config.write_behind_config import WriteBehindConfig
+from app.logger_config import get_logger
+
+logger = get_logger('write_behind')
+
+# Buffers construits par les repositories, par nom (pour les statistiques)
+_registry: Dict[str, 'WriteBehindBuffer'] = {}
+
+# Fusion de deux valeurs d'un même champ selon l'opérateur de mise à jour
+_MERGE = {
+    '$max': max,
+    '$min': min,
+}
+
+
+def _parse_write_concern(raw: str) -> WriteConcern:
+    """`1`, `0`, `majority`... vers un WriteConcern"""
+    return WriteConcern(w=int(raw) if raw.isdigit() else raw)
+
+
+class WriteBehindBuffer:
+    """File d'écritures différées d'une collection, regroupées par identifiant"""
+
+    def __init__(self, name: str, get_collection: Callable[[], Collection], flush_interval_ms: int,
+                 max_items: int, write_concern: WriteConcern):
+        self.name = name
+        self._get_collection = get_collection
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_items = max_items
+        self.write_concern = write_concern
+        self._pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.written = 0
+        self.failed = 0
+
+    def submit(self, document_id: str, update: Dict[str, Dict[str, Any]]):
+        """Mettre en attente une mise à jour ({'$set': {...}}, {'$max': {...}}) d'un document"""
+        self._ensure_worker()
+        with self._condition:
+            self.submitted += 1
+            pending = self._pending.get(document_id)
+            if pending is None:
+                self._pending[document_id] = {operator: dict(fields) for operator, fields in update.items()}
+            else:
+                self.coalesced += 1
+                for operator, fields in update.items():
+                    merged = pending.setdefault(operator, {})
+                    merge = _MERGE.get(operator)
+                    for field, value in fields.items():
+                        merged[field] = merge(merged[field], value) if merge and field in merged else value
+            if len(self._pending) >= self.max_items:
+                self._condition.notify()
+
+    def flush(self) -> int:
+        """Écrire les mises à jour en attente en un bulk_write ; retourne le nombre de documents"""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        operations = [UpdateOne({'id': document_id}, update) for document_id, update in pending.items()]
+        try:
+            collection = self._get_collection().with_options(write_concern=self.write_concern)
+            collection.bulk_write(operations, ordered=False)
+            self.written += len(operations)
+        except PyMongoError as e:
+            self.failed += len(operations)
+            logger.warning(f"Écriture différée '{self.name}' perdue pour {len(operations)} documents: {str(e)}")
+        self.flushes += 1
+        return len(operations)
+
+    def _ensure_worker(self):
+        """Démarrer le thread d'écriture dans le processus courant (un thread ne survit pas à un fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._condition:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f'write-behind-{self.name}', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._pending) < self.max_items:
+                    self._condition.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Erreur du thread d'écriture différée '{self.name}': {str(e)}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du buffer"""
+        return {
+            'pending': len(self._pending),
+            'submitted': self.submitted,
+            'coalesced': self.coalesced,
+            'flushes': self.flushes,
+            'written': self.written,
+            'failed': self.failed,
+        }
+
+
+def build_write_behind_buffer(name: str, get_collection: Callable[[], Collection]) -> WriteBehindBuffer:
+    """Construire un buffer selon WriteBehindConfig et l'enregistrer"""
+    buffer = WriteBehindBuffer(
+        name,
+        get_collection,
+        flush_interval_ms=WriteBehindConfig.WRITE_BEHIND_FLUSH_INTERVAL_MS,
+        max_items=WriteBehindConfig.WRITE_BEHIND_MAX_ITEMS,
+        write_concern=_parse_write_concern(WriteBehindConfig.WRITE_BEHIND_WRITE_CONCERN),
+    )
+    _registry[name] = buffer
+    return buffer
+
+
+def flush_all() -> Tuple[int, int]:
+    """Vider tous les buffers (arrêt du processus) ; retourne (buffers, documents écrits)"""
+    total = 0
+    for buffer in _registry.values():
+        try:
+            total += buffer.flush()
+        except Exception as e:
+            logger.error(f"Erreur lors du vidage du buffer '{buffer.name}': {str(e)}", exc_info=True)
+    return len(_registry), total
+
+
+def write_behind_stats() -> Dict[str, Dict[str, Any]]:
+    """Compteurs de tous les buffers d'écriture différée"""
+    return {name: buffer.stats() for name, buffer in _registry.items()}
+
+
+# Les mises à jour en attente sont écrites à l'arrêt normal du processus
+atexit.register(flush_all)
@@ -0,0 +1,337 @@
+"""
+Routes asynchrones (Quart) pour l'application ASGI
+
+Elles reprennent les chemins et les réponses des routes Flask pour les notes et les
+synthèses, sur les repositories Motor : liste, lecture, création, mise à jour et
+suppression, synthèses d'une note. Les autres routes de l'API (recherche, statistiques,
+créations groupées, attachments, authentification) répondent 501 au lieu d'être
+capturées par `/<id>` : elles ne sont servies que par l'application WSGI, comme le cache
+de lecture, les ETags, `include` et l'export en streaming. La validation des corps
+(app.routes.validation) est partagée avec les routes synchrones. Les écritures asynchrones invalident le
+cache de lecture redis des workers Flask, pas leurs caches locaux (voir
+build_async_cache_invalidator).
+"""
+
+from quart import Blueprint, request, jsonify
+from app.repository.async_repository import async_repository_factory
+from app.mongodb_async_connector import async_mongodb_connector
+from app.logger_config import get_logger
+from app.utils.pagination import parse_limit
+from app.utils.projection import parse_fields
+from app.utils.bulk import parse_ids
+from app.routes.validation import NOTE_UPDATABLE_FIELDS, SYNTHESIS_UPDATABLE_FIELDS, build_note, build_synthesis
+
+# Create async blueprints
+async_health_bp = Blueprint('async_health', __name__, url_prefix='/api/v1/health')
+async_notes_bp = Blueprint('async_notes', __name__, url_prefix='/api/v1/notes')
+async_syntheses_bp = Blueprint('async_syntheses', __name__, url_prefix='/api/v1/syntheses')
+async_auth_bp = Blueprint('async_auth', __name__, url_prefix='/api/v1/auth')
+
+# Routes de l'API WSGI non servies par l'application ASGI : (blueprint, chemin, méthodes)
+NOT_SERVED_ROUTES = [
+    (async_notes_bp, '/search', ['GET']),
+    (async_notes_bp, '/batch', ['POST']),
+    (async_syntheses_bp, '/search', ['GET']),
+    (async_syntheses_bp, '/stats', ['GET']),
+    (async_syntheses_bp, '/batch', ['POST']),
+    (async_syntheses_bp, '/<string:synthesis_id>/attachments', ['GET', 'POST']),
+    (async_syntheses_bp, '/<string:synthesis_id>/attachments/batch', ['POST']),
+    (async_syntheses_bp, '/<string:synthesis_id>/attachments/<path:url>', ['DELETE']),
+    (async_syntheses_bp, '/<string:synthesis_id>/attachments/by-type/<string:attachment_type>', ['GET']),
+    (async_syntheses_bp, '/<string:synthesis_id>/attachments/count', ['GET']),
+    (async_auth_bp, '/register', ['POST']),
+    (async_auth_bp, '/login', ['POST']),
+    (async_auth_bp, '/me', ['GET']),
+    (async_auth_bp, '/refresh', ['POST']),
+]
+
+
+@async_health_bp.route('', methods=['GET'])
+async def health_check():
+    """Vérifier l'état de l'API et de la connexion MongoDB"""
+    logger = get_logger('async_health_check')
+    try:
+        await async_mongodb_connector.ping()
+    except Exception as e:
+        logger.error(f"MongoDB injoignable: {str(e)}")
+        return jsonify({'status': 'unhealthy', 'error': str(e)}), 503
+    return jsonify({
+        'status': 'healthy',
+        'message': 'Feather Book API is running (ASGI)',
+        'version': '1.0'
+    }), 200
+
+
+async def route_not_served(**kwargs):
+    """Route de l'API WSGI absente de l'application ASGI"""
+    logger = get_logger('async_routes')
+    logger.warning(f"Route non servie par l'application ASGI: {request.method} {request.path}")
+    return jsonify({
+        'error': "Route non disponible sur le serveur ASGI, servie par le serveur Flask (WSGI)"
+    }), 501
+
+
+for index, (blueprint, rule, methods) in enumerate(NOT_SERVED_ROUTES):
+    blueprint.add_url_rule(rule, endpoint=f"not_served_{index}", view_func=route_not_served, methods=methods)
+
+
+async def list_documents(repository, logger, label: str):
+    """Lister des documents : par `ids`, par page (`limit`/`cursor`) ou en totalité"""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        logger.warning(f"Paramètre fields invalide: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+
+    if 'limit' in request.args or 'cursor' in request.args:
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            items, next_cursor = await repository.list_page(limit, request.args.get('cursor'), fields=fields)
+        except ValueError as e:
+            logger.warning(f"Paramètres de pagination invalides: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        logger.info(f"Page de {label} récupérée: {len(items)} éléments")
+        return jsonify({
+            'items': [item.to_dict(fields) for item in items],
+            'next_cursor': next_cursor
+        }), 200
+
+    logger.info(f"Récupération de toutes les {label}")
+    items = await repository.list_all(fields=fields)
+    logger.info(f"Récupération réussie: {len(items)} {label} trouvées")
+    return jsonify([item.to_dict(fields) for item in items]), 200
+
+
+async def update_document(repository, model_id: str, updatable_fields, logger):
+    """Appliquer un PUT/PATCH partiel ; None si le document n'existe pas"""
+    data = await request.get_json(silent=True) or {}
+    changes = {field: data[field] for field in updatable_fields if field in data}
+    if changes:
+        logger.info(f"Champs mis à jour pour {model_id}: {', '.join(changes)}")
+        return await repository.update_fields(model_id, changes)
+    return await repository.get_by_id(model_id)
+
+
+# ---------------------------------------------------------------------------
+# Notes
+# ---------------------------------------------------------------------------
+
+@async_notes_bp.route('', methods=['GET'])
+async def list_notes():
+    """Récupérer toutes les notes, une page si `limit`/`cursor` sont fournis, ou celles listées par `ids`"""
+    logger = get_logger('async_notes_routes')
+    note_repository = async_repository_factory.note_repository
+    try:
+        if 'ids' in request.args:
+            try:
+                fields = parse_fields(request.args.get('fields'))
+                note_ids = parse_ids(request.args.get('ids'))
+            except ValueError as e:
+                logger.warning(f"Paramètre fields ou ids invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            notes = await note_repository.get_many(note_ids, fields=fields)
+            found = {note.id for note in notes}
+            logger.info(f"Récupération groupée: {len(found)}/{len(note_ids)} notes trouvées")
+            return jsonify({
+                'items': [note.to_dict(fields) for note in notes],
+                'missing': [note_id for note_id in note_ids if note_id not in found]
+            }), 200
+        return await list_documents(note_repository, logger, 'notes')
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des notes: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la récupération des notes: {str(e)}"}), 500
+
+
+@async_notes_bp.route('/<string:note_id>', methods=['GET'])
+async def get_note(note_id):
+    """Récupérer une note par son ID"""
+    logger = get_logger('async_notes_routes')
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        note = await async_repository_factory.note_repository.get_by_id(note_id, fields=fields)
+        if not note:
+            logger.warning(f"Note non trouvée avec ID: {note_id}")
+            return jsonify({'error': 'Note non trouvée'}), 404
+        return jsonify(note.to_dict(fields)), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération de la note {note_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la récupération de la note: {str(e)}"}), 500
+
+
+@async_notes_bp.route('', methods=['POST'])
+async def create_note():
+    """Créer une nouvelle note"""
+    logger = get_logger('async_notes_routes')
+    try:
+        try:
+            note = build_note(await request.get_json(silent=True))
+        except ValueError as e:
+            logger.warning("Tentative de création de note sans contenu")
+            return jsonify({'error': str(e)}), 400
+
+        await async_repository_factory.note_repository.create(note)
+        logger.info(f"Note créée avec succès, ID: {note.id}")
+        return jsonify(note.to_dict()), 201
+    except Exception as e:
+        logger.error(f"Erreur lors de la création de la note: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la création de la note: {str(e)}"}), 500
+
+
+@async_notes_bp.route('/<string:note_id>', methods=['PUT', 'PATCH'])
+async def update_note(note_id):
+    """Mettre à jour une note (seuls les champs fournis sont écrits)"""
+    logger = get_logger('async_notes_routes')
+    try:
+        note = await update_document(async_repository_factory.note_repository, note_id, NOTE_UPDATABLE_FIELDS, logger)
+        if not note:
+            logger.warning(f"Note non trouvée pour mise à jour: {note_id}")
+            return jsonify({'error': 'Note non trouvée'}), 404
+        return jsonify(note.to_dict()), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour de la note {note_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la mise à jour de la note: {str(e)}"}), 500
+
+
+@async_notes_bp.route('/<string:note_id>', methods=['DELETE'])
+async def delete_note(note_id):
+    """Supprimer une note"""
+    logger = get_logger('async_notes_routes')
+    try:
+        if not await async_repository_factory.note_repository.delete(note_id):
+            logger.warning(f"Note non trouvée pour suppression: {note_id}")
+            return jsonify({'error': 'Note non trouvée'}), 404
+        logger.info(f"Note {note_id} supprimée avec succès")
+        return jsonify({'message': 'Note supprimée avec succès'}), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la suppression de la note {note_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la suppression de la note: {str(e)}"}), 500
+
+
+@async_notes_bp.route('/<string:note_id>/syntheses', methods=['GET'])
+async def get_note_syntheses(note_id):
+    """Récupérer toutes les synthèses d'une note"""
+    logger = get_logger('async_notes_routes')
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        syntheses = await async_repository_factory.synthesis_repository.list_by_note(note_id, fields=fields)
+        logger.info(f"Récupération réussie: {len(syntheses)} synthèses pour la note {note_id}")
+        return jsonify([synthesis.to_dict(fields) for synthesis in syntheses]), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des synthèses de la note {note_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la récupération des synthèses: {str(e)}"}), 500
+
+
+# ---------------------------------------------------------------------------
+# Synthèses
+# ---------------------------------------------------------------------------
+
+@async_syntheses_bp.route('', methods=['GET'])
+async def list_syntheses():
+    """Récupérer toutes les synthèses, ou une page si `limit`/`cursor` sont fournis"""
+    logger = get_logger('async_syntheses_routes')
+    try:
+        return await list_documents(async_repository_factory.synthesis_repository, logger, 'synthèses')
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des synthèses: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la récupération des synthèses: {str(e)}"}), 500
+
+
+@async_syntheses_bp.route('/note/<string:note_id>', methods=['GET'])
+async def get_syntheses_by_note(note_id):
+    """Récupérer toutes les synthèses d'une note"""
+    logger = get_logger('async_syntheses_routes')
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        syntheses = await async_repository_factory.synthesis_repository.list_by_note(note_id, fields=fields)
+        logger.info(f"Récupération réussie: {len(syntheses)} synthèses trouvées pour la note {note_id}")
+        return jsonify([synthesis.to_dict(fields) for synthesis in syntheses]), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des synthèses pour la note {note_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la récupération des synthèses: {str(e)}"}), 500
+
+
+@async_syntheses_bp.route('/<string:synthesis_id>', methods=['GET'])
+async def get_synthesis(synthesis_id):
+    """Récupérer une synthèse par son ID"""
+    logger = get_logger('async_syntheses_routes')
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        synthesis = await async_repository_factory.synthesis_repository.get_by_id(synthesis_id, fields=fields)
+        if not synthesis:
+            logger.warning(f"Synthèse non trouvée avec ID: {synthesis_id}")
+            return jsonify({'error': 'Synthèse non trouvée'}), 404
+        return jsonify(synthesis.to_dict(fields)), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération de la synthèse {synthesis_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la récupération de la synthèse: {str(e)}"}), 500
+
+
+@async_syntheses_bp.route('', methods=['POST'])
+async def create_synthesis():
+    """Créer une nouvelle synthèse"""
+    logger = get_logger('async_syntheses_routes')
+    try:
+        try:
+            synthesis = build_synthesis(await request.get_json(silent=True))
+        except ValueError as e:
+            logger.warning(f"Création de synthèse invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        await async_repository_factory.synthesis_repository.create(synthesis)
+        logger.info(f"Synthèse créée avec succès, ID: {synthesis.id}")
+        return jsonify(synthesis.to_dict()), 201
+    except Exception as e:
+        logger.error(f"Erreur lors de la création de la synthèse: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la création de la synthèse: {str(e)}"}), 500
+
+
+@async_syntheses_bp.route('/<string:synthesis_id>', methods=['PUT', 'PATCH'])
+async def update_synthesis(synthesis_id):
+    """Mettre à jour une synthèse (seuls les champs fournis sont écrits)"""
+    logger = get_logger('async_syntheses_routes')
+    try:
+        synthesis = await update_document(
+            async_repository_factory.synthesis_repository, synthesis_id, SYNTHESIS_UPDATABLE_FIELDS, logger
+        )
+        if not synthesis:
+            logger.warning(f"Synthèse non trouvée pour mise à jour: {synthesis_id}")
+            return jsonify({'error': 'Synthèse non trouvée'}), 404
+        return jsonify(synthesis.to_dict()), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour de la synthèse {synthesis_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la mise à jour de la synthèse: {str(e)}"}), 500
+
+
+@async_syntheses_bp.route('/<string:synthesis_id>', methods=['DELETE'])
+async def delete_synthesis(synthesis_id):
+    """Supprimer une synthèse"""
+    logger = get_logger('async_syntheses_routes')
+    try:
+        if not await async_repository_factory.synthesis_repository.delete(synthesis_id):
+            logger.warning(f"Synthèse non trouvée pour suppression: {synthesis_id}")
+            return jsonify({'error': 'Synthèse non trouvée'}), 404
+        logger.info(f"Synthèse {synthesis_id} supprimée avec succès")
+        return jsonify({'message': 'Synthèse supprimée avec succès'}), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la suppression de la synthèse {synthesis_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la suppression de la synthèse: {str(e)}"}), 500
@@ -5,6 +5,11 @@ Routes pour le health check de l'API
 from flask import Blueprint, jsonify
 from app.logger_config import get_logger
 from app.middleware import log_function_call
+from app.repository.model_cache import cache_stats
+from app.repository.write_behind import write_behind_stats
+from app.repository.change_stream import invalidation_stats
+from app.mongodb_connector import mongodb_connector
+from app.repository.repository_factory import repository_factory
 
 # Create blueprint for health check
 health_bp = Blueprint('health', __name__, url_prefix='/api/v1/health')
@@ -19,5 +24,10 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Feather Book API is running',
-        'version': '1.0'
+        'version': '1.0',
+        'repository_backend': repository_factory.backend,
+        'caches': cache_stats(),
+        'cache_invalidation': invalidation_stats(),
+        'mongodb_pool': mongodb_connector.pool_stats(),
+        'write_behind': write_behind_stats()
     }), 200
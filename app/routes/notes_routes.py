@@ -2,11 +2,19 @@
 Routes pour les opérations sur les notes
 """
 
+from typing import Any, Dict
 from flask import Blueprint, request, jsonify
 from app.models import Note
 from app.repository import repository_factory
+from app.repository.note_repository import INCLUDE_OPTIONS
 from app.logger_config import get_logger
 from app.middleware import log_function_call
+from app.utils.pagination import parse_limit, parse_offset
+from app.utils.streaming import get_stream_format, parse_batch_size, stream_response
+from app.utils.projection import parse_fields, parse_include
+from app.utils.etag import collection_conditional, is_not_modified, not_modified_response, resource_etag
+from app.utils.bulk import MAX_BATCH_ITEMS, batch_results, parse_chunk_size, parse_ids
+from app.routes.validation import NOTE_UPDATABLE_FIELDS as UPDATABLE_FIELDS, build_note
 
 # Create blueprint for notes
 notes_bp = Blueprint('notes', __name__, url_prefix='/api/v1/notes')
@@ -15,34 +23,197 @@ notes_bp = Blueprint('notes', __name__, url_prefix='/api/v1/notes')
 note_repository = repository_factory.note_repository
 
 
+def serialize_with_related(note: Note, related: Dict[str, Any], fields=None) -> Dict[str, Any]:
+    """Sérialiser une note avec les relations résolues par `include`"""
+    data = note.to_dict(fields)
+    if 'syntheses' in related:
+        data['syntheses'] = [synthesis.to_dict() for synthesis in related['syntheses']]
+    if 'synthesis_count' in related:
+        data['synthesis_count'] = related['synthesis_count']
+    return data
+
+
+def list_version():
+    """Version des données d'une liste de notes, synthèses comprises si `include` est demandé"""
+    version = note_repository.collection_version()
+    if request.args.get('include'):
+        version += repository_factory.synthesis_repository.collection_version()
+    return version
+
+
 @notes_bp.route('', methods=['GET'])
 @log_function_call('list_notes')
+@collection_conditional(list_version)
 def list_notes():
-    """Récupérer toutes les notes"""
+    """Récupérer toutes les notes, une page si `limit`/`cursor` sont fournis, ou celles listées par `ids`
+
+    `include=syntheses,synthesis_count` ajoute les synthèses de chaque note (ou leur nombre),
+    résolues dans la même agrégation.
+    """
     logger = get_logger('notes_routes')
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            include = parse_include(request.args.get('include'), INCLUDE_OPTIONS)
+        except ValueError as e:
+            logger.warning(f"Paramètre fields ou include invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        if 'ids' in request.args:
+            try:
+                note_ids = parse_ids(request.args.get('ids'))
+            except ValueError as e:
+                logger.warning(f"Paramètre ids invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            if include:
+                rows = {
+                    note.id: (note, related)
+                    for note, related in note_repository.find_with_related(include, {'id': {'$in': note_ids}}, fields=fields)
+                }
+                items = [serialize_with_related(*rows[note_id], fields) for note_id in note_ids if note_id in rows]
+                found = set(rows)
+            else:
+                notes = note_repository.get_many(note_ids, fields=fields)
+                items = [note.to_dict(fields) for note in notes]
+                found = {note.id for note in notes}
+            logger.info(f"Récupération groupée: {len(found)}/{len(note_ids)} notes trouvées")
+            return jsonify({
+                'items': items,
+                'missing': [note_id for note_id in note_ids if note_id not in found]
+            }), 200
+        
+        # Avec include, la liste est toujours paginée (une page par défaut) : une agrégation
+        # $lookup sur toute la collection n'est pas bornée
+        if 'limit' in request.args or 'cursor' in request.args or include:
+            try:
+                limit = parse_limit(request.args.get('limit'))
+                if include:
+                    rows, next_cursor = note_repository.list_page_with_related(
+                        limit, include, request.args.get('cursor'), fields=fields
+                    )
+                    items = [serialize_with_related(note, related, fields) for note, related in rows]
+                else:
+                    notes, next_cursor = note_repository.list_page(limit, request.args.get('cursor'), fields=fields)
+                    items = [note.to_dict(fields) for note in notes]
+            except ValueError as e:
+                logger.warning(f"Paramètres de pagination invalides: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Page de notes récupérée: {len(items)} notes")
+            return jsonify({
+                'items': items,
+                'next_cursor': next_cursor
+            }), 200
+        
+        stream_format = get_stream_format(request)
+        if stream_format:
+            try:
+                batch_size = parse_batch_size(request.args.get('batch_size'))
+            except ValueError as e:
+                logger.warning(f"Paramètre batch_size invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Export des notes en streaming (format {stream_format})")
+            return stream_response(note_repository.iter_all(batch_size, fields=fields), stream_format, fields)
+        
         logger.info("Récupération de toutes les notes")
-        notes = note_repository.list_all()
+        notes = note_repository.list_all(fields=fields)
         logger.info(f"Récupération réussie: {len(notes)} notes trouvées")
-        return jsonify([note.to_dict() for note in notes]), 200
+        return jsonify([note.to_dict(fields) for note in notes]), 200
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des notes: {str(e)}", exc_info=True)
         return jsonify({'error': f"Erreur lors de la récupération des notes: {str(e)}"}), 500
 
 
+@notes_bp.route('/search', methods=['GET'])
+@log_function_call('search_notes')
+def search_notes():
+    """Rechercher des notes par titre et contenu (recherche plein texte)"""
+    logger = get_logger('notes_routes')
+    try:
+        query = request.args.get('q', '')
+        if not query:
+            logger.warning("Recherche de notes sans terme de recherche")
+            return jsonify({'error': 'Le paramètre q est requis pour la recherche'}), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        stream_format = get_stream_format(request)
+        if stream_format:
+            try:
+                batch_size = parse_batch_size(request.args.get('batch_size'))
+            except ValueError as e:
+                logger.warning(f"Paramètre batch_size invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Recherche de notes en streaming (format {stream_format})")
+            return stream_response(note_repository.iter_search(query, batch_size, fields=fields), stream_format, fields)
+        
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            offset = parse_offset(request.args.get('offset'))
+        except ValueError as e:
+            logger.warning(f"Paramètres de pagination invalides: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        logger.info(f"Recherche de notes avec: {query}")
+        # Un résultat de plus que demandé indique s'il reste une page suivante
+        notes = note_repository.search(query, limit=limit + 1, offset=offset, fields=fields)
+        next_offset = offset + limit if len(notes) > limit else None
+        notes = notes[:limit]
+        logger.info(f"Recherche réussie: {len(notes)} notes trouvées")
+        return jsonify({
+            'items': [note.to_dict(fields) for note in notes],
+            'next_offset': next_offset
+        }), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche de notes: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la recherche de notes: {str(e)}"}), 500
+
+
 @notes_bp.route('/<string:note_id>', methods=['GET'])
 @log_function_call('get_note_by_id')
 def get_note(note_id):
     """Récupérer une note par son ID"""
     logger = get_logger('notes_routes')
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            include = parse_include(request.args.get('include'), INCLUDE_OPTIONS)
+        except ValueError as e:
+            logger.warning(f"Paramètre fields ou include invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        # Les relations ne sont pas couvertes par l'ETag de la note : pas de requête conditionnelle
+        if include:
+            logger.info(f"Récupération de la note {note_id} avec: {', '.join(sorted(include))}")
+            row = note_repository.get_with_related(note_id, include, fields=fields)
+            if not row:
+                logger.warning(f"Note non trouvée avec ID: {note_id}")
+                return jsonify({'error': 'Note non trouvée'}), 404
+            return jsonify(serialize_with_related(*row, fields)), 200
+        
+        # Requête conditionnelle : la version seule suffit à répondre 304
+        if request.if_none_match:
+            version = note_repository.get_version(note_id)
+            if not version:
+                logger.warning(f"Note non trouvée avec ID: {note_id}")
+                return jsonify({'error': 'Note non trouvée'}), 404
+            etag = resource_etag(note_id, version.get('updated_at'), fields)
+            if is_not_modified(etag):
+                logger.info(f"Note non modifiée: {note_id}")
+                return not_modified_response(etag)
+        
         logger.info(f"Récupération de la note avec ID: {note_id}")
-        note = note_repository.get_by_id(note_id)
+        note = note_repository.get_by_id(note_id, fields=fields)
         if not note:
             logger.warning(f"Note non trouvée avec ID: {note_id}")
             return jsonify({'error': 'Note non trouvée'}), 404
         logger.info(f"Note récupérée avec succès: {note_id}")
-        return jsonify(note.to_dict()), 200
+        response = jsonify(note.to_dict(fields))
+        response.set_etag(resource_etag(note.id, note.updated_at, fields))
+        return response, 200
     except Exception as e:
         logger.error(f"Erreur lors de la récupération de la note {note_id}: {str(e)}", exc_info=True)
         return jsonify({'error': f"Erreur lors de la récupération de la note: {str(e)}"}), 500
@@ -57,14 +228,11 @@ def create_note():
         data = request.get_json()
         logger.info("Création d'une nouvelle note")
         
-        if not data or 'content' not in data:
+        try:
+            note = build_note(data)
+        except ValueError as e:
             logger.warning("Tentative de création de note sans contenu")
-            return jsonify({'error': 'Le contenu de la note est requis'}), 400
-        
-        note = Note(
-            content=data['content'],
-            title=data.get('title', '')
-        )
+            return jsonify({'error': str(e)}), 400
         
         note_repository.create(note)
         logger.info(f"Note créée avec succès, ID: {note.id}")
@@ -75,29 +243,68 @@ def create_note():
         return jsonify({'error': f"Erreur lors de la création de la note: {str(e)}"}), 500
 
 
-@notes_bp.route('/<string:note_id>', methods=['PUT'])
+@notes_bp.route('/batch', methods=['POST'])
+@log_function_call('create_notes_batch')
+def create_notes_batch():
+    """Créer plusieurs notes en une requête, avec un résultat par élément"""
+    logger = get_logger('notes_routes')
+    try:
+        try:
+            chunk_size = parse_chunk_size(request.args.get('chunk_size'))
+        except ValueError as e:
+            logger.warning(f"Paramètre chunk_size invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        data = request.get_json(silent=True)
+        items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            logger.warning("Création groupée de notes sans liste d'éléments")
+            return jsonify({'error': 'Une liste non vide de notes est requise'}), 400
+        if len(items) > MAX_BATCH_ITEMS:
+            logger.warning(f"Création groupée trop volumineuse: {len(items)} notes")
+            return jsonify({'error': f"Au plus {MAX_BATCH_ITEMS} notes par requête"}), 400
+        
+        logger.info(f"Création groupée de {len(items)} notes (tranches de {chunk_size})")
+        invalid, positions, notes = {}, [], []
+        for index, item in enumerate(items):
+            try:
+                notes.append(build_note(item))
+                positions.append(index)
+            except ValueError as e:
+                invalid[index] = str(e)
+        
+        write_errors = note_repository.create_many(notes, chunk_size)
+        results, created = batch_results(len(items), invalid, positions, notes, write_errors)
+        logger.info(f"Création groupée terminée: {created}/{len(items)} notes créées")
+        return jsonify({
+            'created': created,
+            'failed': len(items) - created,
+            'results': results
+        }), 201 if created == len(items) else 207
+    except Exception as e:
+        logger.error(f"Erreur lors de la création groupée de notes: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la création groupée de notes: {str(e)}"}), 500
+
+
+@notes_bp.route('/<string:note_id>', methods=['PUT', 'PATCH'])
 @log_function_call('update_note')
 def update_note(note_id):
-    """Mettre à jour une note"""
+    """Mettre à jour une note (seuls les champs fournis sont écrits)"""
     logger = get_logger('notes_routes')
     try:
         logger.info(f"Mise à jour de la note avec ID: {note_id}")
-        note = note_repository.get_by_id(note_id)
+        data = request.get_json(silent=True) or {}
+        changes = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
+        
+        if changes:
+            logger.info(f"Champs mis à jour pour la note {note_id}: {', '.join(changes)}")
+            note = note_repository.update_fields(note_id, changes)
+        else:
+            note = note_repository.get_by_id(note_id)
         if not note:
             logger.warning(f"Note non trouvée pour mise à jour: {note_id}")
             return jsonify({'error': 'Note non trouvée'}), 404
         
-        data = request.get_json()
-        if data:
-            if 'content' in data:
-                logger.info(f"Contenu de la note {note_id} mis à jour")
-                note.content = data['content']
-            if 'title' in data:
-                logger.info(f"Titre de la note {note_id} mis à jour")
-                note.title = data['title']
-            
-            note_repository.update(note)
-        
         logger.info(f"Note {note_id} mise à jour avec succès")
         return jsonify(note.to_dict()), 200
     except Exception as e:
@@ -130,15 +337,22 @@ def delete_note(note_id):
 
 @notes_bp.route('/<string:note_id>/syntheses', methods=['GET'])
 @log_function_call('get_note_syntheses')
+@collection_conditional(lambda: repository_factory.synthesis_repository.collection_version())
 def get_note_syntheses(note_id):
     """Récupérer toutes les synthèses d'une note"""
     logger = get_logger('notes_routes')
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
         logger.info(f"Récupération des synthèses pour la note: {note_id}")
         synthesis_repository = repository_factory.synthesis_repository
-        syntheses = synthesis_repository.list_by_note(note_id)
+        syntheses = synthesis_repository.list_by_note(note_id, fields=fields)
         logger.info(f"Récupération réussie: {len(syntheses)} synthèses trouvées pour la note {note_id}")
-        return jsonify([synthesis.to_dict() for synthesis in syntheses]), 200
+        return jsonify([synthesis.to_dict(fields) for synthesis in syntheses]), 200
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des synthèses pour la note {note_id}: {str(e)}", exc_info=True)
         return jsonify({'error': f"Erreur lors de la récupération des synthèses: {str(e)}"}), 500
\ No newline at end of file
@@ -3,10 +3,16 @@ Routes pour les opérations sur les synthèses
 """
 
 from flask import Blueprint, request, jsonify
-from app.models import Synthesis, AttachmentType
+from app.models import Attachment, AttachmentType
 from app.repository import repository_factory
 from app.logger_config import get_logger
 from app.middleware import log_function_call
+from app.utils.pagination import parse_limit, parse_offset
+from app.utils.streaming import get_stream_format, parse_batch_size, stream_response
+from app.utils.projection import parse_fields
+from app.utils.etag import collection_conditional, is_not_modified, not_modified_response, resource_etag
+from app.utils.bulk import MAX_BATCH_ITEMS, batch_results, parse_chunk_size, parse_ids
+from app.routes.validation import SYNTHESIS_UPDATABLE_FIELDS as UPDATABLE_FIELDS, build_synthesis, parse_attachment_metadata
 
 # Create blueprint for syntheses
 syntheses_bp = Blueprint('syntheses', __name__, url_prefix='/api/v1/syntheses')
@@ -17,14 +23,60 @@ synthesis_repository = repository_factory.synthesis_repository
 
 @syntheses_bp.route('', methods=['GET'])
 @log_function_call('list_syntheses')
+@collection_conditional(lambda: synthesis_repository.collection_version())
 def list_syntheses():
-    """Récupérer toutes les synthèses"""
+    """Récupérer toutes les synthèses, une page si `limit`/`cursor` sont fournis,
+    ou celles des notes listées par `note_ids` (groupées par note)"""
     logger = get_logger('syntheses_routes')
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        if 'note_ids' in request.args:
+            try:
+                note_ids = parse_ids(request.args.get('note_ids'))
+            except ValueError as e:
+                logger.warning(f"Paramètre note_ids invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            grouped = synthesis_repository.list_by_notes(note_ids, fields=fields)
+            logger.info(f"Récupération groupée des synthèses de {len(note_ids)} notes")
+            return jsonify({
+                'items': {
+                    note_id: [synthesis.to_dict(fields) for synthesis in syntheses]
+                    for note_id, syntheses in grouped.items()
+                }
+            }), 200
+        
+        if 'limit' in request.args or 'cursor' in request.args:
+            try:
+                limit = parse_limit(request.args.get('limit'))
+                syntheses, next_cursor = synthesis_repository.list_page(limit, request.args.get('cursor'), fields=fields)
+            except ValueError as e:
+                logger.warning(f"Paramètres de pagination invalides: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Page de synthèses récupérée: {len(syntheses)} synthèses")
+            return jsonify({
+                'items': [synthesis.to_dict(fields) for synthesis in syntheses],
+                'next_cursor': next_cursor
+            }), 200
+        
+        stream_format = get_stream_format(request)
+        if stream_format:
+            try:
+                batch_size = parse_batch_size(request.args.get('batch_size'))
+            except ValueError as e:
+                logger.warning(f"Paramètre batch_size invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Export des synthèses en streaming (format {stream_format})")
+            return stream_response(synthesis_repository.iter_all(batch_size, fields=fields), stream_format, fields)
+        
         logger.info("Récupération de toutes les synthèses")
-        syntheses = synthesis_repository.list_all()
+        syntheses = synthesis_repository.list_all(fields=fields)
         logger.info(f"Récupération réussie: {len(syntheses)} synthèses trouvées")
-        return jsonify([synthesis.to_dict() for synthesis in syntheses]), 200
+        return jsonify([synthesis.to_dict(fields) for synthesis in syntheses]), 200
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des synthèses: {str(e)}", exc_info=True)
         return jsonify({'error': f"Erreur lors de la récupération des synthèses: {str(e)}"}), 500
@@ -37,38 +89,13 @@ def create_synthesis():
     logger = get_logger('syntheses_routes')
     try:
         data = request.get_json()
-        logger.info(f"Création d'une nouvelle synthèse: {data.get('url', 'N/A')}")
-        
-        if not data or 'url' not in data:
-            logger.warning("Tentative de création de synthèse sans URL")
-            return jsonify({'error': "L'URL de la synthèse est requise"}), 400
+        logger.info("Création d'une nouvelle synthèse")
         
-        synthesis = Synthesis(
-            url=data['url'],
-            is_generated=data.get('is_generated', False),
-            note_id=data.get('note_id'),
-            title=data.get('title', '')
-        )
-        
-        # Ajouter les pièces jointes si fournies
-        attachments_data = data.get('attachments', [])
-        for att_data in attachments_data:
-            if 'url' not in att_data or 'type' not in att_data:
-                logger.warning(f"Pièce jointe invalide: {att_data}")
-                return jsonify({'error': 'URL et type requis pour chaque pièce jointe'}), 400
-            
-            try:
-                attachment_type = AttachmentType(att_data['type'])
-            except ValueError:
-                logger.warning(f"Type de pièce jointe invalide: {att_data['type']}")
-                return jsonify({'error': f"Type de pièce jointe invalide: {att_data['type']}"}), 400
-            
-            synthesis.add_attachment(
-                url=att_data['url'],
-                attachment_type=attachment_type,
-                name=att_data.get('name', ''),
-                size=att_data.get('size', 0)
-            )
+        try:
+            synthesis = build_synthesis(data)
+        except ValueError as e:
+            logger.warning(f"Synthèse invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
         
         synthesis_repository.create(synthesis)
         logger.info(f"Synthèse créée avec succès, ID: {synthesis.id}")
@@ -79,49 +106,104 @@ def create_synthesis():
         return jsonify({'error': f"Erreur lors de la création de la synthèse: {str(e)}"}), 500
 
 
+@syntheses_bp.route('/batch', methods=['POST'])
+@log_function_call('create_syntheses_batch')
+def create_syntheses_batch():
+    """Créer plusieurs synthèses en une requête, avec un résultat par élément"""
+    logger = get_logger('syntheses_routes')
+    try:
+        try:
+            chunk_size = parse_chunk_size(request.args.get('chunk_size'))
+        except ValueError as e:
+            logger.warning(f"Paramètre chunk_size invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        data = request.get_json(silent=True)
+        items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            logger.warning("Création groupée de synthèses sans liste d'éléments")
+            return jsonify({'error': 'Une liste non vide de synthèses est requise'}), 400
+        if len(items) > MAX_BATCH_ITEMS:
+            logger.warning(f"Création groupée trop volumineuse: {len(items)} synthèses")
+            return jsonify({'error': f"Au plus {MAX_BATCH_ITEMS} synthèses par requête"}), 400
+        
+        logger.info(f"Création groupée de {len(items)} synthèses (tranches de {chunk_size})")
+        invalid, positions, syntheses = {}, [], []
+        for index, item in enumerate(items):
+            try:
+                syntheses.append(build_synthesis(item))
+                positions.append(index)
+            except ValueError as e:
+                invalid[index] = str(e)
+        
+        write_errors = synthesis_repository.create_many(syntheses, chunk_size)
+        results, created = batch_results(len(items), invalid, positions, syntheses, write_errors)
+        logger.info(f"Création groupée terminée: {created}/{len(items)} synthèses créées")
+        return jsonify({
+            'created': created,
+            'failed': len(items) - created,
+            'results': results
+        }), 201 if created == len(items) else 207
+    except Exception as e:
+        logger.error(f"Erreur lors de la création groupée de synthèses: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de la création groupée de synthèses: {str(e)}"}), 500
+
+
 @syntheses_bp.route('/<string:synthesis_id>', methods=['GET'])
 @log_function_call('get_synthesis_by_id')
 def get_synthesis(synthesis_id):
     """Récupérer une synthèse par son ID"""
     logger = get_logger('syntheses_routes')
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        # Requête conditionnelle : la version seule suffit à répondre 304
+        if request.if_none_match:
+            version = synthesis_repository.get_version(synthesis_id)
+            if not version:
+                logger.warning(f"Synthèse non trouvée avec ID: {synthesis_id}")
+                return jsonify({'error': 'Synthèse non trouvée'}), 404
+            etag = resource_etag(synthesis_id, version.get('updated_at'), fields)
+            if is_not_modified(etag):
+                logger.info(f"Synthèse non modifiée: {synthesis_id}")
+                return not_modified_response(etag)
+        
         logger.info(f"Récupération de la synthèse avec ID: {synthesis_id}")
-        synthesis = synthesis_repository.get_by_id(synthesis_id)
+        synthesis = synthesis_repository.get_by_id(synthesis_id, fields=fields)
         if not synthesis:
             logger.warning(f"Synthèse non trouvée avec ID: {synthesis_id}")
             return jsonify({'error': 'Synthèse non trouvée'}), 404
         logger.info(f"Synthèse récupérée avec succès: {synthesis_id}")
-        return jsonify(synthesis.to_dict()), 200
+        response = jsonify(synthesis.to_dict(fields))
+        response.set_etag(resource_etag(synthesis.id, synthesis.updated_at, fields))
+        return response, 200
     except Exception as e:
         logger.error(f"Erreur lors de la récupération de la synthèse {synthesis_id}: {str(e)}", exc_info=True)
         return jsonify({'error': f"Erreur lors de la récupération de la synthèse: {str(e)}"}), 500
 
 
-@syntheses_bp.route('/<string:synthesis_id>', methods=['PUT'])
+@syntheses_bp.route('/<string:synthesis_id>', methods=['PUT', 'PATCH'])
 @log_function_call('update_synthesis')
 def update_synthesis(synthesis_id):
-    """Mettre à jour une synthèse"""
+    """Mettre à jour une synthèse (seuls les champs fournis sont écrits)"""
     logger = get_logger('syntheses_routes')
     try:
         logger.info(f"Mise à jour de la synthèse avec ID: {synthesis_id}")
-        synthesis = synthesis_repository.get_by_id(synthesis_id)
+        data = request.get_json(silent=True) or {}
+        changes = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
+        
+        if changes:
+            synthesis = synthesis_repository.update_fields(synthesis_id, changes)
+        else:
+            synthesis = synthesis_repository.get_by_id(synthesis_id)
         if not synthesis:
             logger.warning(f"Synthèse non trouvée pour mise à jour: {synthesis_id}")
             return jsonify({'error': 'Synthèse non trouvée'}), 404
         
-        data = request.get_json()
-        if data:
-            if 'url' in data:
-                synthesis.url = data['url']
-            if 'is_generated' in data:
-                synthesis.is_generated = data['is_generated']
-            if 'note_id' in data:
-                synthesis.note_id = data['note_id']
-            if 'title' in data:
-                synthesis.title = data['title']
-            
-            synthesis_repository.update(synthesis)
-        
         logger.info(f"Synthèse {synthesis_id} mise à jour avec succès")
         return jsonify(synthesis.to_dict()), 200
     except Exception as e:
@@ -155,18 +237,51 @@ def delete_synthesis(synthesis_id):
 @syntheses_bp.route('/search', methods=['GET'])
 @log_function_call('search_syntheses')
 def search_syntheses():
-    """Rechercher des synthèses par titre"""
+    """Rechercher des synthèses par titre (recherche plein texte, triée par pertinence)"""
     logger = get_logger('syntheses_routes')
     try:
-        title = request.args.get('title', '')
+        title = request.args.get('q') or request.args.get('title', '')
         if not title:
             logger.warning("Recherche de synthèses sans terme de recherche")
-            return jsonify({'error': 'Le paramètre title est requis pour la recherche'}), 400
+            return jsonify({'error': 'Le paramètre title (ou q) est requis pour la recherche'}), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        stream_format = get_stream_format(request)
+        if stream_format:
+            try:
+                batch_size = parse_batch_size(request.args.get('batch_size'))
+            except ValueError as e:
+                logger.warning(f"Paramètre batch_size invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Recherche de synthèses en streaming (format {stream_format})")
+            return stream_response(synthesis_repository.iter_search_by_title(title, batch_size, fields=fields), stream_format, fields)
+        
+        if 'limit' in request.args or 'offset' in request.args:
+            try:
+                limit = parse_limit(request.args.get('limit'))
+                offset = parse_offset(request.args.get('offset'))
+            except ValueError as e:
+                logger.warning(f"Paramètres de pagination invalides: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            # Un résultat de plus que demandé indique s'il reste une page suivante
+            syntheses = synthesis_repository.search_by_title(title, limit=limit + 1, offset=offset, fields=fields)
+            next_offset = offset + limit if len(syntheses) > limit else None
+            syntheses = syntheses[:limit]
+            logger.info(f"Page de recherche récupérée: {len(syntheses)} synthèses")
+            return jsonify({
+                'items': [synthesis.to_dict(fields) for synthesis in syntheses],
+                'next_offset': next_offset
+            }), 200
         
         logger.info(f"Recherche de synthèses avec le titre: {title}")
-        syntheses = synthesis_repository.search_by_title(title)
+        syntheses = synthesis_repository.search_by_title(title, fields=fields)
         logger.info(f"Recherche réussie: {len(syntheses)} synthèses trouvées")
-        return jsonify([synthesis.to_dict() for synthesis in syntheses]), 200
+        return jsonify([synthesis.to_dict(fields) for synthesis in syntheses]), 200
     except Exception as e:
         logger.error(f"Erreur lors de la recherche de synthèses: {str(e)}", exc_info=True)
         return jsonify({'error': f"Erreur lors de la recherche de synthèses: {str(e)}"}), 500
@@ -174,14 +289,31 @@ def search_syntheses():
 
 @syntheses_bp.route('/note/<string:note_id>', methods=['GET'])
 @log_function_call('get_syntheses_by_note')
+@collection_conditional(lambda: synthesis_repository.collection_version())
 def get_syntheses_by_note(note_id):
     """Récupérer toutes les synthèses d'une note"""
     logger = get_logger('syntheses_routes')
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning(f"Paramètre fields invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        stream_format = get_stream_format(request)
+        if stream_format:
+            try:
+                batch_size = parse_batch_size(request.args.get('batch_size'))
+            except ValueError as e:
+                logger.warning(f"Paramètre batch_size invalide: {str(e)}")
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Export des synthèses de la note {note_id} en streaming (format {stream_format})")
+            return stream_response(synthesis_repository.iter_by_note(note_id, batch_size, fields=fields), stream_format, fields)
+        
         logger.info(f"Récupération des synthèses pour la note: {note_id}")
-        syntheses = synthesis_repository.list_by_note(note_id)
+        syntheses = synthesis_repository.list_by_note(note_id, fields=fields)
         logger.info(f"Récupération réussie: {len(syntheses)} synthèses trouvées pour la note {note_id}")
-        return jsonify([synthesis.to_dict() for synthesis in syntheses]), 200
+        return jsonify([synthesis.to_dict(fields) for synthesis in syntheses]), 200
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des synthèses pour la note {note_id}: {str(e)}", exc_info=True)
         return jsonify({'error': f"Erreur lors de la récupération des synthèses: {str(e)}"}), 500
@@ -193,30 +325,16 @@ def get_synthesis_stats():
     """Récupérer les statistiques des synthèses"""
     logger = get_logger('syntheses_routes')
     try:
-        logger.info("Récupération des statistiques des synthèses")
-        
-        total_count = synthesis_repository.count()
-        
-        # Statistiques par type de génération
-        all_syntheses = synthesis_repository.list_all()
-        generated_count = sum(1 for s in all_syntheses if s.is_generated)
-        manual_count = total_count - generated_count
-        
-        # Statistiques des attachments
-        total_attachments = sum(len(s.attachments) for s in all_syntheses)
-        audio_attachments = sum(len(s.get_attachments_by_type(AttachmentType.AUDIO)) for s in all_syntheses)
-        document_attachments = sum(len(s.get_attachments_by_type(AttachmentType.DOCUMENT)) for s in all_syntheses)
-        
-        stats = {
-            'total_syntheses': total_count,
-            'generated_syntheses': generated_count,
-            'manual_syntheses': manual_count,
-            'total_attachments': total_attachments,
-            'audio_attachments': audio_attachments,
-            'document_attachments': document_attachments
-        }
-        
-        logger.info(f"Statistiques récupérées: {stats}")
+        group_by = request.args.get('group_by') or None
+        logger.info(f"Récupération des statistiques des synthèses (regroupement: {group_by})")
+        
+        try:
+            stats = synthesis_repository.get_stats(group_by)
+        except ValueError as e:
+            logger.warning(f"Paramètre group_by invalide: {group_by}")
+            return jsonify({'error': str(e)}), 400
+        
+        logger.info(f"Statistiques récupérées: {stats['total_syntheses']} synthèses")
         return jsonify(stats), 200
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des statistiques: {str(e)}", exc_info=True)
@@ -231,7 +349,7 @@ def get_synthesis_attachments(synthesis_id):
     logger = get_logger('syntheses_routes')
     try:
         logger.info(f"Récupération des attachments de la synthèse: {synthesis_id}")
-        synthesis = synthesis_repository.get_by_id(synthesis_id)
+        synthesis = synthesis_repository.get_by_id(synthesis_id, fields=['attachments'])
         if not synthesis:
             logger.warning(f"Synthèse non trouvée: {synthesis_id}")
             return jsonify({'error': 'Synthèse non trouvée'}), 404
@@ -263,12 +381,17 @@ def add_attachment_to_synthesis(synthesis_id):
             logger.warning(f"Type d'attachment invalide: {data['type']}")
             return jsonify({'error': f"Type d'attachment invalide: {data['type']}"}), 400
         
+        try:
+            metadata = parse_attachment_metadata(data)
+        except ValueError as e:
+            logger.warning(f"Attachment invalide: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
         synthesis = synthesis_repository.add_attachment_to_synthesis(
             synthesis_id=synthesis_id,
             url=data['url'],
             attachment_type=attachment_type,
-            name=data.get('name', ''),
-            size=data.get('size', 0)
+            **metadata
         )
         
         if synthesis:
@@ -283,6 +406,50 @@ def add_attachment_to_synthesis(synthesis_id):
         return jsonify({'error': f"Erreur lors de l'ajout de l'attachment: {str(e)}"}), 500
 
 
+@syntheses_bp.route('/<string:synthesis_id>/attachments/batch', methods=['POST'])
+@log_function_call('add_attachments_to_synthesis')
+def add_attachments_to_synthesis(synthesis_id):
+    """Ajouter plusieurs attachments à une synthèse en une seule écriture"""
+    logger = get_logger('syntheses_routes')
+    try:
+        data = request.get_json()
+        items = data.get('attachments') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            logger.warning("Liste d'attachments requise")
+            return jsonify({'error': "Le champ attachments doit être une liste non vide"}), 400
+        
+        logger.info(f"Ajout de {len(items)} attachments à la synthèse: {synthesis_id}")
+        attachments = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or 'url' not in item or 'type' not in item:
+                logger.warning(f"URL et type requis pour l'attachment {index}")
+                return jsonify({'error': f"URL et type requis pour l'attachment {index}"}), 400
+            try:
+                attachment_type = AttachmentType(item['type'])
+            except ValueError:
+                logger.warning(f"Type d'attachment invalide: {item['type']}")
+                return jsonify({'error': f"Type d'attachment invalide: {item['type']}"}), 400
+            try:
+                metadata = parse_attachment_metadata(item)
+            except ValueError as e:
+                logger.warning(f"Attachment {index} invalide: {str(e)}")
+                return jsonify({'error': f"Attachment {index}: {str(e)}"}), 400
+            attachments.append(Attachment(url=item['url'], type=attachment_type, **metadata))
+        
+        synthesis = synthesis_repository.add_attachments_to_synthesis(synthesis_id, attachments)
+        
+        if synthesis:
+            logger.info(f"{len(attachments)} attachments ajoutés à la synthèse {synthesis_id}")
+            return jsonify(synthesis.to_dict()), 200
+        else:
+            logger.warning(f"Synthèse non trouvée: {synthesis_id}")
+            return jsonify({'error': 'Synthèse non trouvée'}), 404
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de l'ajout des attachments à la synthèse {synthesis_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': f"Erreur lors de l'ajout des attachments: {str(e)}"}), 500
+
+
 @syntheses_bp.route('/<string:synthesis_id>/attachments/<path:url>', methods=['DELETE'])
 @log_function_call('remove_attachment_from_synthesis')
 def remove_attachment_from_synthesis(synthesis_id, url):
@@ -336,12 +503,11 @@ def get_attachment_count(synthesis_id):
     logger = get_logger('syntheses_routes')
     try:
         logger.info(f"Récupération du nombre d'attachments pour la synthèse: {synthesis_id}")
-        synthesis = synthesis_repository.get_by_id(synthesis_id)
-        if not synthesis:
+        count = synthesis_repository.count_attachments(synthesis_id)
+        if count is None:
             logger.warning(f"Synthèse non trouvée: {synthesis_id}")
             return jsonify({'error': 'Synthèse non trouvée'}), 404
         
-        count = len(synthesis.attachments)
         logger.info(f"Nombre d'attachments récupéré: {count}")
         return jsonify({'attachment_count': count}), 200
     except Exception as e:
@@ -1,7 +1,7 @@
 # app/routes/auth_routes.py
 from flask import Blueprint, request, jsonify
 from app.models.model import User
-from app.repository.user_repository import UserRepository
+from app.repository import repository_factory
 from app.utils.jwt_manager import jwt_manager
 from app.logger_config import get_logger
 from app.middleware import log_function_call
@@ -11,7 +11,7 @@ import re
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/v1/auth')
 
 # Get repository instance
-user_repository = UserRepository()
+user_repository = repository_factory.user_repository
 
 def validate_email(email):
     """Valider le format email"""
@@ -0,0 +1,61 @@
+"""
+Validation des corps de requête, partagée par les routes Flask et Quart
+Aucune dépendance au framework web : les routes lisent le JSON et traduisent les
+ValueError en réponses 400.
+"""
+
+from app.models import AttachmentType, Note, Synthesis
+
+# Champs modifiables par PUT/PATCH
+NOTE_UPDATABLE_FIELDS = ('content', 'title')
+SYNTHESIS_UPDATABLE_FIELDS = ('url', 'is_generated', 'note_id', 'title')
+
+
+def build_note(data) -> Note:
+    """Valider le corps d'une création de note et construire le modèle"""
+    if not isinstance(data, dict) or 'content' not in data:
+        raise ValueError('Le contenu de la note est requis')
+    return Note(
+        content=data['content'],
+        title=data.get('title', '')
+    )
+
+
+def parse_attachment_metadata(data) -> dict:
+    """Valider les champs optionnels d'un attachment (`name`, `size` en octets)"""
+    name = data.get('name')
+    size = data.get('size')
+    if name is not None and not isinstance(name, str):
+        raise ValueError("Le nom de l'attachment doit être une chaîne")
+    if size is not None and (isinstance(size, bool) or not isinstance(size, int) or size < 0):
+        raise ValueError("La taille de l'attachment doit être un entier positif")
+    return {'name': name, 'size': size}
+
+
+def build_synthesis(data) -> Synthesis:
+    """Valider le corps d'une création de synthèse et construire le modèle"""
+    if not isinstance(data, dict) or 'url' not in data:
+        raise ValueError("L'URL de la synthèse est requise")
+    
+    synthesis = Synthesis(
+        url=data['url'],
+        is_generated=data.get('is_generated', False),
+        note_id=data.get('note_id'),
+        title=data.get('title', '')
+    )
+    
+    # Ajouter les pièces jointes si fournies
+    for att_data in data.get('attachments', []):
+        if not isinstance(att_data, dict) or 'url' not in att_data or 'type' not in att_data:
+            raise ValueError('URL et type requis pour chaque pièce jointe')
+        try:
+            attachment_type = AttachmentType(att_data['type'])
+        except ValueError:
+            raise ValueError(f"Type de pièce jointe invalide: {att_data['type']}")
+        
+        synthesis.add_attachment(
+            url=att_data['url'],
+            attachment_type=attachment_type,
+            **parse_attachment_metadata(att_data)
+        )
+    return synthesis
@@ -0,0 +1,88 @@
+"""
+Opérations groupées : lectures par liste d'identifiants, insert_many non ordonnés
+par tranches et résultats par élément
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pymongo.errors import BulkWriteError, PyMongoError
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+MAX_BATCH_ITEMS = 10000
+MAX_BATCH_IDS = 500
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def parse_ids(raw_ids: Optional[str], max_ids: int = MAX_BATCH_IDS) -> List[str]:
+    """Valider une liste d'identifiants séparés par des virgules (doublons retirés, ordre conservé)"""
+    ids = list(dict.fromkeys(item.strip() for item in (raw_ids or '').split(',') if item.strip()))
+    if not ids:
+        raise ValueError("Au moins un identifiant est requis")
+    if len(ids) > max_ids:
+        raise ValueError(f"Au plus {max_ids} identifiants par requête")
+    return ids
+
+
+def parse_chunk_size(raw_chunk_size: Optional[str]) -> int:
+    """Valider le paramètre `chunk_size` (documents par insert_many)"""
+    if raw_chunk_size is None or raw_chunk_size == '':
+        return DEFAULT_CHUNK_SIZE
+    try:
+        chunk_size = int(raw_chunk_size)
+    except ValueError:
+        raise ValueError(f"Paramètre chunk_size invalide: {raw_chunk_size}")
+    if chunk_size < 1:
+        raise ValueError("Le paramètre chunk_size doit être supérieur à 0")
+    return min(chunk_size, MAX_CHUNK_SIZE)
+
+
+def insert_many_in_chunks(collection, documents: List[Dict[str, Any]],
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Optional[Dict[str, Any]]]:
+    """Insérer des documents par insert_many non ordonnés de `chunk_size` documents
+
+    Un document en échec n'empêche pas l'insertion des autres. Une tranche interrompue
+    par une autre erreur MongoDB (réseau, timeout) est comptée en échec en entier : les
+    tranches déjà écrites restent comptées et les suivantes sont tentées. Retourne, pour
+    chaque document, None s'il a été inséré, sinon l'erreur MongoDB (`code`, `message`).
+    """
+    errors: List[Optional[Dict[str, Any]]] = [None] * len(documents)
+    for start in range(0, len(documents), chunk_size):
+        try:
+            collection.insert_many(documents[start:start + chunk_size], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                errors[start + error['index']] = {'code': error.get('code'), 'message': error.get('errmsg')}
+        except PyMongoError as e:
+            chunk_error = {'code': getattr(e, 'code', None), 'message': str(e)}
+            for index in range(start, min(start + chunk_size, len(documents))):
+                errors[index] = chunk_error
+    return errors
+
+
+def batch_results(total: int, invalid: Dict[int, str], positions: Sequence[int], models: Sequence[Any],
+                  write_errors: Sequence[Optional[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Assembler le résultat de chaque élément d'une création groupée
+
+    Args:
+        total: Nombre d'éléments reçus
+        invalid: Erreurs de validation par position
+        positions: Position d'origine de chaque modèle écrit
+        models: Modèles passés au repository
+        write_errors: Résultat de `insert_many_in_chunks` pour ces modèles
+
+    Retourne la liste des résultats (dans l'ordre de la requête) et le nombre de créations.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * total
+    for index, message in invalid.items():
+        results[index] = {'index': index, 'status': 400, 'error': message}
+
+    created = 0
+    for index, model, error in zip(positions, models, write_errors):
+        if error is None:
+            created += 1
+            results[index] = {'index': index, 'status': 201, 'item': model.to_dict()}
+        else:
+            status = 409 if error['code'] == DUPLICATE_KEY_ERROR else 500
+            results[index] = {'index': index, 'status': status, 'error': error['message']}
+    return results, created
@@ -0,0 +1,97 @@
+"""
+ETags forts et requêtes conditionnelles (If-None-Match) pour les notes et synthèses
+"""
+
+import functools
+import hashlib
+from typing import Any, Callable, Iterable, Optional
+from flask import Response, make_response, request
+from app.logger_config import get_logger
+from app.utils.streaming import JSON_MIMETYPE, NDJSON_MIMETYPE, get_stream_format
+
+logger = get_logger('etag')
+
+# Projection et tri minimaux pour connaître la version d'un document ou d'une collection
+VERSION_PROJECTION = {'_id': 0, 'id': 1, 'updated_at': 1}
+VERSION_SORT = [('updated_at', -1), ('id', -1)]
+
+
+def compute_etag(*parts: Any) -> str:
+    """Empreinte stable des éléments qui identifient une représentation"""
+    raw = '\x1f'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def resource_etag(item_id: str, updated_at: Any, fields: Optional[Iterable[str]] = None) -> str:
+    """ETag d'une ressource : id, date de modification et champs demandés"""
+    return compute_etag(item_id, updated_at, ','.join(fields) if fields is not None else '*')
+
+
+def collection_etag(version: Iterable[Any], path: str = '', media_type: str = JSON_MIMETYPE,
+                    query_string: bytes = b'') -> str:
+    """ETag d'une liste : version de la collection, chemin, format et paramètres de la requête"""
+    return compute_etag(*version, path, media_type, query_string.decode('utf-8', 'replace'))
+
+
+def _list_media_type() -> str:
+    """Format négocié de la liste : NDJSON et JSON sont deux représentations distinctes"""
+    return NDJSON_MIMETYPE if get_stream_format(request) == 'ndjson' else JSON_MIMETYPE
+
+
+def _body_etag(response: Response, media_type: str) -> str:
+    """ETag calculé depuis le corps déjà sérialisé d'une réponse"""
+    return compute_etag(
+        'body', request.path, media_type, request.query_string.decode('utf-8', 'replace'),
+        hashlib.sha1(response.get_data()).hexdigest()
+    )
+
+
+def is_not_modified(etag: str) -> bool:
+    """Vérifier si l'ETag du client (If-None-Match) correspond encore"""
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag: str) -> Response:
+    """Réponse 304 sans corps, qui rappelle l'ETag courant"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def collection_conditional(get_version: Callable[[], Iterable[Any]]):
+    """Décorateur des routes de liste : ETag de collection et réponse 304
+
+    La version n'est lue que pour une requête conditionnelle (If-None-Match), avant les
+    données : une écriture concurrente produit au pire un ETag plus ancien que le
+    contenu, que le client revalidera à la requête suivante. Une requête sans
+    If-None-Match ne paie pas cette lecture : l'ETag de sa réponse est l'empreinte du
+    corps déjà sérialisé (rien pour un export en streaming). À la revalidation suivante,
+    une empreinte de corps encore valable donne un 304 qui transmet l'ETag de version.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            media_type = _list_media_type()
+            etag = None
+            if request.if_none_match:
+                try:
+                    etag = collection_etag(get_version(), request.path, media_type, request.query_string)
+                except Exception as e:
+                    logger.warning(f"ETag de collection indisponible: {str(e)}")
+                if etag is not None and is_not_modified(etag):
+                    return not_modified_response(etag)
+
+            response = make_response(view(*args, **kwargs))
+            response.vary.add('Accept')
+            if response.status_code != 200 or response.is_streamed:
+                if etag is not None and response.status_code == 200:
+                    response.set_etag(etag)
+                return response
+
+            body_etag = _body_etag(response, media_type)
+            if request.if_none_match and is_not_modified(body_etag):
+                return not_modified_response(etag or body_etag)
+            response.set_etag(etag or body_etag)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,85 @@
+"""
+Pagination par clé (keyset) basée sur le couple (created_at, id)
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Tri du plus récent au plus ancien, `id` départage les documents créés au même instant
+KEYSET_SORT = [('created_at', -1), ('id', -1)]
+
+
+def parse_limit(raw_limit: Optional[str]) -> int:
+    """Valider le paramètre `limit` d'une requête paginée"""
+    if raw_limit is None or raw_limit == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw_limit)
+    except ValueError:
+        raise ValueError(f"Paramètre limit invalide: {raw_limit}")
+    if limit < 1:
+        raise ValueError("Le paramètre limit doit être supérieur à 0")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_offset(raw_offset: Optional[str]) -> int:
+    """Valider le paramètre `offset` des résultats de recherche"""
+    if raw_offset is None or raw_offset == '':
+        return 0
+    try:
+        offset = int(raw_offset)
+    except ValueError:
+        raise ValueError(f"Paramètre offset invalide: {raw_offset}")
+    if offset < 0:
+        raise ValueError("Le paramètre offset doit être positif")
+    return offset
+
+
+def encode_cursor(created_at: Any, item_id: str) -> str:
+    """Encoder la position du dernier élément d'une page en curseur opaque"""
+    # Les dates BSON sont marquées pour être restituées en datetime au décodage ;
+    # les documents pas encore migrés conservent leur date sous forme de chaîne
+    if isinstance(created_at, datetime):
+        payload = {'d': created_at.isoformat(), 'i': item_id}
+    else:
+        payload = {'c': created_at, 'i': item_id}
+    encoded = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(encoded.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """Décoder un curseur opaque en couple (created_at, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if 'd' in payload:
+            return datetime.fromisoformat(payload['d']), payload['i']
+        return payload['c'], payload['i']
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError):
+        raise ValueError("Curseur de pagination invalide")
+
+
+def keyset_query(cursor: Optional[str], base_query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Construire le filtre MongoDB des éléments situés après le curseur"""
+    query = dict(base_query or {})
+    if not cursor:
+        return query
+
+    created_at, item_id = decode_cursor(cursor)
+    after = [
+        {'created_at': {'$lt': created_at}},
+        {'created_at': created_at, 'id': {'$lt': item_id}},
+    ]
+    # `$lt` ne compare que des valeurs du même type BSON. Le tri décroissant place toutes
+    # les dates avant toutes les chaînes : tant que la migration des dates n'est pas
+    # terminée, les documents encore datés en chaîne ISO suivent un curseur daté
+    if isinstance(created_at, datetime):
+        after.append({'created_at': {'$type': 'string'}})
+    query['$or'] = after
+    return query
@@ -0,0 +1,49 @@
+"""
+Projection des champs (`?fields=`) transmise à MongoDB
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+_FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def parse_fields(raw_fields: Optional[str]) -> Optional[List[str]]:
+    """Valider le paramètre `fields` (liste de champs séparés par des virgules)
+
+    Retourne None si le paramètre est absent : le document complet est alors renvoyé.
+    """
+    if raw_fields is None or not raw_fields.strip():
+        return None
+    fields = [field.strip() for field in raw_fields.split(',') if field.strip()]
+    for field in fields:
+        if not _FIELD_NAME.match(field):
+            raise ValueError(f"Nom de champ invalide: {field}")
+    return fields
+
+
+def parse_include(raw_include: Optional[str], allowed: Iterable[str]) -> Set[str]:
+    """Valider le paramètre `include` (relations à résoudre côté serveur, séparées par des virgules)"""
+    if raw_include is None or not raw_include.strip():
+        return set()
+    include = {item.strip() for item in raw_include.split(',') if item.strip()}
+    unknown = include.difference(allowed)
+    if unknown:
+        raise ValueError(f"Valeur include invalide: {', '.join(sorted(unknown))}")
+    return include
+
+
+def build_projection(fields: Optional[Iterable[str]], required: Iterable[str] = ()) -> Optional[Dict[str, int]]:
+    """Construire la projection MongoDB d'une liste de champs
+
+    `id` est toujours inclus, ainsi que les champs `required` dont le repository a besoin
+    (par exemple `created_at` pour calculer le curseur de pagination).
+    """
+    if fields is None:
+        return None
+    projection = {'id': 1}
+    for field in required:
+        projection[field] = 1
+    for field in fields:
+        projection[field] = 1
+    return projection
@@ -0,0 +1,63 @@
+"""
+Réponses en streaming (NDJSON ou tableau JSON par morceaux) pour les listes volumineuses
+"""
+
+from typing import Iterable, Iterator, List, Optional
+from flask import Response, current_app, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+JSON_MIMETYPE = 'application/json'
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 10000
+
+
+def get_stream_format(request) -> Optional[str]:
+    """Déterminer si le client demande une réponse en streaming
+
+    Retourne 'ndjson', 'json' (tableau JSON par morceaux) ou None.
+    """
+    stream = request.args.get('stream', '').lower()
+    if stream in ('ndjson', 'json'):
+        return stream
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return 'ndjson'
+    return None
+
+
+def parse_batch_size(raw_batch_size: Optional[str]) -> int:
+    """Valider le paramètre `batch_size` transmis au curseur MongoDB"""
+    if raw_batch_size is None or raw_batch_size == '':
+        return DEFAULT_BATCH_SIZE
+    try:
+        batch_size = int(raw_batch_size)
+    except ValueError:
+        raise ValueError(f"Paramètre batch_size invalide: {raw_batch_size}")
+    if batch_size < 1:
+        raise ValueError("Le paramètre batch_size doit être supérieur à 0")
+    return min(batch_size, MAX_BATCH_SIZE)
+
+
+def _ndjson_lines(items: Iterable, fields: Optional[List[str]]) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    for item in items:
+        yield dumps(item.to_dict(fields)) + '\n'
+
+
+def _json_array_chunks(items: Iterable, fields: Optional[List[str]]) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    yield '['
+    separator = ''
+    for item in items:
+        yield separator + dumps(item.to_dict(fields))
+        separator = ','
+    yield ']'
+
+
+def stream_response(items: Iterable, stream_format: str, fields: Optional[List[str]] = None) -> Response:
+    """Construire une réponse Flask qui encode les modèles au fil de l'itération"""
+    if stream_format == 'ndjson':
+        body, mimetype = _ndjson_lines(items, fields), NDJSON_MIMETYPE
+    else:
+        body, mimetype = _json_array_chunks(items, fields), JSON_MIMETYPE
+    return Response(stream_with_context(body), status=200, mimetype=mimetype)
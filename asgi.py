@@ -0,0 +1,12 @@
+from app.asgi_app import create_async_app
+
+# Create ASGI application (uvicorn asgi:app --workers 4)
+app = create_async_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(
+        "asgi:app",
+        host='0.0.0.0',
+        port=8000
+    )
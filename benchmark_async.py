@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de charge : serveur Flask threadé (main.py) contre application ASGI (asgi.py)
+Envoie le même mélange de requêtes de lecture aux deux serveurs, déjà démarrés sur la
+même base MongoDB, avec un nombre fixe de requêtes simultanées, et affiche le débit
+et les latences p50/p95/p99.
+
+    python main.py                                  # http://localhost:5000
+    uvicorn asgi:app --port 8000 --workers 1        # http://localhost:8000
+    python benchmark_async.py --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks.load import percentile
+
+DEFAULT_PATHS = (
+    '/api/v1/notes?limit=50',
+    '/api/v1/syntheses?limit=50',
+    '/api/v1/health',
+)
+
+
+async def run_load(base_url, paths, total_requests, concurrency, timeout):
+    """Envoyer `total_requests` requêtes, au plus `concurrency` à la fois"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def one_request(index):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[index % len(paths)])
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request(index) for index in range(total_requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': total_requests,
+        'errors': errors,
+        'throughput': total_requests / elapsed,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def print_result(label, result):
+    """Afficher le résultat d'un serveur"""
+    print(f"  {label:<10} {result['throughput']:>9,.0f} req/s   "
+          f"p50 {result['p50_ms']:>8.1f} ms   p95 {result['p95_ms']:>8.1f} ms   "
+          f"p99 {result['p99_ms']:>8.1f} ms   erreurs {result['errors']}")
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Comparer le serveur threadé et l'application ASGI")
+    parser.add_argument('--threaded-url', default='http://localhost:5000', help="URL du serveur Flask threadé")
+    parser.add_argument('--asgi-url', default='http://localhost:8000', help="URL de l'application ASGI")
+    parser.add_argument('--requests', type=int, default=5000, help="Nombre de requêtes par serveur")
+    parser.add_argument('--concurrency', type=int, default=200, help="Requêtes simultanées")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Timeout par requête (secondes)")
+    parser.add_argument('--path', action='append', dest='paths',
+                        help="Chemin à interroger (répétable, par défaut listes et health)")
+    parser.add_argument('--warmup', type=int, default=200, help="Requêtes d'échauffement non mesurées")
+    args = parser.parse_args()
+
+    paths = tuple(args.paths or DEFAULT_PATHS)
+    print(f"{args.requests} requêtes, {args.concurrency} simultanées, chemins: {', '.join(paths)}")
+
+    results = {}
+    for label, base_url in (('threadé', args.threaded_url), ('asgi', args.asgi_url)):
+        try:
+            if args.warmup:
+                asyncio.run(run_load(base_url, paths, args.warmup, args.concurrency, args.timeout))
+            results[label] = asyncio.run(run_load(base_url, paths, args.requests, args.concurrency, args.timeout))
+        except httpx.HTTPError as e:
+            print(f"  {label}: serveur injoignable ({base_url}): {e}", file=sys.stderr)
+            continue
+        print_result(label, results[label])
+
+    if len(results) == 2 and results['threadé']['throughput']:
+        print(f"  gain de débit ASGI: x{results['asgi']['throughput'] / results['threadé']['throughput']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
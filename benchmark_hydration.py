@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de l'hydratation des documents MongoDB en modèles
+Compare l'ancienne boucle recopiée dans chaque repository avec le codec partagé
+(app.repository.codec) sur des documents de notes générés en mémoire, sans base.
+"""
+
+import argparse
+import sys
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bson import ObjectId
+from app.models.model import Note
+from app.repository.codec import NOTE_CODEC
+
+
+def make_documents(count, string_dates_ratio):
+    """Générer des documents de notes tels que renvoyés par PyMongo"""
+    start = datetime(2024, 1, 1)
+    string_every = int(1 / string_dates_ratio) if string_dates_ratio else 0
+    docs = []
+    for index in range(count):
+        created_at = start + timedelta(seconds=index)
+        doc = {
+            '_id': ObjectId(),
+            'id': str(uuid.uuid4()),
+            'title': f"Note {index}",
+            'content': "Lorem ipsum dolor sit amet " * 8,
+            'attachments': [],
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+        # Une fraction des documents garde des dates en chaîne ISO (non migrés)
+        if string_every and index % string_every == 0:
+            doc['created_at'] = created_at.isoformat() + 'Z'
+            doc['updated_at'] = created_at.isoformat() + 'Z'
+        docs.append(doc)
+    return docs
+
+
+def legacy_hydrate(docs):
+    """Boucle d'hydratation utilisée auparavant par chaque méthode de repository"""
+    notes = []
+    for doc in docs:
+        doc['_id'] = str(doc['_id'])
+        if 'created_at' in doc and isinstance(doc['created_at'], str):
+            from datetime import datetime
+            doc['created_at'] = datetime.fromisoformat(doc['created_at'].replace('Z', '+00:00'))
+        if 'updated_at' in doc and isinstance(doc['updated_at'], str):
+            from datetime import datetime
+            doc['updated_at'] = datetime.fromisoformat(doc['updated_at'].replace('Z', '+00:00'))
+        notes.append(Note.from_dict(doc))
+    return notes
+
+
+def codec_hydrate(docs):
+    """Hydratation via le codec partagé"""
+    return list(NOTE_CODEC.decode_many(docs))
+
+
+def measure(hydrate, count, string_dates_ratio, repeat):
+    """Retourner le meilleur débit (documents/seconde) sur `repeat` exécutions"""
+    best = None
+    for _ in range(repeat):
+        # Les documents sont modifiés en place : on les régénère à chaque passe
+        docs = make_documents(count, string_dates_ratio)
+        started = time.perf_counter()
+        hydrate(docs)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Mesurer le débit d'hydratation des notes")
+    parser.add_argument('--count', type=int, default=100_000, help="Nombre de documents hydratés")
+    parser.add_argument('--string-dates', type=float, default=0.1,
+                        help="Proportion de documents avec des dates en chaîne ISO")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de passes (le meilleur temps est retenu)")
+    args = parser.parse_args()
+
+    legacy = measure(legacy_hydrate, args.count, args.string_dates, args.repeat)
+    codec = measure(codec_hydrate, args.count, args.string_dates, args.repeat)
+
+    print(f"{args.count} notes, {args.string_dates:.0%} dates ISO, meilleur de {args.repeat}")
+    print(f"  avant (boucle par repository): {legacy:>12,.0f} docs/s")
+    print(f"  après (codec partagé):         {codec:>12,.0f} docs/s")
+    print(f"  gain: x{codec / legacy:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Suite de benchmarks HTTP de l'API : jeu de données, scénarios par route et mesure de charge
+"""
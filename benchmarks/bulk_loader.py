@@ -0,0 +1,133 @@
+"""
+Chargement du jeu de données synthétique dans MongoDB par plusieurs processus
+Chaque processus génère des blocs de documents (voir benchmarks.dataset) et les insère
+par insert_many non ordonnés, avec sa propre connexion. Les compteurs matérialisés
+(synthèses par note, attachments par synthèse) sont écrits à la fin, par `$set` :
+recharger le même jeu de données ne les fausse pas.
+"""
+
+import time
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+from typing import Any, Dict, Tuple
+
+from benchmarks.dataset import GENERATORS, DatasetSpec, synthesis_counters
+
+# Collections chargées
+KINDS = ('notes', 'users', 'syntheses')
+
+# Documents par insert_many
+DEFAULT_BATCH_SIZE = 1000
+
+# Préfixe des identifiants générés (documents et compteurs), pour --reset
+ID_PATTERN = '^bench-'
+COUNTER_ID_PATTERN = ':bench-'
+
+
+def _collection(kind: str):
+    from app.mongodb_connector import mongodb_connector
+    from app.repository.note_repository import NoteRepository
+    from app.repository.synthesis_repository import SynthesisRepository
+    from app.repository.user_repository import UserRepository
+
+    name = {
+        'notes': NoteRepository.COLLECTION_NAME,
+        'syntheses': SynthesisRepository.COLLECTION_NAME,
+        'users': UserRepository.COLLECTION_NAME,
+    }[kind]
+    return mongodb_connector.get_collection(name)
+
+
+def _load_block(task: Tuple[DatasetSpec, str, int, int, int, bool]) -> Dict[str, Any]:
+    """Générer un bloc et l'insérer (exécuté dans un processus du pool)"""
+    from app.utils.bulk import DUPLICATE_KEY_ERROR, insert_many_in_chunks
+
+    spec, kind, start, stop, batch_size, dry_run = task
+    documents = GENERATORS[kind](spec, start, stop)
+    result: Dict[str, Any] = {'kind': kind, 'generated': len(documents), 'inserted': 0, 'duplicates': 0, 'failed': 0}
+
+    if not dry_run:
+        for error in insert_many_in_chunks(_collection(kind), documents, batch_size):
+            if error is None:
+                result['inserted'] += 1
+            elif error['code'] == DUPLICATE_KEY_ERROR:
+                result['duplicates'] += 1
+            else:
+                result['failed'] += 1
+
+    if kind == 'syntheses':
+        by_note, attachments = synthesis_counters(documents)
+        result['by_note'] = by_note
+        result['attachments'] = attachments
+        result['attachment_types'] = Counter(
+            attachment['type'] for document in documents for attachment in document['attachments']
+        )
+    return result
+
+
+def reset_dataset() -> Dict[str, int]:
+    """Supprimer les documents et compteurs d'un chargement précédent ; retourne le nombre supprimé"""
+    from app.mongodb_connector import mongodb_connector
+    from app.repository.counter_repository import CounterRepository
+
+    deleted = {kind: _collection(kind).delete_many({'id': {'$regex': ID_PATTERN}}).deleted_count for kind in KINDS}
+    deleted['counters'] = mongodb_connector.get_collection(CounterRepository.COLLECTION_NAME).delete_many(
+        {'id': {'$regex': COUNTER_ID_PATTERN}}
+    ).deleted_count
+    return deleted
+
+
+def load_dataset(spec: DatasetSpec, workers: int, batch_size: int = DEFAULT_BATCH_SIZE,
+                 dry_run: bool = False) -> Dict[str, Any]:
+    """Générer et charger le jeu de données avec `workers` processus
+
+    Avec `dry_run`, les documents sont générés sans être insérés (mesure du générateur
+    et contrôle des distributions). Retourne un rapport par collection.
+    """
+    from app.repository.counter_repository import NOTE_SYNTHESES, SYNTHESIS_ATTACHMENTS, CounterRepository
+
+    if spec.users and spec.password_hash is None:
+        # Hachage volontairement lent : une seule fois, partagé par tous les utilisateurs
+        from app.utils.jwt_manager import jwt_manager
+        from benchmarks.dataset import BENCH_PASSWORD
+        spec.password_hash = jwt_manager.hash_password(BENCH_PASSWORD)
+
+    tasks = [(spec, *block, batch_size, dry_run) for kind in KINDS for block in spec.blocks(kind)]
+    report: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'generated': 0, 'inserted': 0, 'duplicates': 0, 'failed': 0})
+    by_note: Counter = Counter()
+    attachments: Dict[str, int] = {}
+    attachment_types: Counter = Counter()
+
+    started = time.perf_counter()
+    with Pool(processes=workers) as pool:
+        for result in pool.imap_unordered(_load_block, tasks):
+            totals = report[result['kind']]
+            for key in ('generated', 'inserted', 'duplicates', 'failed'):
+                totals[key] += result[key]
+            if result['kind'] == 'syntheses':
+                by_note.update(result['by_note'])
+                attachments.update(result['attachments'])
+                attachment_types.update(result['attachment_types'])
+    elapsed = time.perf_counter() - started
+
+    if not dry_run and (by_note or attachments):
+        counters = CounterRepository()
+        report['counters'] = {
+            NOTE_SYNTHESES: counters.set_many(NOTE_SYNTHESES, by_note.items()),
+            SYNTHESIS_ATTACHMENTS: counters.set_many(SYNTHESIS_ATTACHMENTS, attachments.items()),
+        }
+
+    hot_notes = max(1, spec.notes // 100)
+    report['distribution'] = {
+        'notes_with_syntheses': len(by_note),
+        'max_syntheses_per_note': max(by_note.values(), default=0),
+        'top_1_percent_notes_share': (
+            sum(count for _, count in by_note.most_common(hot_notes)) / spec.syntheses if spec.syntheses else 0.0
+        ),
+        'attachments': sum(attachments.values()),
+        'attachments_by_type': dict(attachment_types),
+        'max_attachments_per_synthesis': max(attachments.values(), default=0),
+    }
+    report['elapsed_seconds'] = elapsed
+    report['documents_per_second'] = sum(report[kind]['generated'] for kind in KINDS) / elapsed if elapsed else 0.0
+    return dict(report)
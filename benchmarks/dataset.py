@@ -0,0 +1,217 @@
+"""
+Jeu de données synthétique des benchmarks : notes, synthèses avec attachments et utilisateurs
+Les documents sont générés par blocs de BLOCK_SIZE, chacun avec son propre générateur
+aléatoire dérivé de la graine : le même jeu de données est produit quels que soient le
+nombre de processus et la taille des insert_many, et d'une machine à l'autre.
+Les distributions imitent la production :
+- quelques notes concentrent la plupart des synthèses (loi de Zipf, `skew`) ;
+- la taille des contenus suit une loi log-normale (beaucoup de notes courtes, quelques très longues) ;
+- le nombre d'attachments par synthèse suit une loi de Pareto (souvent aucun, parfois des dizaines).
+Les identifiants sont déterministes (`bench-note-000001`...) : les scénarios les retrouvent
+sans interroger la base, et un second chargement ne crée pas de doublons.
+"""
+
+import math
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+# Documents générés par bloc (unité de travail des processus de chargement)
+BLOCK_SIZE = 1000
+
+# Mot de passe de tous les utilisateurs du jeu de données (utilisé par le scénario login)
+BENCH_PASSWORD = 'Bench-Passw0rd!'
+
+# Vocabulaire des titres et contenus, pour que les recherches plein texte trouvent des résultats
+WORDS = (
+    'analyse', 'budget', 'client', 'design', 'equipe', 'fonction', 'gestion', 'histoire',
+    'idee', 'journal', 'lecture', 'marche', 'note', 'objectif', 'projet', 'question',
+    'rapport', 'synthese', 'tache', 'urgence', 'version', 'web',
+)
+
+# Mots recherchés par les scénarios de recherche
+SEARCH_TERMS = ('projet', 'rapport', 'synthese', 'budget')
+
+# Taille des contenus (mots) : médiane et dispersion de la loi log-normale, borne haute
+CONTENT_MEDIAN_WORDS = 120
+CONTENT_SIGMA = 1.2
+MAX_CONTENT_WORDS = 20000
+
+# Attachments par synthèse : exposant de la loi de Pareto et borne haute
+ATTACHMENTS_ALPHA = 1.5
+MAX_ATTACHMENTS = 100
+
+# Début de la période couverte par les dates de création
+EPOCH = datetime(2024, 1, 1)
+
+
+def note_id(index: int) -> str:
+    return f"bench-note-{index:06d}"
+
+
+def synthesis_id(index: int) -> str:
+    return f"bench-synthesis-{index:07d}"
+
+
+def user_id(index: int) -> str:
+    return f"bench-user-{index:05d}"
+
+
+def username(index: int) -> str:
+    return f"bench_user_{index:05d}"
+
+
+class DatasetSpec:
+    """Taille et distributions du jeu de données ; même spécification, mêmes documents"""
+
+    def __init__(self, notes: int, syntheses: int, users: int, seed: int = 42, skew: float = 1.1,
+                 audio_ratio: float = 0.5, generated_ratio: float = 0.5, days: int = 365,
+                 password_hash: Optional[str] = None):
+        """
+        Args:
+            notes, syntheses, users: Nombre de documents par collection
+            seed: Graine de tous les générateurs aléatoires
+            skew: Exposant de Zipf de la répartition des synthèses entre les notes (0 = uniforme)
+            audio_ratio: Part des attachments de type AUDIO (les autres sont DOCUMENT)
+            generated_ratio: Part des synthèses générées automatiquement
+            days: Période couverte par les dates de création, à partir du 1er janvier 2024
+            password_hash: Hash de BENCH_PASSWORD partagé par tous les utilisateurs
+                (calculé une fois : le hachage est volontairement lent)
+        """
+        self.notes = notes
+        self.syntheses = syntheses
+        self.users = users
+        self.seed = seed
+        self.skew = skew
+        self.audio_ratio = audio_ratio
+        self.generated_ratio = generated_ratio
+        self.days = days
+        self.password_hash = password_hash
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Paramètres du jeu de données (sans le hash), pour les rapports de benchmark"""
+        return {name: value for name, value in vars(self).items() if name != 'password_hash'}
+
+    def blocks(self, kind: str) -> List[Tuple[str, int, int]]:
+        """Blocs (type, début, fin) à générer pour une collection"""
+        total = getattr(self, kind)
+        return [(kind, start, min(start + BLOCK_SIZE, total)) for start in range(0, total, BLOCK_SIZE)]
+
+
+def _block_rng(spec: DatasetSpec, kind: str, start: int) -> random.Random:
+    # Une graine chaîne est hachée de façon stable (indépendante de PYTHONHASHSEED)
+    return random.Random(f"{spec.seed}:{kind}:{start}")
+
+
+@lru_cache(maxsize=4)
+def _note_weights(notes: int, skew: float) -> Tuple[float, ...]:
+    """Poids cumulés de Zipf des notes : la note de rang r pèse 1 / (r + 1)^skew"""
+    return tuple(accumulate(1.0 / (rank + 1) ** skew for rank in range(notes)))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def _created_at(rng: random.Random, spec: DatasetSpec) -> datetime:
+    return EPOCH + timedelta(seconds=rng.randrange(max(spec.days, 1) * 86400))
+
+
+def _content_words(rng: random.Random) -> int:
+    words = int(rng.lognormvariate(math.log(CONTENT_MEDIAN_WORDS), CONTENT_SIGMA))
+    return min(max(words, 1), MAX_CONTENT_WORDS)
+
+
+def _attachment_count(rng: random.Random) -> int:
+    return min(int(rng.paretovariate(ATTACHMENTS_ALPHA)) - 1, MAX_ATTACHMENTS)
+
+
+def generate_notes(spec: DatasetSpec, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Documents des notes [start, stop)"""
+    from app.models.model import Note
+    from app.repository.codec import NOTE_CODEC
+
+    rng = _block_rng(spec, 'notes', start)
+    documents = []
+    for index in range(start, stop):
+        created_at = _created_at(rng, spec)
+        documents.append(NOTE_CODEC.encode(Note(
+            id=note_id(index),
+            title=_text(rng, rng.randint(2, 8)),
+            content=_text(rng, _content_words(rng)),
+            created_at=created_at,
+            updated_at=created_at,
+        )))
+    return documents
+
+
+def generate_syntheses(spec: DatasetSpec, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Documents des synthèses [start, stop), avec leurs attachments"""
+    from app.models.model import Attachment, AttachmentType, Synthesis
+    from app.repository.codec import SYNTHESIS_CODEC
+
+    rng = _block_rng(spec, 'syntheses', start)
+    note_indexes = rng.choices(range(spec.notes), cum_weights=_note_weights(spec.notes, spec.skew), k=stop - start)
+    documents = []
+    for index, note_index in zip(range(start, stop), note_indexes):
+        created_at = _created_at(rng, spec)
+        synthesis = Synthesis(
+            id=synthesis_id(index),
+            note_id=note_id(note_index),
+            url=f"https://storage.example.com/syntheses/{index}.pdf",
+            title=_text(rng, rng.randint(2, 6)),
+            is_generated=rng.random() < spec.generated_ratio,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        for position in range(_attachment_count(rng)):
+            is_audio = rng.random() < spec.audio_ratio
+            synthesis.attachments.append(Attachment(
+                id=f"{synthesis.id}-{position}",
+                url=f"https://storage.example.com/attachments/{index}-{position}.{'mp3' if is_audio else 'pdf'}",
+                type=AttachmentType.AUDIO if is_audio else AttachmentType.DOCUMENT,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        documents.append(SYNTHESIS_CODEC.encode(synthesis))
+    return documents
+
+
+def generate_users(spec: DatasetSpec, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Documents des utilisateurs [start, stop), tous avec le mot de passe BENCH_PASSWORD"""
+    from app.models.model import User
+    from app.repository.codec import USER_CODEC
+
+    rng = _block_rng(spec, 'users', start)
+    documents = []
+    for index in range(start, stop):
+        created_at = _created_at(rng, spec)
+        documents.append(USER_CODEC.encode(User(
+            id=user_id(index),
+            username=username(index),
+            email=f"{username(index)}@bench.example.com",
+            password_hash=spec.password_hash,
+            role='admin' if rng.random() < 0.01 else 'user',
+            # Un tiers des comptes ne s'est jamais reconnecté
+            last_login=created_at + timedelta(days=rng.randrange(30)) if rng.random() < 0.67 else None,
+            created_at=created_at,
+            updated_at=created_at,
+        )))
+    return documents
+
+
+GENERATORS = {
+    'notes': generate_notes,
+    'syntheses': generate_syntheses,
+    'users': generate_users,
+}
+
+
+def synthesis_counters(documents: List[Dict[str, Any]]) -> Tuple[Counter, Dict[str, int]]:
+    """Compteurs matérialisés d'un bloc de synthèses : synthèses par note, attachments par synthèse"""
+    by_note = Counter(document['note_id'] for document in documents)
+    attachments = {document['id']: len(document['attachments']) for document in documents}
+    return by_note, attachments
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Générer et charger un jeu de données synthétique réaliste dans MongoDB
+Notes, synthèses avec attachments AUDIO/DOCUMENT et utilisateurs, avec des distributions
+asymétriques (quelques notes très sollicitées, contenus à longue traîne). Le jeu de
+données ne dépend que des paramètres et de la graine : deux machines chargent les mêmes
+documents, quels que soient --workers et --batch-size.
+
+    python benchmarks/generate_dataset.py --notes 100000 --syntheses 300000 --users 10000 --workers 8
+    python benchmarks/generate_dataset.py --notes 100000 --syntheses 300000 --dry-run   # sans base
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.bulk import MAX_CHUNK_SIZE
+from benchmarks.bulk_loader import DEFAULT_BATCH_SIZE, KINDS, load_dataset, reset_dataset
+from benchmarks.dataset import DatasetSpec
+
+
+def main():
+    """Main dataset generation function"""
+    parser = argparse.ArgumentParser(description="Générer et charger un jeu de données synthétique")
+    parser.add_argument('--notes', type=int, default=10000, help="Nombre de notes")
+    parser.add_argument('--syntheses', type=int, default=30000, help="Nombre de synthèses")
+    parser.add_argument('--users', type=int, default=1000, help="Nombre d'utilisateurs")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du générateur")
+    parser.add_argument('--skew', type=float, default=1.1,
+                        help="Exposant de Zipf des synthèses par note (0 = uniforme, plus grand = notes plus concentrées)")
+    parser.add_argument('--audio-ratio', type=float, default=0.5, help="Part des attachments AUDIO")
+    parser.add_argument('--generated-ratio', type=float, default=0.5, help="Part des synthèses générées")
+    parser.add_argument('--days', type=int, default=365, help="Période couverte par les dates de création")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processus de chargement")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help=f"Documents par insert_many (max {MAX_CHUNK_SIZE})")
+    parser.add_argument('--reset', action='store_true', help="Supprimer d'abord les documents d'un chargement précédent")
+    parser.add_argument('--ensure-indexes', action='store_true', help="Créer les index déclarés après le chargement")
+    parser.add_argument('--dry-run', action='store_true', help="Générer sans rien écrire en base")
+    parser.add_argument('--json', action='store_true', help="Afficher le rapport en JSON")
+    args = parser.parse_args()
+
+    if args.syntheses and not args.notes:
+        parser.error("--syntheses demande au moins une note")
+    if not 1 <= args.batch_size <= MAX_CHUNK_SIZE:
+        parser.error(f"--batch-size doit être compris entre 1 et {MAX_CHUNK_SIZE}")
+
+    spec = DatasetSpec(
+        notes=args.notes,
+        syntheses=args.syntheses,
+        users=args.users,
+        seed=args.seed,
+        skew=args.skew,
+        audio_ratio=args.audio_ratio,
+        generated_ratio=args.generated_ratio,
+        days=args.days,
+    )
+
+    if args.reset and not args.dry_run:
+        deleted = reset_dataset()
+        print("Supprimés: " + ", ".join(f"{count} {name}" for name, count in deleted.items()))
+
+    report = load_dataset(spec, workers=max(args.workers, 1), batch_size=args.batch_size, dry_run=args.dry_run)
+
+    if args.ensure_indexes and not args.dry_run:
+        from app.repository.index_manager import ensure_indexes
+        ensure_indexes()
+
+    if args.json:
+        print(json.dumps({'dataset': spec.to_dict(), **report}, indent=2, ensure_ascii=False))
+        return
+
+    for kind in KINDS:
+        totals = report.get(kind)
+        if totals:
+            print(f"{kind:<10} {totals['generated']:>9} générés   {totals['inserted']:>9} insérés   "
+                  f"{totals['duplicates']:>7} déjà présents   {totals['failed']:>5} en échec")
+    distribution = report['distribution']
+    print(f"Synthèses : {distribution['notes_with_syntheses']} notes concernées, "
+          f"jusqu'à {distribution['max_syntheses_per_note']} par note, "
+          f"{distribution['top_1_percent_notes_share']:.0%} sur 1 % des notes")
+    print(f"Attachments : {distribution['attachments']} ({distribution['attachments_by_type']}), "
+          f"jusqu'à {distribution['max_attachments_per_synthesis']} par synthèse")
+    print(f"{report['documents_per_second']:,.0f} documents/s en {report['elapsed_seconds']:.1f} s")
+
+    if any(totals['failed'] for kind, totals in report.items() if kind in KINDS):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Envoi de la charge d'un scénario et mesure du débit et des latences
+"""
+
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.scenarios import Scenario
+
+
+def percentile(sorted_values: List[float], ratio: float) -> float:
+    """Percentile par rang le plus proche d'une liste triée"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(ratio * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], status_codes: Counter, errors: int, elapsed: float) -> Dict[str, Any]:
+    """Résumé d'une série de requêtes : débit, latences (ms) et codes de réponse"""
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'status_codes': dict(sorted(status_codes.items())),
+        'throughput': requests / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int,
+                       state: Dict[str, Any]) -> Dict[str, Any]:
+    """Envoyer `requests` requêtes du scénario, au plus `concurrency` à la fois"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    status_codes: Counter = Counter()
+    errors = 0
+    headers = {'Authorization': f"Bearer {state['token']}"} if scenario.auth else None
+
+    async def one_request(index):
+        nonlocal errors
+        path = scenario.path(index, state)
+        body = scenario.body(index, state) if scenario.body else None
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, json=body, headers=headers)
+            except httpx.HTTPError:
+                errors += 1
+                status_codes['transport_error'] += 1
+                latencies.append(time.perf_counter() - started)
+                return
+            latencies.append(time.perf_counter() - started)
+        status_codes[str(response.status_code)] += 1
+        if response.status_code >= 400:
+            errors += 1
+        elif scenario.capture:
+            scenario.capture(response.json(), state)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request(index) for index in range(requests)))
+    return summarize(latencies, status_codes, errors, time.perf_counter() - started)
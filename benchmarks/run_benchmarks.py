@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark de charge de toutes les routes de l'API
+Charge le jeu de données synthétique dans MongoDB (voir generate_dataset.py), envoie à
+un serveur déjà démarré les requêtes de chaque route (blueprints notes, syntheses, health
+et auth) avec un nombre fixe de requêtes simultanées, puis écrit le débit et les
+latences p50/p95/p99 par route en JSON.
+Avec --baseline, compare le résultat à une exécution précédente.
+
+    python main.py
+    python benchmarks/run_benchmarks.py --notes 5000 --requests 500 --concurrency 50
+    python benchmarks/run_benchmarks.py --skip-seed --baseline benchmarks/results/avant.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+import httpx
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bulk_loader import KINDS, load_dataset
+from benchmarks.dataset import DatasetSpec
+from benchmarks.load import run_scenario
+from benchmarks.scenarios import build_scenarios, cleanup_requests
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def git_commit():
+    """Commit du code mesuré, pour comparer les exécutions dans le temps"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_all(args, scenarios, state):
+    """Exécuter les scénarios l'un après l'autre ; retourne les résultats par route"""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        for scenario in scenarios:
+            entry = {'blueprint': scenario.blueprint, 'method': scenario.method}
+            if scenario.auth and not state.get('token'):
+                results[scenario.name] = {**entry, 'skipped': "pas de jeton (scénario login en échec ou non exécuté)"}
+                print(f"  {scenario.name:<26} ignoré : pas de jeton")
+                continue
+            requests = scenario.request_count(args.requests, state)
+            if requests == 0:
+                results[scenario.name] = {**entry, 'skipped': "aucun document créé à consommer"}
+                print(f"  {scenario.name:<26} ignoré : aucun document à consommer")
+                continue
+
+            # Échauffement (lectures seulement : les écritures modifieraient le jeu de données)
+            if scenario.is_read and args.warmup:
+                await run_scenario(client, scenario, args.warmup, args.concurrency, state)
+            result = await run_scenario(client, scenario, requests, args.concurrency, state)
+            if scenario.pool is not None and scenario.method == 'DELETE':
+                state.setdefault('consumed', {})[scenario.pool] = requests
+
+            # Une route qui ne répond que 404 ou 501 n'est pas exposée par le serveur
+            # (blueprint non enregistré, route non servie par l'application ASGI)
+            if set(result['status_codes']) in ({'404'}, {'501'}) and scenario.pool is None:
+                result['available'] = False
+            results[scenario.name] = {**entry, **result}
+            print_result(scenario.name, result)
+        await cleanup(client, state, args.concurrency)
+    return results
+
+
+async def cleanup(client, state, concurrency):
+    """Retirer, hors mesure, ce que les scénarios ont créé sans le consommer"""
+    requests = cleanup_requests(state)
+    if not requests:
+        return
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def one_request(method, path):
+        nonlocal failed
+        async with semaphore:
+            try:
+                response = await client.request(method, path)
+                failed += response.status_code >= 400
+            except httpx.HTTPError:
+                failed += 1
+
+    await asyncio.gather(*(one_request(method, path) for method, path in requests))
+    print(f"  nettoyage: {len(requests) - failed}/{len(requests)} requêtes réussies")
+
+
+def print_result(name, result):
+    """Afficher le résultat d'une route"""
+    unavailable = '   (route absente)' if result.get('available') is False else ''
+    print(f"  {name:<26} {result['throughput']:>8,.0f} req/s   "
+          f"p50 {result['p50_ms']:>7.1f} ms   p95 {result['p95_ms']:>7.1f} ms   "
+          f"p99 {result['p99_ms']:>7.1f} ms   erreurs {result['errors']}{unavailable}")
+
+
+def compare(results, baseline_path, max_regression):
+    """Comparer à une exécution précédente ; retourne les routes dont le p95 a régressé"""
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)['routes']
+
+    print(f"\nComparaison avec {baseline_path} (p95 et débit)")
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if 'p95_ms' not in result or not before or not before.get('p95_ms'):
+            continue
+        p95_change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+        throughput_ratio = result['throughput'] / before['throughput'] if before.get('throughput') else 0.0
+        flag = ''
+        if max_regression is not None and p95_change > max_regression:
+            regressions.append(name)
+            flag = '   RÉGRESSION'
+        print(f"  {name:<26} p95 {p95_change:>+7.1f} %   débit x{throughput_ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Mesurer le débit et les latences de chaque route de l'API")
+    parser.add_argument('--base-url', default='http://localhost:5000', help="URL du serveur à mesurer")
+    parser.add_argument('--requests', type=int, default=200, help="Requêtes par route")
+    parser.add_argument('--concurrency', type=int, default=20, help="Requêtes simultanées")
+    parser.add_argument('--warmup', type=int, default=20, help="Requêtes d'échauffement non mesurées par route de lecture")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Timeout par requête (secondes)")
+    parser.add_argument('--notes', type=int, default=1000, help="Notes du jeu de données")
+    parser.add_argument('--syntheses-per-note', type=int, default=3, help="Synthèses par note")
+    parser.add_argument('--users', type=int, default=20, help="Utilisateurs du jeu de données")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du jeu de données")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processus de chargement du jeu de données")
+    parser.add_argument('--skip-seed', action='store_true', help="Ne pas charger le jeu de données (déjà présent)")
+    parser.add_argument('--route', action='append', dest='routes',
+                        help="Ne mesurer que ce scénario ou ce blueprint (répétable)")
+    parser.add_argument('--output', help="Fichier JSON du résultat (par défaut benchmarks/results/<date>.json)")
+    parser.add_argument('--baseline', help="Résultat JSON d'une exécution précédente à comparer")
+    parser.add_argument('--max-regression', type=float,
+                        help="Échec (code 1) si le p95 d'une route augmente de plus de N %% par rapport à --baseline")
+    args = parser.parse_args()
+
+    if min(args.notes, args.syntheses_per_note, args.users) < 1:
+        parser.error("--notes, --syntheses-per-note et --users doivent être positifs")
+
+    spec = DatasetSpec(args.notes, args.notes * args.syntheses_per_note, args.users, seed=args.seed)
+    if not args.skip_seed:
+        print(f"Chargement du jeu de données: {spec.notes} notes, {spec.syntheses} synthèses, {spec.users} utilisateurs")
+        loaded = load_dataset(spec, workers=args.workers)
+        print("  insérés: " + ", ".join(f"{loaded[kind]['inserted']} {kind}" for kind in KINDS if kind in loaded))
+
+    started_at = datetime.now()
+    run_id = started_at.strftime('%Y%m%d%H%M%S')
+    scenarios = build_scenarios(args.notes, args.syntheses_per_note, args.users, run_id)
+    if args.routes:
+        scenarios = [s for s in scenarios if s.name in args.routes or s.blueprint in args.routes]
+
+    try:
+        httpx.get(f"{args.base_url}/api/v1/health", timeout=args.timeout)
+    except httpx.HTTPError as e:
+        print(f"Serveur injoignable ({args.base_url}): {e}", file=sys.stderr)
+        sys.exit(2)
+
+    print(f"{len(scenarios)} routes, {args.requests} requêtes par route, {args.concurrency} simultanées")
+    results = asyncio.run(run_all(args, scenarios, {}))
+
+    report = {
+        'started_at': started_at.isoformat(),
+        'base_url': args.base_url,
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'concurrency': args.concurrency,
+        'requests_per_route': args.requests,
+        'dataset': spec.to_dict(),
+        'routes': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{run_id}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2, ensure_ascii=False)
+    print(f"\nRésultat écrit dans {output}")
+
+    if args.baseline and compare(results, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Scénarios de charge : une entrée par route des blueprints notes, syntheses, health et auth
+Chaque scénario construit la n-ième requête (chemin, corps) à partir du jeu de données.
+Les scénarios d'écriture ne modifient que ce que l'exécution a créé (notes et synthèses
+modifiées puis supprimées après avoir été créées, attachments retirés après avoir été
+ajoutés) : leur ordre dans la liste compte. Ce que les scénarios ne consomment pas
+(créations groupées, attachments ajoutés en lot, créations au-delà des suppressions
+mesurées) est retiré par cleanup_requests, hors mesure : le jeu de données chargé reste
+identique d'une exécution à l'autre. Seuls les comptes créés par register restent.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from benchmarks.dataset import BENCH_PASSWORD, SEARCH_TERMS, note_id, synthesis_id, username
+
+NOTES = '/api/v1/notes'
+SYNTHESES = '/api/v1/syntheses'
+AUTH = '/api/v1/auth'
+
+# Taille des corps des créations groupées
+BATCH_ITEMS = 20
+
+
+class Scenario:
+    """Requêtes d'une route, construites selon leur numéro d'ordre"""
+
+    def __init__(self, name: str, blueprint: str, method: str, path: Callable[[int, Dict[str, Any]], str],
+                 body: Optional[Callable[[int, Dict[str, Any]], Any]] = None, auth: bool = False,
+                 capture: Optional[Callable[[Any, Dict[str, Any]], None]] = None, pool: Optional[str] = None):
+        """
+        Args:
+            name: Nom du scénario dans le rapport
+            blueprint: Blueprint de la route (notes, syntheses, health, auth)
+            method: Méthode HTTP
+            path: (numéro, état) -> chemin de la requête
+            body: (numéro, état) -> corps JSON, None pour une requête sans corps
+            auth: Envoyer le jeton obtenu par le scénario login
+            capture: (réponse JSON, état) appelé après chaque réponse 2xx
+            pool: Clé de l'état listant les identifiants consommés (une requête par identifiant)
+        """
+        self.name = name
+        self.blueprint = blueprint
+        self.method = method
+        self.path = path
+        self.body = body
+        self.auth = auth
+        self.capture = capture
+        self.pool = pool
+
+    @property
+    def is_read(self) -> bool:
+        return self.method == 'GET'
+
+    def request_count(self, requests: int, state: Dict[str, Any]) -> int:
+        """Nombre de requêtes à envoyer (limité par les identifiants disponibles)"""
+        if self.pool is not None:
+            return min(requests, len(state.get(self.pool, [])))
+        return requests
+
+
+def _collect(key: str) -> Callable[[Any, Dict[str, Any]], None]:
+    """Capture de l'identifiant d'un document créé, pour les suppressions"""
+    def capture(payload, state):
+        if isinstance(payload, dict) and 'id' in payload:
+            state.setdefault(key, []).append(payload['id'])
+    return capture
+
+
+def _collect_batch(key: str) -> Callable[[Any, Dict[str, Any]], None]:
+    """Capture des identifiants créés par une création groupée"""
+    def capture(payload, state):
+        items = payload.get('results', []) if isinstance(payload, dict) else []
+        state.setdefault(key, []).extend(
+            result['item']['id'] for result in items if result.get('status') == 201 and 'item' in result
+        )
+    return capture
+
+
+def _collect_attachments(prefix: str) -> Callable[[Any, Dict[str, Any]], None]:
+    """Capture des attachments ajoutés en lot (synthèse, url), à retirer après la mesure"""
+    def capture(payload, state):
+        if not isinstance(payload, dict) or 'id' not in payload:
+            return
+        added = state.setdefault('batch_attachments', set())
+        for attachment in payload.get('attachments', []):
+            if attachment.get('url', '').startswith(prefix):
+                added.add((payload['id'], attachment['url']))
+    return capture
+
+
+def cleanup_requests(state: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Requêtes (méthode, chemin) retirant ce que les scénarios n'ont pas consommé
+
+    `state['consumed']` donne, par pool, le nombre d'identifiants consommés par le
+    scénario de suppression correspondant.
+    """
+    consumed = state.get('consumed', {})
+    requests = []
+    for pool, prefix in (('created_notes', NOTES), ('batch_notes', NOTES),
+                         ('created_syntheses', SYNTHESES), ('batch_syntheses', SYNTHESES)):
+        for item_id in state.get(pool, [])[consumed.get(pool, 0):]:
+            requests.append(('DELETE', f"{prefix}/{item_id}"))
+    for synthesis, url in sorted(state.get('batch_attachments', ())):
+        requests.append(('DELETE', f"{SYNTHESES}/{synthesis}/attachments/{quote(url, safe='')}"))
+    return requests
+
+
+def _capture_token(payload, state):
+    if isinstance(payload, dict) and payload.get('token'):
+        state['token'] = payload['token']
+
+
+def build_scenarios(notes: int, syntheses_per_note: int, users: int, run_id: str) -> List[Scenario]:
+    """Scénarios de toutes les routes, dans leur ordre d'exécution
+
+    Args:
+        notes, syntheses_per_note, users: Taille du jeu de données chargé
+        run_id: Identifiant de l'exécution, pour des noms uniques à chaque lancement
+    """
+    syntheses = notes * syntheses_per_note
+
+    def note(i):
+        return note_id(i % notes)
+
+    def synthesis(i):
+        return synthesis_id(i % syntheses)
+
+    def term(i):
+        return SEARCH_TERMS[i % len(SEARCH_TERMS)]
+
+    def attachment_url(i):
+        return f"bench-{run_id}-{i}"
+
+    batch_attachment_prefix = f"bench-{run_id}-batch-"
+
+    return [
+        Scenario('health', 'health', 'GET', lambda i, s: '/api/v1/health'),
+
+        # Notes
+        Scenario('list_notes', 'notes', 'GET', lambda i, s: f"{NOTES}?limit=50"),
+        Scenario('list_notes_include', 'notes', 'GET',
+                 lambda i, s: f"{NOTES}?limit=50&include=syntheses,synthesis_count"),
+        Scenario('get_notes_by_ids', 'notes', 'GET',
+                 lambda i, s: f"{NOTES}?ids={','.join(note(i + k) for k in range(20))}"),
+        Scenario('search_notes', 'notes', 'GET', lambda i, s: f"{NOTES}/search?q={term(i)}&limit=20"),
+        Scenario('get_note', 'notes', 'GET', lambda i, s: f"{NOTES}/{note(i)}"),
+        Scenario('get_note_include', 'notes', 'GET', lambda i, s: f"{NOTES}/{note(i)}?include=syntheses"),
+        Scenario('note_syntheses', 'notes', 'GET', lambda i, s: f"{NOTES}/{note(i)}/syntheses"),
+        Scenario('create_note', 'notes', 'POST', lambda i, s: NOTES,
+                 body=lambda i, s: {'title': f"bench {run_id} {i}", 'content': f"note de benchmark {i}"},
+                 capture=_collect('created_notes')),
+        Scenario('create_notes_batch', 'notes', 'POST', lambda i, s: f"{NOTES}/batch",
+                 body=lambda i, s: {'items': [
+                     {'title': f"bench {run_id} {i}-{k}", 'content': 'note de benchmark'} for k in range(BATCH_ITEMS)
+                 ]},
+                 capture=_collect_batch('batch_notes')),
+        Scenario('update_note', 'notes', 'PATCH', lambda i, s: f"{NOTES}/{s['created_notes'][i]}",
+                 body=lambda i, s: {'title': f"note mise à jour {run_id} {i}"}, pool='created_notes'),
+        Scenario('delete_note', 'notes', 'DELETE', lambda i, s: f"{NOTES}/{s['created_notes'][i]}",
+                 pool='created_notes'),
+
+        # Synthèses
+        Scenario('list_syntheses', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}?limit=50"),
+        Scenario('get_syntheses_by_notes', 'syntheses', 'GET',
+                 lambda i, s: f"{SYNTHESES}?note_ids={','.join(note(i + k) for k in range(20))}"),
+        Scenario('search_syntheses', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}/search?q={term(i)}&limit=20"),
+        Scenario('syntheses_by_note', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}/note/{note(i)}"),
+        Scenario('synthesis_stats', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}/stats"),
+        Scenario('synthesis_stats_by_note', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}/stats?group_by=note"),
+        Scenario('get_synthesis', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}/{synthesis(i)}"),
+        Scenario('create_synthesis', 'syntheses', 'POST', lambda i, s: SYNTHESES,
+                 body=lambda i, s: {
+                     'url': f"https://storage.example.com/bench/{run_id}/{i}.pdf",
+                     'title': f"bench {run_id} {i}",
+                     'note_id': note(i),
+                     'attachments': [{'url': f"https://storage.example.com/bench/{run_id}/{i}.mp3", 'type': 'Audio'}],
+                 },
+                 capture=_collect('created_syntheses')),
+        Scenario('create_syntheses_batch', 'syntheses', 'POST', lambda i, s: f"{SYNTHESES}/batch",
+                 body=lambda i, s: {'items': [
+                     {'url': f"https://storage.example.com/bench/{run_id}/{i}-{k}.pdf", 'note_id': note(i + k)}
+                     for k in range(BATCH_ITEMS)
+                 ]},
+                 capture=_collect_batch('batch_syntheses')),
+        Scenario('update_synthesis', 'syntheses', 'PATCH', lambda i, s: f"{SYNTHESES}/{s['created_syntheses'][i]}",
+                 body=lambda i, s: {'title': f"synthèse mise à jour {run_id} {i}"}, pool='created_syntheses'),
+        Scenario('delete_synthesis', 'syntheses', 'DELETE', lambda i, s: f"{SYNTHESES}/{s['created_syntheses'][i]}",
+                 pool='created_syntheses'),
+
+        # Attachments des synthèses
+        Scenario('list_attachments', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}/{synthesis(i)}/attachments"),
+        Scenario('attachments_by_type', 'syntheses', 'GET',
+                 lambda i, s: f"{SYNTHESES}/{synthesis(i)}/attachments/by-type/{'Audio' if i % 2 else 'Document'}"),
+        Scenario('count_attachments', 'syntheses', 'GET', lambda i, s: f"{SYNTHESES}/{synthesis(i)}/attachments/count"),
+        Scenario('add_attachment', 'syntheses', 'POST', lambda i, s: f"{SYNTHESES}/{synthesis(i)}/attachments",
+                 body=lambda i, s: {'url': attachment_url(i), 'type': 'Document'}),
+        Scenario('add_attachments_batch', 'syntheses', 'POST',
+                 lambda i, s: f"{SYNTHESES}/{synthesis(i)}/attachments/batch",
+                 body=lambda i, s: {'attachments': [
+                     {'url': f"{batch_attachment_prefix}{i}-{k}", 'type': 'Audio'} for k in range(5)
+                 ]},
+                 capture=_collect_attachments(batch_attachment_prefix)),
+        Scenario('remove_attachment', 'syntheses', 'DELETE',
+                 lambda i, s: f"{SYNTHESES}/{synthesis(i)}/attachments/{quote(attachment_url(i), safe='')}"),
+
+        # Authentification
+        Scenario('register', 'auth', 'POST', lambda i, s: f"{AUTH}/register",
+                 body=lambda i, s: {
+                     'username': f"bench_{run_id}_{i}",
+                     'email': f"bench_{run_id}_{i}@bench.example.com",
+                     'password': BENCH_PASSWORD,
+                 }),
+        Scenario('login', 'auth', 'POST', lambda i, s: f"{AUTH}/login",
+                 body=lambda i, s: {'username': username(i % users), 'password': BENCH_PASSWORD},
+                 capture=_capture_token),
+        Scenario('me', 'auth', 'GET', lambda i, s: f"{AUTH}/me", auth=True),
+        Scenario('refresh_token', 'auth', 'POST', lambda i, s: f"{AUTH}/refresh", auth=True),
+    ]
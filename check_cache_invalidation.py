@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Vérification de l'invalidation des caches locaux par change stream
+À lancer contre un replica set (un nœud unique suffit) : une note est mise en cache,
+modifiée directement dans la collection comme le ferait un autre worker, puis le script
+attend que le change stream retire l'entrée du cache local.
+
+    docker run -d --name mongo-rs -p 27017:27017 mongo:7 --replSet rs0
+    docker exec mongo-rs mongosh --quiet --eval "rs.initiate()"
+    MONGODB_URI="mongodb://localhost:27017/?directConnection=true" python check_cache_invalidation.py
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.model import Note
+from app.repository.change_stream import start_cache_invalidation
+from app.repository.note_repository import NoteRepository
+
+
+def wait_for(predicate, timeout):
+    """Attendre que `predicate()` soit vrai ; retourne le délai écoulé ou None"""
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        if predicate():
+            return time.monotonic() - started
+        time.sleep(0.05)
+    return None
+
+
+def main():
+    """Main verification function"""
+    parser = argparse.ArgumentParser(description="Vérifier l'invalidation des caches par change stream")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Délai maximal d'invalidation (secondes)")
+    args = parser.parse_args()
+
+    repository = NoteRepository()
+    listener = start_cache_invalidation()
+    if wait_for(lambda: listener.status == 'watching', args.timeout) is None:
+        print(f"Change stream non établi ({listener.status}): {listener.last_error}")
+        sys.exit(1)
+
+    note = repository.create(Note(title="check-cache-invalidation", content="avant"))
+    try:
+        repository.get_by_id(note.id)  # mise en cache
+        # Écriture hors du repository : aucune invalidation locale directe
+        repository.collection.update_one({'id': note.id}, {'$set': {'content': 'après'}})
+
+        # Tant que l'entrée n'est pas invalidée, get_by_id renvoie la version en cache
+        elapsed = wait_for(lambda: repository.get_by_id(note.id).content == 'après', args.timeout)
+        if elapsed is None:
+            print("Échec : l'entrée du cache local n'a pas été invalidée")
+            sys.exit(1)
+        print(f"OK : cache invalidé {elapsed * 1000:.0f} ms après l'écriture")
+    finally:
+        repository.delete(note.id)
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script de gestion des index MongoDB
+Compare les index déclarés par les repositories avec ceux présents en base et crée les manquants
+"""
+
+import argparse
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.repository.index_manager import ensure_indexes
+
+
+def main():
+    """Main index management function"""
+    parser = argparse.ArgumentParser(description="Réconcilier les index MongoDB déclarés par les repositories")
+    parser.add_argument('--check', action='store_true', help="Rapporter les écarts sans modifier la base")
+    parser.add_argument('--drop-extra', action='store_true', help="Supprimer les index non déclarés")
+    args = parser.parse_args()
+
+    report = ensure_indexes(dry_run=args.check, drop_extra=args.drop_extra)
+
+    for collection_name, diff in report.items():
+        print(f"{collection_name}:")
+        for status in ('missing', 'extra', 'changed', 'renamed', 'failed'):
+            if diff.get(status):
+                print(f"  {status}: {', '.join(diff[status])}")
+        if not any(diff.values()):
+            print("  OK")
+
+    # Code de sortie non nul : tout écart en mode --check ; sinon les index non créés
+    # et ceux qui restent à corriger manuellement (définition différente, autre nom)
+    if args.check:
+        statuses = ('missing', 'extra', 'changed', 'renamed')
+    else:
+        statuses = ('changed', 'renamed', 'failed')
+    if any(diff.get(status) for diff in report.values() for status in statuses):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
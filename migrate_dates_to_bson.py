@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Script de migration des dates stockées en chaînes ISO vers des dates BSON natives
+La migration avance par lots ordonnés sur `_id` et mémorise sa progression :
+elle peut être interrompue puis relancée sans retraiter les documents déjà migrés.
+"""
+
+import argparse
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pymongo import UpdateOne
+from app.mongodb_connector import mongodb_connector
+from app.repository.attachment_repository import AttachmentRepository
+from app.repository.note_repository import NoteRepository
+from app.repository.synthesis_repository import SynthesisRepository
+from app.repository.user_repository import UserRepository
+
+MIGRATION_NAME = 'native_dates'
+PROGRESS_COLLECTION = 'migrations'
+
+# Champs de date à convertir pour chaque collection
+DATE_FIELDS = {
+    NoteRepository.COLLECTION_NAME: ['created_at', 'updated_at'],
+    SynthesisRepository.COLLECTION_NAME: ['created_at', 'updated_at'],
+    AttachmentRepository.COLLECTION_NAME: ['created_at', 'updated_at'],
+    UserRepository.COLLECTION_NAME: ['created_at', 'updated_at', 'last_login'],
+}
+
+
+def parse_iso_date(value):
+    """Convertir une chaîne ISO en datetime UTC naïf (format renvoyé par PyMongo)"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def migrate_collection(collection_name, date_fields, batch_size):
+    """Migrate the date fields of one collection, resuming from the last saved position"""
+    collection = mongodb_connector.get_collection(collection_name)
+    progress = mongodb_connector.get_collection(PROGRESS_COLLECTION)
+    progress_id = f"{MIGRATION_NAME}:{collection_name}"
+
+    state = progress.find_one({'_id': progress_id}) or {}
+    last_id = state.get('last_id')
+    if state.get('done'):
+        print(f"{collection_name}: already migrated")
+        return
+
+    string_dates = {'$or': [{field: {'$type': 'string'}} for field in date_fields]}
+    projection = {field: 1 for field in date_fields}
+
+    migrated_count = 0
+    skipped_count = 0
+    while True:
+        query = dict(string_dates)
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        docs = list(collection.find(query, projection).sort('_id', 1).limit(batch_size))
+        if not docs:
+            break
+
+        operations = []
+        for doc in docs:
+            changes = {}
+            for field in date_fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    changes[field] = parse_iso_date(value)
+                except ValueError:
+                    skipped_count += 1
+                    print(f"{collection_name}: invalid date in {doc['_id']}.{field}: {value!r}")
+            if changes:
+                # Le filtre sur la valeur d'origine évite d'écraser une écriture concurrente
+                operations.append(UpdateOne(
+                    {'_id': doc['_id'], **{field: doc[field] for field in changes}},
+                    {'$set': changes}
+                ))
+
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            migrated_count += result.modified_count
+
+        last_id = docs[-1]['_id']
+        progress.update_one({'_id': progress_id}, {'$set': {'last_id': last_id}}, upsert=True)
+        print(f"{collection_name}: {migrated_count} documents migrated")
+
+    progress.update_one({'_id': progress_id}, {'$set': {'done': True}}, upsert=True)
+    print(f"{collection_name}: done ({migrated_count} migrated, {skipped_count} invalid values skipped)")
+
+
+def main():
+    """Main migration function"""
+    parser = argparse.ArgumentParser(description="Convertir les dates ISO en dates BSON natives")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Nombre de documents par bulk_write")
+    parser.add_argument('--collection', action='append', choices=sorted(DATE_FIELDS),
+                        help="Collection à migrer (toutes par défaut, option répétable)")
+    parser.add_argument('--restart', action='store_true', help="Oublier la progression enregistrée")
+    args = parser.parse_args()
+
+    print(f"Migration started at: {datetime.now()}")
+    collections = args.collection or list(DATE_FIELDS)
+
+    if args.restart:
+        mongodb_connector.get_collection(PROGRESS_COLLECTION).delete_many(
+            {'_id': {'$in': [f"{MIGRATION_NAME}:{name}" for name in collections]}}
+        )
+
+    try:
+        for collection_name in collections:
+            migrate_collection(collection_name, DATE_FIELDS[collection_name], args.batch_size)
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        sys.exit(1)
+
+    print(f"Migration finished at: {datetime.now()}")
+
+
+if __name__ == "__main__":
+    main()
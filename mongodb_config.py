@@ -1,5 +1,19 @@
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
+
+READ_PREFERENCE_MODES = ('primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest')
+
+# Read profiles and their default read preference:
+# - primary: single-document reads that must see the caller's own writes (get_by_id, exists)
+# - list: collection listings and pages
+# - search: full text search
+# - stats: counts and aggregated statistics
+READ_PROFILE_DEFAULTS = {
+    'primary': 'primary',
+    'list': 'primary',
+    'search': 'secondaryPreferred',
+    'stats': 'secondaryPreferred',
+}
 
 class MongoDBConfig:
     """Configuration class for MongoDB connection"""
@@ -11,6 +25,25 @@ class MongoDBConfig:
         self.min_pool_size: int = int(os.getenv('MONGODB_MIN_POOL_SIZE', '10'))
         self.max_idle_time_ms: int = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '30000'))
         self.server_selection_timeout_ms: int = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+        self.ensure_indexes_on_startup: bool = os.getenv('MONGODB_ENSURE_INDEXES', 'true').lower() == 'true'
+        # Read profiles used by repository methods: read preference, read concern, max staleness
+        self.read_profiles: Dict[str, Dict[str, Any]] = {
+            profile: self._read_profile(profile, default_preference)
+            for profile, default_preference in READ_PROFILE_DEFAULTS.items()
+        }
+    
+    @staticmethod
+    def _read_profile(profile: str, default_preference: str) -> Dict[str, Any]:
+        """Read MONGODB_READ_<PROFILE>_{PREFERENCE,CONCERN,MAX_STALENESS_SECONDS}"""
+        prefix = f"MONGODB_READ_{profile.upper()}_"
+        preference = os.getenv(prefix + 'PREFERENCE', default_preference)
+        if preference not in READ_PREFERENCE_MODES:
+            raise ValueError(f"Invalid read preference for {profile}: {preference}")
+        return {
+            'preference': preference,
+            'concern': os.getenv(prefix + 'CONCERN', 'local'),
+            'max_staleness_seconds': int(os.getenv(prefix + 'MAX_STALENESS_SECONDS', '-1')),
+        }
     
     def get_connection_string(self) -> str:
         """Get the complete MongoDB connection string with options"""
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Script de réconciliation des compteurs matérialisés
+Recalcule depuis les synthèses le nombre de synthèses par note et d'attachments par
+synthèse, puis corrige les compteurs qui ont dérivé (à lancer aussi après la mise en place)
+"""
+
+import argparse
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.repository.synthesis_repository import SynthesisRepository
+
+
+def main():
+    """Main counter reconciliation function"""
+    parser = argparse.ArgumentParser(description="Recalculer les compteurs de synthèses et d'attachments")
+    parser.add_argument('--check', action='store_true', help="Rapporter les écarts sans modifier la base")
+    args = parser.parse_args()
+
+    report = SynthesisRepository().reconcile_counters(dry_run=args.check)
+
+    for scope, result in report.items():
+        print(f"{scope}: {result['checked']} vérifiés, {result['fixed']} corrigés, {result['removed']} supprimés")
+
+    # En mode --check, un code de sortie non nul signale une dérive
+    if args.check and any(result['fixed'] or result['removed'] for result in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Variations des compteurs matérialisés lors du déplacement d'une synthèse vers une autre
+note et du retrait d'un attachment. La collection MongoDB est remplacée par une
+collection en mémoire qui applique les opérateurs utilisés (`$set`, `$pull`,
+`$currentDate`) ; les compteurs sont enregistrés au lieu d'être écrits.
+Lancer avec `python -m unittest`.
+"""
+
+import copy
+import unittest
+from datetime import datetime
+from unittest import mock
+from pymongo import ReturnDocument
+from app.models.model import Attachment, AttachmentType, Synthesis
+from app.mongodb_connector import mongodb_connector
+from app.repository.codec import SYNTHESIS_CODEC
+from app.repository.counter_repository import NOTE_SYNTHESES, SYNTHESIS_ATTACHMENTS
+from app.repository.synthesis_repository import SynthesisRepository, moved_note_deltas
+
+SERVER_DATE = datetime(2030, 1, 1)
+
+
+class FakeCollection:
+    """find_one_and_update sur des documents en mémoire, filtres par `id` et `attachments.url`"""
+
+    def __init__(self, docs):
+        self.docs = {doc['id']: copy.deepcopy(doc) for doc in docs}
+
+    def find_one_and_update(self, query, update, projection=None, return_document=ReturnDocument.BEFORE):
+        doc = self.docs.get(query['id'])
+        if doc is None:
+            return None
+        if 'attachments.url' in query and all(a['url'] != query['attachments.url'] for a in doc['attachments']):
+            return None
+        before = copy.deepcopy(doc)
+        doc.update(update.get('$set', {}))
+        if '$pull' in update:
+            url = update['$pull']['attachments']['url']
+            doc['attachments'] = [attachment for attachment in doc['attachments'] if attachment['url'] != url]
+        if '$currentDate' in update:
+            doc['updated_at'] = SERVER_DATE
+        result = copy.deepcopy(doc if return_document == ReturnDocument.AFTER else before)
+        if projection:
+            result = {field: value for field, value in result.items() if projection.get(field)}
+        return result
+
+
+class RecordingCounters:
+    """Compteurs enregistrés par portée : [(propriétaire, delta)]"""
+
+    def __init__(self):
+        self.increments = []
+
+    def increment(self, scope, owner_id, delta=1, seed=None):
+        self.increment_many(scope, {owner_id: delta}, seed)
+
+    def increment_many(self, scope, deltas, seed=None):
+        self.increments.extend((scope, owner_id, delta) for owner_id, delta in deltas.items())
+
+    def set(self, scope, owner_id, value):
+        pass
+
+
+class SynthesisCountersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.synthesis = Synthesis(
+            url='https://example.com/s.pdf', note_id='note-1', title='Titre',
+            attachments=[Attachment(url='a.mp3', type=AttachmentType('Audio')),
+                         Attachment(url='b.pdf', type=AttachmentType('Document'))],
+        )
+        self.collection = FakeCollection([SYNTHESIS_CODEC.encode(self.synthesis)])
+        patcher = mock.patch.object(mongodb_connector, 'get_collection', return_value=self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.repository = SynthesisRepository()
+        self.repository.counters = RecordingCounters()
+
+    def test_moved_note_deltas(self):
+        self.assertEqual(moved_note_deltas('note-1', 'note-2'), {'note-1': -1, 'note-2': 1})
+        self.assertEqual(moved_note_deltas('note-1', 'note-1'), {})
+
+    def test_move_to_another_note_moves_the_counter(self):
+        updated = self.repository.update_fields(self.synthesis.id, {'note_id': 'note-2', 'title': 'Déplacée'})
+        self.assertEqual(self.repository.counters.increments,
+                         [(NOTE_SYNTHESES, 'note-1', -1), (NOTE_SYNTHESES, 'note-2', 1)])
+        # Document à jour reconstruit sans relecture : identique au document stocké
+        stored = self.collection.docs[self.synthesis.id]
+        self.assertEqual((updated.note_id, updated.title), ('note-2', 'Déplacée'))
+        self.assertEqual(updated.updated_at, stored['updated_at'])
+        self.assertEqual(updated.to_dict(), SYNTHESIS_CODEC.decode(copy.deepcopy(stored)).to_dict())
+
+    def test_update_on_the_same_note_keeps_the_counter(self):
+        self.repository.update_fields(self.synthesis.id, {'note_id': 'note-1'})
+        self.repository.update_fields(self.synthesis.id, {'title': 'Renommée'})
+        self.assertEqual(self.repository.counters.increments, [])
+
+    def test_move_of_a_missing_synthesis_changes_no_counter(self):
+        self.assertIsNone(self.repository.update_fields('absente', {'note_id': 'note-2'}))
+        self.assertEqual(self.repository.counters.increments, [])
+
+    def test_pull_decrements_the_attachment_counter(self):
+        updated = self.repository.remove_attachment_from_synthesis(self.synthesis.id, 'a.mp3')
+        self.assertEqual([attachment.url for attachment in updated.attachments], ['b.pdf'])
+        self.assertEqual(updated.updated_at, SERVER_DATE)
+        self.assertEqual(self.repository.counters.increments, [(SYNTHESIS_ATTACHMENTS, self.synthesis.id, -1)])
+
+    def test_pull_of_a_missing_url_changes_no_counter(self):
+        self.assertIsNone(self.repository.remove_attachment_from_synthesis(self.synthesis.id, 'absent.mp3'))
+        self.assertEqual(self.repository.counters.increments, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
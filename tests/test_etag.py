@@ -0,0 +1,76 @@
+"""
+Requêtes conditionnelles (If-None-Match) sur les routes des notes, backend en mémoire
+Une liste sans If-None-Match reçoit l'empreinte de son corps ; revalidée, elle répond
+304 avec l'ETag de version, qui reste valable jusqu'à la prochaine écriture.
+Lancer avec `python -m unittest`.
+"""
+
+import unittest
+from unittest import mock
+from flask import Flask
+from app.models.model import Note
+from app.repository.repository_factory import RepositoryFactory
+from app.routes import notes_routes
+
+
+class NotesETagTest(unittest.TestCase):
+
+    def setUp(self):
+        factory = RepositoryFactory('memory')
+        self.notes = factory.note_repository
+        for patcher in (mock.patch.object(notes_routes, 'repository_factory', factory),
+                        mock.patch.object(notes_routes, 'note_repository', self.notes)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.note = self.notes.create(Note(title='Titre', content='contenu'))
+        app = Flask(__name__)
+        app.register_blueprint(notes_routes.notes_bp)
+        self.client = app.test_client()
+
+    def get(self, path, etag=None):
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get(path, headers=headers)
+
+    def test_list_revalidation_returns_304_with_version_etag(self):
+        first = self.get('/api/v1/notes?limit=10')
+        self.assertEqual(first.status_code, 200)
+        self.assertIsNotNone(first.headers.get('ETag'))
+        self.assertIn('Accept', first.headers.get('Vary', ''))
+
+        revalidated = self.get('/api/v1/notes?limit=10', first.headers['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.data, b'')
+        version_etag = revalidated.headers['ETag']
+        self.assertEqual(self.get('/api/v1/notes?limit=10', version_etag).status_code, 304)
+
+        # Une écriture change la version : la liste est renvoyée
+        self.notes.update_fields(self.note.id, {'title': 'Modifiée'})
+        changed = self.get('/api/v1/notes?limit=10', version_etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], version_etag)
+
+    def test_list_etag_depends_on_query_and_media_type(self):
+        etag = self.get('/api/v1/notes?limit=10').headers['ETag']
+        self.assertEqual(self.get('/api/v1/notes?limit=5', etag).status_code, 200)
+        ndjson = self.client.get('/api/v1/notes?limit=10', headers={
+            'If-None-Match': etag, 'Accept': 'application/x-ndjson'
+        })
+        self.assertEqual(ndjson.status_code, 200)
+
+    def test_note_revalidation(self):
+        path = f"/api/v1/notes/{self.note.id}"
+        first = self.get(path)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.get(path, first.headers['ETag']).status_code, 304)
+        # L'ETag dépend des champs demandés
+        self.assertEqual(self.get(f"{path}?fields=title", first.headers['ETag']).status_code, 200)
+
+        self.notes.update_fields(self.note.id, {'content': 'nouveau contenu'})
+        self.assertEqual(self.get(path, first.headers['ETag']).status_code, 200)
+
+    def test_unknown_note_is_404_even_when_conditional(self):
+        self.assertEqual(self.get('/api/v1/notes/absente', '"quelconque"').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
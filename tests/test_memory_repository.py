@@ -0,0 +1,103 @@
+"""
+Parité des repositories en mémoire avec la sémantique des repositories MongoDB
+Projections (`fields` et champs `required` de build_projection) et pagination keyset
+(ordre de KEYSET_SORT, filtre de keyset_query). Lancer avec `python -m unittest`.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from app.models.model import Note, Synthesis
+from app.repository.memory_repository import InMemoryNoteRepository, InMemorySynthesisRepository, _matches
+from app.utils.pagination import encode_cursor, keyset_query
+from app.utils.projection import build_projection
+
+BASE_DATE = datetime(2024, 1, 1)
+
+
+def mongo_projection(doc, projection):
+    """Document tel que MongoDB le renvoie pour une projection d'inclusion"""
+    if projection is None:
+        return dict(doc)
+    return {field: value for field, value in doc.items() if field in projection}
+
+
+class MemoryRepositoryParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.syntheses = InMemorySynthesisRepository()
+        self.notes = InMemoryNoteRepository(self.syntheses)
+        # Dates en double : `id` départage les notes créées au même instant
+        for index in range(25):
+            note = Note(title=f"Titre {index}", content=f"contenu {index}")
+            note.created_at = note.updated_at = BASE_DATE + timedelta(minutes=index // 3)
+            self.notes.create(note)
+            self.syntheses.create(Synthesis(url=f"https://example.com/{index}", note_id=note.id, title=f"Titre {index}"))
+
+    def stored(self, repository):
+        return list(repository._docs.values())
+
+    def expected_order(self, repository, query=None):
+        """Ordre de KEYSET_SORT sur les documents retenus par le filtre MongoDB"""
+        docs = [doc for doc in self.stored(repository) if not query or _matches(doc, query)]
+        return [doc['id'] for doc in sorted(docs, key=lambda doc: (doc['created_at'], doc['id']), reverse=True)]
+
+    def test_get_by_id_applies_projection_with_required_fields(self):
+        doc = self.stored(self.notes)[0]
+        note = self.notes.get_by_id(doc['id'], fields=['title'])
+        expected = Note.from_dict(mongo_projection(doc, build_projection(['title'], required=('updated_at',))))
+        self.assertEqual(note.to_dict(['title', 'updated_at', 'content']), expected.to_dict(['title', 'updated_at', 'content']))
+        self.assertEqual(note.content, '')
+        self.assertEqual(note.updated_at, doc['updated_at'])
+
+    def test_list_and_search_apply_projection(self):
+        pages, _ = self.notes.list_page(5, fields=['title'])
+        for note in pages:
+            self.assertEqual(note.content, '')
+            self.assertEqual(note.created_at, self.notes._docs[note.id]['created_at'])
+        for note in self.notes.list_all(fields=['content']):
+            self.assertEqual(note.title, '')
+            self.assertTrue(note.content)
+        for note in self.notes.search('titre', fields=['title']):
+            self.assertEqual(note.content, '')
+        for synthesis in self.syntheses.search_by_title('titre', fields=['title']):
+            self.assertIsNone(synthesis.note_id)
+        note_id = self.stored(self.notes)[0]['id']
+        for synthesis in self.syntheses.list_by_notes([note_id], fields=['title'])[note_id]:
+            self.assertEqual(synthesis.note_id, note_id)
+            self.assertEqual(synthesis.url, '')
+
+    def test_keyset_pages_follow_mongodb_order(self):
+        for repository in (self.notes, self.syntheses):
+            seen, cursor = [], None
+            while True:
+                page, cursor = repository.list_page(4, cursor)
+                seen.extend(model.id for model in page)
+                if cursor is None:
+                    break
+                # Chaque page commence au premier document retenu par keyset_query
+                created_at, item_id = repository._docs[seen[-1]]['created_at'], seen[-1]
+                remaining = self.expected_order(repository, keyset_query(encode_cursor(created_at, item_id)))
+                self.assertEqual(remaining, self.expected_order(repository)[len(seen):])
+            self.assertEqual(seen, self.expected_order(repository))
+
+    def test_order_index_follows_writes(self):
+        doc = self.stored(self.notes)[0]
+        self.notes.delete(doc['id'])
+        note = Note(title='Nouvelle', content='contenu')
+        note.created_at = BASE_DATE - timedelta(days=1)
+        self.notes.create(note)
+        page, cursor = self.notes.list_page(100)
+        self.assertIsNone(cursor)
+        self.assertEqual([model.id for model in page], self.expected_order(self.notes))
+        self.assertEqual(page[-1].id, note.id)
+
+    def test_with_related_pages_follow_mongodb_order(self):
+        results, cursor = self.notes.list_page_with_related(10, {'synthesis_count'}, fields=['title'])
+        self.assertEqual([note.id for note, _ in results], self.expected_order(self.notes)[:10])
+        self.assertTrue(all(related['synthesis_count'] == 1 for _, related in results))
+        self.assertTrue(all(note.content == '' for note, _ in results))
+        self.assertIsNotNone(cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Pagination keyset pendant la migration des dates (created_at en chaîne ISO ou date BSON)
+Le tri et le filtre MongoDB sont reproduits par l'évaluateur du backend en mémoire :
+toutes les dates précèdent toutes les chaînes dans l'ordre décroissant, et `$lt` ne
+compare que des valeurs du même type. Lancer avec `python -m unittest`.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from app.repository.memory_repository import _matches
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_query
+
+BASE_DATE = datetime(2024, 1, 1)
+
+
+def mongo_order(docs):
+    """Ordre de KEYSET_SORT tel que MongoDB l'applique à des dates et des chaînes mêlées"""
+    return sorted(docs, key=lambda doc: (isinstance(doc['created_at'], datetime), doc['created_at'], doc['id']),
+                  reverse=True)
+
+
+class MixedDatesKeysetTest(unittest.TestCase):
+
+    def setUp(self):
+        # Documents récents migrés en dates BSON, anciens encore datés en chaîne ISO,
+        # avec des dates en double que `id` départage
+        self.docs = []
+        for index in range(12):
+            created_at = BASE_DATE + timedelta(hours=index // 2)
+            self.docs.append({'id': f"migrated-{index:02d}", 'created_at': created_at})
+            old = (BASE_DATE - timedelta(days=30, hours=index // 2)).isoformat()
+            self.docs.append({'id': f"legacy-{index:02d}", 'created_at': old})
+
+    def paginate(self, limit):
+        seen, cursor = [], None
+        while True:
+            query = keyset_query(cursor)
+            page = [doc for doc in mongo_order(self.docs) if _matches(doc, query)][:limit]
+            seen.extend(doc['id'] for doc in page)
+            if len(page) < limit:
+                return seen
+            cursor = encode_cursor(page[-1]['created_at'], page[-1]['id'])
+
+    def test_pages_cross_from_dates_to_strings(self):
+        for limit in (1, 5, 12, 13):
+            self.assertEqual(self.paginate(limit), [doc['id'] for doc in mongo_order(self.docs)])
+
+    def test_date_cursor_keeps_string_documents(self):
+        # Curseur sur le plus ancien document migré : seuls les documents non migrés suivent
+        query = keyset_query(encode_cursor(BASE_DATE, 'migrated-00'))
+        after = {doc['id'] for doc in self.docs if _matches(doc, query)}
+        self.assertEqual(after, {doc['id'] for doc in self.docs if isinstance(doc['created_at'], str)})
+
+    def test_cursor_keeps_date_type(self):
+        created_at, item_id = decode_cursor(encode_cursor(BASE_DATE, 'a'))
+        self.assertEqual((created_at, item_id), (BASE_DATE, 'a'))
+        created_at, _ = decode_cursor(encode_cursor(BASE_DATE.isoformat(), 'a'))
+        self.assertEqual(created_at, BASE_DATE.isoformat())
+        # Un curseur daté en chaîne ne retient que des chaînes plus anciennes
+        self.assertNotIn({'created_at': {'$type': 'string'}}, keyset_query(encode_cursor(BASE_DATE.isoformat(), 'a'))['$or'])
+
+
+if __name__ == '__main__':
+    unittest.main()
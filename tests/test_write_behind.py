@@ -0,0 +1,69 @@
+"""
+Regroupement des écritures différées (write-behind) : une opération par document,
+valeurs fusionnées selon l'opérateur. Lancer avec `python -m unittest`.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import AutoReconnect
+from pymongo.write_concern import WriteConcern
+from app.repository.write_behind import WriteBehindBuffer
+
+BASE_DATE = datetime(2024, 1, 1)
+
+
+class RecordingCollection:
+    """Collection qui enregistre les bulk_write (ou échoue si `error` est fourni)"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.bulk_writes = []
+
+    def with_options(self, write_concern=None):
+        return self
+
+    def bulk_write(self, operations, ordered=True):
+        if self.error:
+            raise self.error
+        self.bulk_writes.append(list(operations))
+
+
+class WriteBehindBufferTest(unittest.TestCase):
+
+    def buffer(self, collection, max_items=100):
+        # Intervalle long : seuls les flush() explicites du test écrivent
+        return WriteBehindBuffer('test', lambda: collection, flush_interval_ms=60_000,
+                                 max_items=max_items, write_concern=WriteConcern(w=1))
+
+    def test_updates_of_one_document_are_coalesced(self):
+        collection = RecordingCollection()
+        buffer = self.buffer(collection)
+        buffer.submit('u1', {'$max': {'last_login': BASE_DATE + timedelta(minutes=2)}})
+        buffer.submit('u1', {'$max': {'last_login': BASE_DATE}, '$set': {'active': True}})
+        buffer.submit('u1', {'$max': {'last_login': BASE_DATE + timedelta(minutes=1)}, '$set': {'active': False}})
+        buffer.submit('u2', {'$max': {'last_login': BASE_DATE}})
+
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(collection.bulk_writes, [[
+            UpdateOne({'id': 'u1'}, {'$max': {'last_login': BASE_DATE + timedelta(minutes=2)}, '$set': {'active': False}}),
+            UpdateOne({'id': 'u2'}, {'$max': {'last_login': BASE_DATE}}),
+        ]])
+        stats = buffer.stats()
+        self.assertEqual((stats['submitted'], stats['coalesced'], stats['written'], stats['pending']), (4, 2, 2, 0))
+
+    def test_flush_of_an_empty_buffer_writes_nothing(self):
+        collection = RecordingCollection()
+        self.assertEqual(self.buffer(collection).flush(), 0)
+        self.assertEqual(collection.bulk_writes, [])
+
+    def test_failed_flush_is_counted_and_dropped(self):
+        buffer = self.buffer(RecordingCollection(error=AutoReconnect('coupure')))
+        buffer.submit('u1', {'$max': {'last_login': BASE_DATE}})
+        self.assertEqual(buffer.flush(), 1)
+        stats = buffer.stats()
+        self.assertEqual((stats['failed'], stats['written'], stats['pending']), (1, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()